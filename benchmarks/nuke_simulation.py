@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Replay a scripted nuke through the antinuke cog and measure its response.
+
+Builds a fake guild (channels, roles, members and an audit log) behind a
+simulated REST layer with configurable latency and 429 responses, feeds the
+attacker's actions to the real Antinuke listeners as gateway events, and
+reports time-to-first-ban, total restore time, API calls made and peak
+memory. Nothing touches Discord. Usage:
+
+    python benchmarks/nuke_simulation.py [--channels N] [--bans N] [--roles N] [--duration S]
+                                         [--latency MS] [--ratelimit P] [--retry-after S] [--seed N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import discord
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUILD_ID = 100000000000000000
+OWNER_ID = 100000000000000001
+BOT_ID = 100000000000000002
+ATTACKER_ID = 100000000000000003
+
+class SimulatedRest:
+    """Stands in for Discord's HTTP API: every request costs latency and some come back 429"""
+
+    def __init__(self, latency, ratelimit, retry_after, rng):
+        self.latency = latency
+        self.ratelimit = ratelimit
+        self.retry_after = retry_after
+        self.rng = rng
+        self.calls = Counter()
+        self.rate_limited = 0
+
+    async def request(self, route):
+        self.calls[route] += 1
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+
+        # The library waits out a 429 and retries transparently
+        while self.rng.random() < self.ratelimit:
+            self.rate_limited += 1
+            self.calls[route] += 1
+            await asyncio.sleep(self.retry_after + self.latency)
+
+class FakeAuditLogEntry:
+    def __init__(self, entry_id, action, target, user):
+        self.id = entry_id
+        self.action = action
+        self.target = target
+        self.user = user
+        self.created_at = discord.utils.utcnow()
+
+# Class attributes shadow the library's slots and properties, so fakes can be
+# plain instances while still passing the isinstance checks the cog makes
+class FakeChannel:
+    id = name = guild = position = category_id = overwrites = None
+    topic = nsfw = slowmode_delay = bitrate = user_limit = None
+
+    def __init__(self, guild, channel_id, name, position, category_id=None, overwrites=None, **options):
+        self.guild = guild
+        self.id = channel_id
+        self.name = name
+        self.position = position
+        self.category_id = category_id
+        self.overwrites = overwrites or {}
+        self.topic = options.get("topic")
+        self.nsfw = options.get("nsfw", False)
+        self.slowmode_delay = options.get("slowmode_delay", 0)
+        self.bitrate = options.get("bitrate")
+        self.user_limit = options.get("user_limit")
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, content=None, embeds=None, **kwargs):
+        await self.guild.rest.request("send_message")
+        self.guild.logged_embeds += len(embeds or ())
+
+class FakeCategoryChannel(FakeChannel, discord.CategoryChannel):
+    pass
+
+class FakeTextChannel(FakeChannel, discord.TextChannel):
+    pass
+
+class FakeVoiceChannel(FakeChannel, discord.VoiceChannel):
+    pass
+
+class FakeRole(discord.Role):
+    id = name = guild = permissions = colour = hoist = mentionable = position = managed = None
+
+    def __init__(self, guild, role_id, name, permissions=0, position=0, colour=0, hoist=False, mentionable=False):
+        self.guild = guild
+        self.id = role_id
+        self.name = name
+        self.permissions = discord.Permissions(permissions)
+        self.colour = discord.Colour(colour)
+        self.hoist = hoist
+        self.mentionable = mentionable
+        self.position = position
+        self.managed = False
+
+    def __str__(self):
+        return self.name
+
+    def is_default(self):
+        return self.id == self.guild.id
+
+class FakeMember:
+    def __init__(self, guild, member_id, name, roles=(), bot=False):
+        self.guild = guild
+        self.id = member_id
+        self.name = name
+        self.bot = bot
+        self._role_ids = list(roles)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def roles(self):
+        roles = [self.guild.get_role(role_id) for role_id in self._role_ids]
+        return [self.guild.default_role] + [role for role in roles if role is not None]
+
+    @property
+    def guild_permissions(self):
+        value = 0
+        for role in self.roles:
+            value |= role.permissions.value
+        return discord.Permissions(value)
+
+    def _copy(self):
+        return FakeMember(self.guild, self.id, self.name, self._role_ids, self.bot)
+
+    async def add_roles(self, *roles, reason=None):
+        await self.guild.rest.request("add_roles")
+        before = self._copy()
+        self._role_ids.extend(role.id for role in roles if role.id not in self._role_ids)
+        self.guild.log_action(discord.AuditLogAction.member_role_update, self, self.guild.me)
+        self.guild.dispatch("member_update", before, self)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self.guild.rest.request("remove_roles")
+        before = self._copy()
+        removed = {role.id for role in roles}
+        self._role_ids = [role_id for role_id in self._role_ids if role_id not in removed]
+        self.guild.log_action(discord.AuditLogAction.member_role_update, self, self.guild.me)
+        self.guild.dispatch("member_update", before, self)
+
+class FakeGuild:
+    """A guild whose bot-side methods go through SimulatedRest and emit gateway events"""
+
+    def __init__(self, rest):
+        self.id = GUILD_ID
+        self.name = "Simulated Guild"
+        self.owner_id = OWNER_ID
+        self.rest = rest
+        self.cog = None
+        self._channels = {}
+        self._roles = {}
+        self._members = {}
+        self._audit_log = []
+        self._next_id = GUILD_ID + 1000
+        self.banned = set()
+        self.logged_embeds = 0
+        self.first_ban_at = None
+        self.last_restore_at = None
+        self.restored = Counter()
+        self.started = time.perf_counter()
+
+        self.default_role = self._add_role(FakeRole(self, self.id, "@everyone"))
+        self.me = self.add_member("ESCUDO", bot=True, member_id=BOT_ID)
+
+    def new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    @property
+    def channels(self):
+        return list(self._channels.values())
+
+    @property
+    def text_channels(self):
+        return [channel for channel in self._channels.values() if isinstance(channel, discord.TextChannel)]
+
+    @property
+    def roles(self):
+        return list(self._roles.values())
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    def _add_role(self, role):
+        self._roles[role.id] = role
+        return role
+
+    def add_channel(self, cls, name, **options):
+        channel = cls(self, self.new_id(), name, position=len(self._channels), **options)
+        self._channels[channel.id] = channel
+        return channel
+
+    def add_role(self, name, permissions=0):
+        return self._add_role(FakeRole(self, self.new_id(), name, permissions, position=len(self._roles)))
+
+    def add_member(self, name, roles=(), bot=False, member_id=None):
+        member = FakeMember(self, member_id or self.new_id(), name, roles, bot)
+        self._members[member.id] = member
+        return member
+
+    def dispatch(self, event, *args):
+        listener = getattr(self.cog, f"on_{event}", None)
+        if listener is not None:
+            asyncio.create_task(listener(*args))
+
+    def log_action(self, action, target, user):
+        self._audit_log.append(FakeAuditLogEntry(self.new_id(), action, target, user))
+
+    async def audit_logs(self, limit=100):
+        # Newest first, one request per page of 100 like the real paginator
+        entries = self._audit_log if limit is None else self._audit_log[-limit:]
+        for index, entry in enumerate(reversed(entries)):
+            if index % 100 == 0:
+                await self.rest.request("audit_logs")
+            yield entry
+
+    # Attacker actions; they use the attacker's own connection, so they are not counted
+    def attack(self, attacker, action, target):
+        if attacker.id in self.banned:
+            return False
+
+        if action == "channel_delete":
+            del self._channels[target.id]
+            self.log_action(discord.AuditLogAction.channel_delete, target, attacker)
+            self.dispatch("guild_channel_delete", target)
+        elif action == "role_delete":
+            del self._roles[target.id]
+            self.log_action(discord.AuditLogAction.role_delete, target, attacker)
+            self.dispatch("guild_role_delete", target)
+        else:
+            del self._members[target.id]
+            self.banned.add(target.id)
+            self.log_action(discord.AuditLogAction.ban, target, attacker)
+            self.dispatch("member_ban", self, target)
+        return True
+
+    # Bot actions
+    async def ban(self, user, reason=None):
+        await self.rest.request("ban")
+        self.banned.add(user.id)
+        self._members.pop(user.id, None)
+        if user.id == ATTACKER_ID and self.first_ban_at is None:
+            self.first_ban_at = time.perf_counter() - self.started
+        self.log_action(discord.AuditLogAction.ban, user, self.me)
+        self.dispatch("member_ban", self, user)
+
+    async def unban(self, user, reason=None):
+        await self.rest.request("unban")
+        self.banned.discard(user.id)
+        self.restored["unbans"] += 1
+        self.last_restore_at = time.perf_counter() - self.started
+
+    async def create_role(self, name, permissions, colour, hoist, mentionable, reason=None):
+        await self.rest.request("create_role")
+        role = self._add_role(FakeRole(self, self.new_id(), name, permissions.value, 1, colour.value, hoist, mentionable))
+        self._restored("roles")
+        self.dispatch("guild_role_create", role)
+        return role
+
+    async def edit_role_positions(self, positions, reason=None):
+        await self.rest.request("edit_role_positions")
+        for role, position in positions.items():
+            role.position = position
+
+    async def _create_channel(self, cls, route, name, position, overwrites, reason=None, category=None, **options):
+        await self.rest.request(route)
+        channel = cls(self, self.new_id(), name, position, category.id if category else None, overwrites, **options)
+        self._channels[channel.id] = channel
+        self._restored("channels")
+        self.dispatch("guild_channel_create", channel)
+        return channel
+
+    async def create_category(self, **options):
+        return await self._create_channel(FakeCategoryChannel, "create_category", **options)
+
+    async def create_text_channel(self, **options):
+        return await self._create_channel(FakeTextChannel, "create_text_channel", **options)
+
+    async def create_voice_channel(self, **options):
+        return await self._create_channel(FakeVoiceChannel, "create_voice_channel", **options)
+
+    def _restored(self, kind):
+        self.restored[kind] += 1
+        self.last_restore_at = time.perf_counter() - self.started
+
+def build_guild(rest, args):
+    """A guild big enough for the attack, with categories, overwrites, roles and members"""
+    guild = FakeGuild(rest)
+    everyone = guild.default_role
+    locked = discord.PermissionOverwrite(send_messages=False)
+
+    roles = [guild.add_role(f"role-{i}", permissions=1 << 10) for i in range(max(args.roles, 10))]
+    guild.add_member("owner", member_id=OWNER_ID)
+    for i in range(args.bans + 200):
+        guild.add_member(f"member-{i}", roles=[roles[i % len(roles)].id])
+
+    guild.add_channel(FakeTextChannel, "escudo-logs")
+    category = None
+    for i in range(args.channels + 50):
+        if i % 10 == 0:
+            category = guild.add_channel(FakeCategoryChannel, f"category-{i // 10}")
+        overwrites = {everyone: locked} if i % 4 == 0 else {}
+        if i % 5 == 4:
+            guild.add_channel(FakeVoiceChannel, f"voice-{i}", category_id=category.id,
+                              overwrites=overwrites, bitrate=64000, user_limit=0)
+        else:
+            guild.add_channel(FakeTextChannel, f"text-{i}", category_id=category.id,
+                              overwrites=overwrites, topic=f"Channel {i}")
+
+    attacker_role = guild.add_role("compromised-admin", permissions=1 << 3)
+    guild.add_member("attacker", roles=[attacker_role.id], member_id=ATTACKER_ID)
+    return guild
+
+def attack_script(guild, args, rng):
+    """Shuffled (action, target) pairs the attacker works through"""
+    channels = [channel for channel in guild.channels if not isinstance(channel, discord.CategoryChannel)]
+    members = [member for member in guild.members if member.id not in (OWNER_ID, BOT_ID, ATTACKER_ID)]
+    roles = [role for role in guild.roles if not role.is_default() and role.name.startswith("role-")]
+
+    steps = [("channel_delete", channel) for channel in rng.sample(channels, min(args.channels, len(channels)))]
+    steps += [("ban", member) for member in rng.sample(members, min(args.bans, len(members)))]
+    steps += [("role_delete", role) for role in rng.sample(roles, min(args.roles, len(roles)))]
+    rng.shuffle(steps)
+    return steps
+
+async def settle():
+    """Wait for every task the cog started, including restores, retries and log flushes"""
+    current = asyncio.current_task()
+    while True:
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        if not pending:
+            return
+        await asyncio.wait(pending)
+
+async def run(args):
+    from cogs.antinuke import Antinuke
+    from utils.guild_snapshot import GUILD_SNAPSHOTS
+
+    rng = random.Random(args.seed)
+    rest = SimulatedRest(args.latency / 1000, args.ratelimit, args.retry_after, rng)
+
+    tracemalloc.start()
+    guild = build_guild(rest, args)
+    attacker = guild.get_member(ATTACKER_ID)
+
+    class Bot:
+        user = guild.me
+        loop = asyncio.get_running_loop()
+
+        def is_ready(self):
+            return False
+
+    guild.cog = Antinuke(Bot())
+    GUILD_SNAPSHOTS.build(guild)
+    fixtures = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+
+    steps = attack_script(guild, args, rng)
+    interval = args.duration / max(len(steps), 1)
+    guild.started = time.perf_counter()
+
+    landed = 0
+    for action, target in steps:
+        if not guild.attack(attacker, action, target):
+            break
+        landed += 1
+        await asyncio.sleep(interval)
+
+    await settle()
+    elapsed = time.perf_counter() - guild.started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    first_ban = f"{guild.first_ban_at:.2f}s" if guild.first_ban_at is not None else "never"
+    restore = f"{guild.last_restore_at:.2f}s" if guild.last_restore_at is not None else "nothing restored"
+    routes = ", ".join(f"{route} {count}" for route, count in rest.calls.most_common())
+
+    print(f"Attack:            {args.channels} channel deletes, {args.bans} bans, {args.roles} role deletes "
+          f"over {args.duration:.1f}s ({args.latency:.0f}ms latency, {args.ratelimit:.0%} 429s)")
+    print(f"Actions landed:    {landed} of {len(steps)} before the attacker was banned")
+    print(f"Time to first ban: {first_ban}")
+    print(f"Total restore:     {restore} ({guild.restored['channels']} channels, "
+          f"{guild.restored['roles']} roles, {guild.restored['unbans']} unbans)")
+    print(f"API calls:         {sum(rest.calls.values())} ({routes}); {rest.rate_limited} rate limited")
+    print(f"Incident embeds:   {guild.logged_embeds}")
+    print(f"Peak memory:       {peak / 1024 / 1024:.1f} MB above {fixtures / 1024 / 1024:.1f} MB of fixtures")
+    print(f"Settled after:     {elapsed:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--channels", type=int, default=200, help="channels the attacker deletes")
+    parser.add_argument("--bans", type=int, default=50, help="members the attacker bans")
+    parser.add_argument("--roles", type=int, default=0, help="roles the attacker deletes")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds the attack is spread over")
+    parser.add_argument("--latency", type=float, default=80, help="simulated REST latency in ms")
+    parser.add_argument("--ratelimit", type=float, default=0.05, help="fraction of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds a 429 makes the library wait")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = "json"
+    sys.path.insert(0, ROOT)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        asyncio.run(run(args))
+
+        # Write the configs the run cached while the data directory still exists, so atexit has nothing left
+        from utils.helpers import flush_guild_configs
+        flush_guild_configs()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Measure event loop lag while the bot writes warnings.
+
+Runs the same burst of add_warning calls twice against a throwaway data
+directory: once inline on the event loop (the old behaviour) and once
+through the async storage API. Usage:
+
+    python benchmarks/storage_loop_lag.py [--backend json|sqlite] [--writes N] [--seed N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def seed_warnings(count):
+    """Write a warnings history so each JSON write has a realistic amount to re-serialize"""
+    users = {}
+    for i in range(count):
+        warnings = users.setdefault(str(i % 500), [])
+        warnings.append({"id": len(warnings) + 1, "moderator_id": "0", "reason": "seed warning", "timestamp": 0})
+
+    os.makedirs("data", exist_ok=True)
+    with open(os.path.join("data", "warnings.json"), 'w') as f:
+        json.dump({"guilds": {"1": users}}, f, indent=4)
+
+async def measure(label, writer, writes, monitor):
+    monitor.samples.clear()
+    started = time.perf_counter()
+    await writer(writes)
+    elapsed = time.perf_counter() - started
+
+    # Let the monitor take a final sample after the burst
+    await asyncio.sleep(monitor.interval * 2)
+    stats = monitor.stats()
+    print(f"{label:<10} {writes} writes in {elapsed:.2f}s | "
+          f"loop lag avg {stats['average']:.1f}ms, p95 {stats['p95']:.1f}ms, max {stats['max']:.1f}ms")
+
+async def run(args):
+    from utils import db
+    from utils.loop_monitor import LoopLagMonitor
+
+    monitor = LoopLagMonitor(interval=0.01, window=100000)
+    monitor.start()
+
+    async def inline(writes):
+        for i in range(writes):
+            db.add_warning(1, i % 50, 0, "inline")
+            await asyncio.sleep(0)
+
+    async def offloaded(writes):
+        for i in range(writes):
+            await db.add_warning_async(1, i % 50, 0, "offloaded")
+
+    await measure("inline", inline, args.writes, monitor)
+    await measure("offloaded", offloaded, args.writes, monitor)
+    monitor.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"])
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = args.backend
+    sys.path.insert(0, ROOT)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        seed_warnings(args.seed)
+        asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
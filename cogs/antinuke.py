@@ -1,52 +1,138 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
+import time
 from datetime import datetime, timedelta
 from config import CONFIG
 from utils.helpers import (
-    is_whitelisted, add_to_whitelist, remove_from_whitelist, reset_whitelist,
-    get_whitelisted_users, get_guild_config, update_guild_config,
-    is_nightmode_active
+    is_trusted_actor, invalidate_trusted_actors, load_whitelist_async, whitelist_loaded,
+    add_to_whitelist_async, remove_from_whitelist_async,
+    reset_whitelist_async, get_whitelisted_users_async, get_guild_config, update_guild_config,
+    is_nightmode_active, next_nightmode_boundary
 )
 from utils.embeds import success_embed, error_embed, info_embed, warning_embed
+from utils.audit_log import AUDIT_LOGS
+from utils.channel_lock import set_everyone_permission, restore_everyone_permission
+from utils.escalation import gained_dangerous, dangerous_names
+from utils.guild_snapshot import GUILD_SNAPSHOTS
+from utils.incident_log import INCIDENT_LOG, LOG_CHANNEL_NAME
+from utils.mitigation import MITIGATION, CONTAIN, RESTORE, BAN_DEDUPE_TTL
+from utils.scheduler import DeadlineScheduler
+from utils.threshold import (
+    SlidingWindowCounter, RecentTargets, DEFAULT_THRESHOLDS, MAX_COUNT, MAX_WINDOW, antinuke_threshold
+)
 from utils.permission import (
     owner_only, extra_owner_only, admin_only, mod_only, 
     antinuke_whitelisted_only, developer_only, 
-    is_owner, is_extra_owner, is_admin, is_mod
+    is_owner, is_extra_owner, is_admin, is_mod, invalidate_guild_permissions
 )
 
 class Antinuke(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.antinuke_events = {}
-        self.nightmode_check.start()
+        self.action_counter = SlidingWindowCounter()
+        self.recent_bans = RecentTargets()
+        self.nightmode_scheduler = DeadlineScheduler(self.nightmode_transition)
+        
+        # On a cog reload on_ready will not fire again
+        if bot.is_ready():
+            bot.loop.create_task(self.schedule_all_nightmodes())
+            bot.loop.create_task(self.build_snapshots())
     
     def cog_unload(self):
-        self.nightmode_check.cancel()
+        self.nightmode_scheduler.stop()
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.schedule_all_nightmodes()
+        await self.build_snapshots()
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        self.schedule_nightmode(guild.id, datetime.now().timestamp())
+        if get_guild_config(guild.id).get("antinuke", {}).get("enabled", True):
+            GUILD_SNAPSHOTS.build(guild)
+            await load_whitelist_async(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        GUILD_SNAPSHOTS.drop(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_update(self, before, after):
+        # The guild owner is part of the trusted actor set
+        if before.owner_id != after.owner_id:
+            invalidate_trusted_actors(after.id)
+    
+    async def build_snapshots(self):
+        """Snapshot the structure and load the whitelist of every guild with antinuke enabled"""
+        for guild in self.bot.guilds:
+            if get_guild_config(guild.id).get("antinuke", {}).get("enabled", True):
+                GUILD_SNAPSHOTS.build(guild)
+                await load_whitelist_async(guild.id)
+            await asyncio.sleep(0)
     
-    @tasks.loop(minutes=5)
-    async def nightmode_check(self):
-        """Check and enforce nightmode settings for all guilds"""
+    async def schedule_all_nightmodes(self):
+        """Reconcile every guild now; each reconcile books the guild's next boundary"""
+        now = datetime.now().timestamp()
         for guild in self.bot.guilds:
+            self.schedule_nightmode(guild.id, now)
+        self.nightmode_scheduler.start()
+    
+    def schedule_nightmode(self, guild_id, when=None):
+        """Book the guild's next nightmode transition, or a reconcile at `when`"""
+        if when is None:
+            boundary = next_nightmode_boundary(guild_id)
+            if boundary is None:
+                self.nightmode_scheduler.cancel(str(guild_id))
+                return
+            when = boundary.timestamp()
+        self.nightmode_scheduler.schedule(str(guild_id), when)
+    
+    async def nightmode_transition(self, due):
+        """Bring each due guild's channels in line with its nightmode state"""
+        for guild_id, _ in due:
+            guild = self.bot.get_guild(int(guild_id))
+            if not guild:
+                continue
+            
             try:
                 if is_nightmode_active(guild.id):
-                    # Lock all channels during nightmode
-                    config = get_guild_config(guild.id)
-                    ignored_channels = config.get("ignored_channels", [])
-                    
-                    for channel in guild.text_channels:
-                        if str(channel.id) not in ignored_channels:
-                            # Lock channel for @everyone
-                            try:
-                                await channel.set_permissions(guild.default_role, send_messages=False)
-                            except discord.Forbidden:
-                                continue
-            except Exception as e:
-                continue
+                    await self.lock_nightmode_channels(guild)
+                else:
+                    await self.unlock_nightmode_channels(guild)
+            except discord.HTTPException:
+                pass
+            
+            self.schedule_nightmode(guild.id)
+    
+    async def lock_nightmode_channels(self, guild):
+        """Deny send_messages for @everyone, remembering each overwrite it replaces"""
+        config = get_guild_config(guild.id)
+        locked = config.setdefault("nightmode", {}).setdefault("locked_channels", {})
+        ignored_channels = config.get("ignored_channels", [])
+        channels = [channel for channel in guild.text_channels if str(channel.id) not in ignored_channels]
+        
+        await set_everyone_permission(guild, channels, "send_messages", False, locked, "ESCUDO: Nightmode started")
+        update_guild_config(guild.id, config)
     
-    @nightmode_check.before_loop
-    async def before_nightmode_check(self):
-        await self.bot.wait_until_ready()
+    async def unlock_nightmode_channels(self, guild):
+        """Put back exactly the @everyone overwrites that nightmode replaced"""
+        config = get_guild_config(guild.id)
+        locked = config.get("nightmode", {}).get("locked_channels")
+        if not locked:
+            return
+        
+        channels = [guild.get_channel(int(channel_id)) for channel_id in locked]
+        channels = [channel for channel in channels if channel is not None]
+        
+        await restore_everyone_permission(guild, channels, "send_messages", locked, "ESCUDO: Nightmode ended")
+        update_guild_config(guild.id, config)
+    
+    def action_tripped(self, guild, actor_id, action):
+        """Count an unauthorized action; True once the actor exceeds the guild's limit"""
+        count, seconds = antinuke_threshold(get_guild_config(guild.id), action)
+        return self.action_counter.hit((guild.id, actor_id, action), count, seconds)
     
     @commands.command(name="antinuke", aliases=["an"], help="Toggle antinuke protection")
     @admin_only()
@@ -57,9 +143,15 @@ class Antinuke(commands.Cog):
         if status is None:
             # Display current status
             status = "enabled" if config.get("antinuke", {}).get("enabled", True) else "disabled"
+            description = f"Antinuke protection is currently **{status}**."
+            
+            latency = MITIGATION.latency_stats(ctx.guild.id)
+            if latency:
+                description += f"\nContainment latency: **{latency[0]:.0f}ms** last, **{latency[1]:.0f}ms** average"
+            
             await ctx.send(embed=info_embed(
                 title="Antinuke Status",
-                description=f"Antinuke protection is currently **{status}**."
+                description=description
             ))
             return
         
@@ -75,16 +167,73 @@ class Antinuke(commands.Cog):
         config["antinuke"]["enabled"] = enabled
         update_guild_config(ctx.guild.id, config)
         
+        # Only protected guilds keep a structure snapshot
+        if enabled:
+            GUILD_SNAPSHOTS.build(ctx.guild)
+            await load_whitelist_async(ctx.guild.id)
+        else:
+            GUILD_SNAPSHOTS.drop(ctx.guild.id)
+        
         await ctx.send(embed=success_embed(
             title="Antinuke Updated",
             description=f"Antinuke protection is now **{'enabled' if enabled else 'disabled'}**."
         ))
     
+    @commands.command(name="antinukelimit", aliases=["anlimit"], help="Set how many actions trigger antinuke")
+    @admin_only()
+    async def antinukelimit(self, ctx, action: str = None, count: int = None, seconds: int = None):
+        """View or set the per-action antinuke thresholds"""
+        config = get_guild_config(ctx.guild.id)
+        
+        if action is None:
+            # Display the current thresholds
+            lines = []
+            for name in DEFAULT_THRESHOLDS:
+                limit, window = antinuke_threshold(config, name)
+                lines.append(f"`{name}`: **{limit}** in **{window}s**")
+            
+            await ctx.send(embed=info_embed(
+                title="Antinuke Limits",
+                description="\n".join(lines)
+            ))
+            return
+        
+        action = action.lower()
+        if action not in DEFAULT_THRESHOLDS:
+            await ctx.send(embed=error_embed(
+                title="Invalid Action",
+                description=f"Please use one of: {', '.join(f'`{name}`' for name in DEFAULT_THRESHOLDS)}."
+            ))
+            return
+        
+        if count is None or seconds is None:
+            await ctx.send(embed=error_embed(
+                title="Missing Limit",
+                description="Please specify both a count and a window in seconds, e.g. `5 10`."
+            ))
+            return
+        
+        if not (1 <= count <= MAX_COUNT) or not (1 <= seconds <= MAX_WINDOW):
+            await ctx.send(embed=error_embed(
+                title="Invalid Limit",
+                description=f"Count must be between 1 and {MAX_COUNT} and the window between 1 and {MAX_WINDOW} seconds."
+            ))
+            return
+        
+        thresholds = config.setdefault("antinuke", {}).setdefault("thresholds", {})
+        thresholds[action] = {"count": count, "seconds": seconds}
+        update_guild_config(ctx.guild.id, config)
+        
+        await ctx.send(embed=success_embed(
+            title="Antinuke Limit Updated",
+            description=f"✅ `{action}` now triggers after **{count}** action(s) in **{seconds}s**."
+        ))
+    
     @commands.command(name="whitelist", aliases=["wl"], help="Whitelist a user from antinuke")
     @admin_only()
     async def whitelist(self, ctx, user: discord.User):
         """Whitelist a user from the antinuke system"""
-        if add_to_whitelist(ctx.guild.id, user.id):
+        if await add_to_whitelist_async(ctx.guild.id, user.id):
             await ctx.send(embed=success_embed(
                 title="User Whitelisted",
                 description=f"✅ {user.mention} has been whitelisted from antinuke detection."
@@ -99,7 +248,7 @@ class Antinuke(commands.Cog):
     @admin_only()
     async def unwhitelist(self, ctx, user: discord.User):
         """Remove a user from the antinuke whitelist"""
-        if remove_from_whitelist(ctx.guild.id, user.id):
+        if await remove_from_whitelist_async(ctx.guild.id, user.id):
             await ctx.send(embed=success_embed(
                 title="User Unwhitelisted",
                 description=f"✅ {user.mention} has been removed from the whitelist."
@@ -114,7 +263,7 @@ class Antinuke(commands.Cog):
     @admin_only()
     async def wlisted(self, ctx):
         """Show all users whitelisted from antinuke"""
-        whitelisted = get_whitelisted_users(ctx.guild.id)
+        whitelisted = await get_whitelisted_users_async(ctx.guild.id)
         
         if not whitelisted:
             await ctx.send(embed=info_embed(
@@ -161,7 +310,7 @@ class Antinuke(commands.Cog):
             reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
             
             if str(reaction.emoji) == "✅":
-                reset_whitelist(ctx.guild.id)
+                await reset_whitelist_async(ctx.guild.id)
                 await ctx.send(embed=success_embed(
                     title="Whitelist Reset",
                     description="✅ The whitelist has been reset."
@@ -221,6 +370,7 @@ class Antinuke(commands.Cog):
             config["nightmode"]["start_hour"] = start_hour
             config["nightmode"]["end_hour"] = end_hour
             update_guild_config(ctx.guild.id, config)
+            self.schedule_nightmode(ctx.guild.id, datetime.now().timestamp())
             
             await ctx.send(embed=success_embed(
                 title="Nightmode Setup",
@@ -232,6 +382,7 @@ class Antinuke(commands.Cog):
         enabled = status.lower() in ["on", "enable", "enabled"]
         config["nightmode"]["enabled"] = enabled
         update_guild_config(ctx.guild.id, config)
+        self.schedule_nightmode(ctx.guild.id, datetime.now().timestamp())
         
         await ctx.send(embed=success_embed(
             title="Nightmode Updated",
@@ -256,6 +407,8 @@ class Antinuke(commands.Cog):
                 return
             
             CONFIG["extra_owners"][guild_id].append(user.id)
+            invalidate_guild_permissions(guild_id)
+            invalidate_trusted_actors(guild_id)
             await ctx.send(embed=success_embed(
                 title="Extra Owner Added",
                 description=f"✅ {user.mention} has been added as an extra owner."
@@ -270,6 +423,8 @@ class Antinuke(commands.Cog):
                 return
             
             CONFIG["extra_owners"][guild_id].remove(user.id)
+            invalidate_guild_permissions(guild_id)
+            invalidate_trusted_actors(guild_id)
             await ctx.send(embed=success_embed(
                 title="Extra Owner Removed",
                 description=f"✅ {user.mention} has been removed from extra owners."
@@ -351,10 +506,69 @@ class Antinuke(commands.Cog):
         """Add or remove moderator roles (alias for mainrole mod)"""
         await self.mainrole(ctx, "mod", role)
     
+    # Keep the guild structure snapshot current
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        GUILD_SNAPSHOTS.channel_changed(channel)
+        if channel.name == LOG_CHANNEL_NAME:
+            INCIDENT_LOG.forget_channel(channel.guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        GUILD_SNAPSHOTS.channel_changed(after)
+        if before.name != after.name:
+            INCIDENT_LOG.forget_channel(after.guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        GUILD_SNAPSHOTS.role_changed(role)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        GUILD_SNAPSHOTS.member_removed(member)
+    
+    # Antinuke responses, run through the per-guild mitigation queue
+    def contain(self, guild, perpetrator, reason, detected_at):
+        """Ban the perpetrator ahead of everything else; repeat triggers collapse into one ban"""
+        async def ban():
+            await guild.ban(perpetrator, reason=f"ESCUDO Antinuke: {reason}")
+        
+        MITIGATION.submit(guild.id, CONTAIN, ("ban", perpetrator.id), ban, detected_at, BAN_DEDUPE_TTL)
+    
+    def queue_restore(self, guild, perpetrator):
+        """Rebuild every channel and role the perpetrator deleted from the snapshot"""
+        async def restore():
+            await GUILD_SNAPSHOTS.restore_actor(guild, perpetrator.id)
+        
+        MITIGATION.submit(guild.id, RESTORE, ("restore", perpetrator.id), restore)
+    
+    def queue_log(self, guild, embed):
+        """Buffer an incident for the guild's log channel; sends are batched behind containment"""
+        INCIDENT_LOG.log(guild, embed)
+    
+    async def resolve_perpetrator(self, guild, action, target_id):
+        """Return the audit log entry behind an action if its author is not trusted"""
+        entry = await AUDIT_LOGS.resolve(guild, action, target_id)
+        if entry is None:
+            return None
+        
+        if await self.is_trusted(guild, entry.user.id):
+            return None
+        
+        return entry
+    
+    async def is_trusted(self, guild, user_id):
+        """Whitelisted users, owners, extra owners and the bot itself are trusted"""
+        # A whitelist that is not loaded yet is read on the storage executor, never inline
+        if not whitelist_loaded(guild.id):
+            await load_whitelist_async(guild.id)
+        return is_trusted_actor(guild, user_id) or user_id == self.bot.user.id
+    
     # Event listeners for antinuke
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
         """Trigger when a user is banned"""
+        detected_at = time.monotonic()
         if not guild or not user:
             return
         
@@ -363,153 +577,162 @@ class Antinuke(commands.Cog):
             return
         
         # Check audit logs to see who banned the user
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
-                if entry.target.id == user.id:
-                    # Check if the banner is whitelisted
-                    if is_whitelisted(guild.id, entry.user.id) or entry.user.id == self.bot.user.id:
-                        return
-                    
-                    # Unban the user if possible
-                    try:
-                        await guild.unban(user, reason="ESCUDO Antinuke: Unauthorized ban")
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Take action against the banner
-                    try:
-                        await entry.user.ban(reason="ESCUDO Antinuke: Unauthorized ban")
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Log the incident to a defined log channel if available
-                    log_embed = warning_embed(
-                        title="⚠️ Antinuke Triggered",
-                        description=f"**Action:** Unauthorized ban\n**Target:** {user} ({user.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, unbanned target"
-                    )
-                    
-                    # Try to find a log channel
-                    log_channel = discord.utils.get(guild.text_channels, name="escudo-logs")
-                    if log_channel:
-                        await log_channel.send(embed=log_embed)
-        except discord.HTTPException:
-            pass
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.ban, user.id)
+        if entry is None:
+            return
+        
+        # Remember the victim so the bans leading up to a trip are undone too
+        actor_key = (guild.id, entry.user.id)
+        self.recent_bans.add(actor_key, user.id)
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "ban"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized ban", detected_at)
+        
+        # Unban every victim inside the window once the perpetrator is dealt with
+        _, seconds = antinuke_threshold(config, "ban")
+        victim_ids = self.recent_bans.take(actor_key, seconds)
+        for victim_id in victim_ids:
+            async def unban(victim_id=victim_id):
+                await guild.unban(discord.Object(id=victim_id), reason="ESCUDO Antinuke: Unauthorized ban")
+            
+            MITIGATION.submit(guild.id, RESTORE, ("unban", victim_id), unban)
+        
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized ban\n**Target:** {user} ({user.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, unbanned {len(victim_ids)} target(s)"
+        ))
     
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
         """Trigger when a channel is deleted"""
+        detected_at = time.monotonic()
         guild = channel.guild
         if not guild:
             return
         
+        GUILD_SNAPSHOTS.channel_deleted(channel)
+        if channel.name == LOG_CHANNEL_NAME:
+            INCIDENT_LOG.forget_channel(guild.id)
+        
         config = get_guild_config(guild.id)
         if not config.get("antinuke", {}).get("enabled", True):
             return
         
         # Check audit logs
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.channel_delete):
-                if entry.target.id == channel.id:
-                    # Check if the user is whitelisted
-                    if is_whitelisted(guild.id, entry.user.id) or entry.user.id == self.bot.user.id:
-                        return
-                    
-                    # Take action against the user
-                    try:
-                        await entry.user.ban(reason="ESCUDO Antinuke: Unauthorized channel deletion")
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Try to create the channel again
-                    try:
-                        if isinstance(channel, discord.TextChannel):
-                            await guild.create_text_channel(
-                                name=channel.name,
-                                category=channel.category,
-                                position=channel.position,
-                                topic=channel.topic,
-                                nsfw=channel.nsfw,
-                                reason="ESCUDO Antinuke: Channel restoration"
-                            )
-                        elif isinstance(channel, discord.VoiceChannel):
-                            await guild.create_voice_channel(
-                                name=channel.name,
-                                category=channel.category,
-                                position=channel.position,
-                                bitrate=channel.bitrate,
-                                user_limit=channel.user_limit,
-                                reason="ESCUDO Antinuke: Channel restoration"
-                            )
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Log the incident
-                    log_embed = warning_embed(
-                        title="⚠️ Antinuke Triggered",
-                        description=f"**Action:** Unauthorized channel deletion\n**Channel:** {channel.name} ({channel.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, attempted to restore channel"
-                    )
-                    
-                    log_channel = discord.utils.get(guild.text_channels, name="escudo-logs")
-                    if log_channel:
-                        await log_channel.send(embed=log_embed)
-        except discord.HTTPException:
-            pass
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.channel_delete, channel.id)
+        if entry is None:
+            return
+        
+        # Remember who deleted it so a trip restores everything they removed
+        GUILD_SNAPSHOTS.attribute(guild.id, channel.id, entry.user.id)
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "channel_delete"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized channel deletion", detected_at)
+        self.queue_restore(guild, entry.user)
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized channel deletion\n**Channel:** {channel.name} ({channel.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, restoring the channels and roles they deleted"
+        ))
     
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role):
         """Trigger when a role is deleted"""
+        detected_at = time.monotonic()
         guild = role.guild
         if not guild:
             return
         
+        GUILD_SNAPSHOTS.role_deleted(role)
+        
         config = get_guild_config(guild.id)
         if not config.get("antinuke", {}).get("enabled", True):
             return
         
         # Check audit logs
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
-                if entry.target.id == role.id:
-                    # Check if the user is whitelisted
-                    if is_whitelisted(guild.id, entry.user.id) or entry.user.id == self.bot.user.id:
-                        return
-                    
-                    # Take action against the user
-                    try:
-                        await entry.user.ban(reason="ESCUDO Antinuke: Unauthorized role deletion")
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Try to create the role again
-                    try:
-                        await guild.create_role(
-                            name=role.name,
-                            permissions=role.permissions,
-                            colour=role.colour,
-                            hoist=role.hoist,
-                            mentionable=role.mentionable,
-                            reason="ESCUDO Antinuke: Role restoration"
-                        )
-                    except discord.HTTPException:
-                        pass
-                    
-                    # Log the incident
-                    log_embed = warning_embed(
-                        title="⚠️ Antinuke Triggered",
-                        description=f"**Action:** Unauthorized role deletion\n**Role:** {role.name} ({role.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, attempted to restore role"
-                    )
-                    
-                    log_channel = discord.utils.get(guild.text_channels, name="escudo-logs")
-                    if log_channel:
-                        await log_channel.send(embed=log_embed)
-        except discord.HTTPException:
-            pass
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.role_delete, role.id)
+        if entry is None:
+            return
+        
+        # Remember who deleted it so a trip restores everything they removed
+        GUILD_SNAPSHOTS.attribute(guild.id, role.id, entry.user.id)
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "role_delete"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized role deletion", detected_at)
+        self.queue_restore(guild, entry.user)
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized role deletion\n**Role:** {role.name} ({role.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, restoring the channels and roles they deleted"
+        ))
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        """Trigger when a role is edited to grant dangerous permissions"""
+        detected_at = time.monotonic()
+        GUILD_SNAPSHOTS.role_changed(after)
+        
+        # Integer diff against the dangerous mask; most role edits stop here
+        gained = gained_dangerous(before.permissions.value, after.permissions.value)
+        if not gained:
+            return
+        
+        guild = after.guild
+        config = get_guild_config(guild.id)
+        if not config.get("antinuke", {}).get("enabled", True):
+            return
+        
+        # Check audit logs to see who edited the role
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.role_update, after.id)
+        if entry is None:
+            return
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "role_escalation"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized role permission escalation", detected_at)
+        
+        # Taking the gained permissions back off the role is containment too
+        async def revert():
+            permissions = discord.Permissions(after.permissions.value & ~gained)
+            await after.edit(permissions=permissions, reason="ESCUDO Antinuke: Reverting permission escalation")
+        
+        MITIGATION.submit(guild.id, CONTAIN, ("revert", after.id), revert, detected_at)
+        
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized role permission escalation\n**Role:** {after.name} ({after.id})\n**Permissions:** {dangerous_names(gained)}\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, reverted the role's permissions"
+        ))
     
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
-        """Trigger when a member's roles change (to detect admin role additions)"""
-        # Check for dangerous permission changes
-        if before.guild_permissions == after.guild_permissions:
+        """Trigger when a member is given roles with dangerous permissions"""
+        detected_at = time.monotonic()
+        
+        # Compare role ids first; nickname, avatar and similar updates stop here
+        before_roles = {role.id for role in before.roles}
+        added = [role for role in after.roles if role.id not in before_roles]
+        if not added and len(after.roles) == len(before_roles):
+            return
+        
+        GUILD_SNAPSHOTS.member_changed(after)
+        
+        # Dangerous bits carried by the new roles that the member did not already have
+        granted = 0
+        for role in added:
+            granted |= role.permissions.value
+        if not gained_dangerous(0, granted):
+            return
+        gained = gained_dangerous(before.guild_permissions.value, granted)
+        if not gained:
             return
         
         guild = after.guild
@@ -517,41 +740,98 @@ class Antinuke(commands.Cog):
         if not config.get("antinuke", {}).get("enabled", True):
             return
         
-        # Check if they gained administrator permissions
-        if not before.guild_permissions.administrator and after.guild_permissions.administrator:
-            # Check audit logs to see who gave them the permissions
-            try:
-                async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.member_role_update):
-                    if entry.target.id == after.id:
-                        # Check if the user is whitelisted
-                        if is_whitelisted(guild.id, entry.user.id) or entry.user.id == self.bot.user.id:
-                            return
-                        
-                        # Take action against the user
-                        try:
-                            await entry.user.ban(reason="ESCUDO Antinuke: Unauthorized admin permission grant")
-                        except discord.HTTPException:
-                            pass
-                        
-                        # Remove the admin roles from the target
-                        for role in after.roles:
-                            if role.permissions.administrator:
-                                try:
-                                    await after.remove_roles(role, reason="ESCUDO Antinuke: Removing unauthorized admin role")
-                                except discord.HTTPException:
-                                    pass
-                        
-                        # Log the incident
-                        log_embed = warning_embed(
-                            title="⚠️ Antinuke Triggered",
-                            description=f"**Action:** Unauthorized admin permission grant\n**Target:** {after} ({after.id})\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, removed admin roles from target"
-                        )
-                        
-                        log_channel = discord.utils.get(guild.text_channels, name="escudo-logs")
-                        if log_channel:
-                            await log_channel.send(embed=log_embed)
-            except discord.HTTPException:
-                pass
+        # Check audit logs to see who gave them the roles
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.member_role_update, after.id)
+        if entry is None:
+            return
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "permission_grant"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized dangerous permission grant", detected_at)
+        
+        # Stripping the granted roles from the target is containment too
+        async def strip():
+            roles = [role for role in added if gained_dangerous(0, role.permissions.value) & gained]
+            await after.remove_roles(*roles, reason="ESCUDO Antinuke: Removing unauthorized dangerous role")
+        
+        MITIGATION.submit(guild.id, CONTAIN, ("strip", after.id), strip, detected_at)
+        
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized dangerous permission grant\n**Target:** {after} ({after.id})\n**Permissions:** {dangerous_names(gained)}\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator, removed the granted roles from target"
+        ))
+    
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel):
+        """Trigger when webhooks are created in a channel"""
+        detected_at = time.monotonic()
+        guild = channel.guild
+        config = get_guild_config(guild.id)
+        if not config.get("antinuke", {}).get("enabled", True):
+            return
+        
+        # The event does not say which webhook changed, so claim the next creation entry
+        entry = await AUDIT_LOGS.claim(guild, discord.AuditLogAction.webhook_create)
+        if entry is None:
+            return
+        if await self.is_trusted(guild, entry.user.id):
+            return
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "webhook_create"):
+            return
+        
+        perpetrator = entry.user
+        self.contain(guild, perpetrator, "Unauthorized webhook creation", detected_at)
+        
+        # Deleting every webhook the perpetrator made stops the spam they carry
+        async def delete_webhooks():
+            for webhook in await guild.webhooks():
+                if webhook.user and webhook.user.id == perpetrator.id:
+                    await webhook.delete(reason="ESCUDO Antinuke: Unauthorized webhook")
+        
+        MITIGATION.submit(guild.id, CONTAIN, ("webhooks", perpetrator.id), delete_webhooks, detected_at)
+        
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized webhook creation\n**Channel:** {channel.name} ({channel.id})\n**Perpetrator:** {perpetrator} ({perpetrator.id})\n**Action Taken:** Banned perpetrator, deleted their webhooks"
+        ))
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        """Trigger when a bot with dangerous permissions is added"""
+        detected_at = time.monotonic()
+        if not member.bot:
+            return
+        
+        # Bots added without dangerous permissions are harmless until granted some
+        permissions = gained_dangerous(0, member.guild_permissions.value)
+        if not permissions:
+            return
+        
+        guild = member.guild
+        config = get_guild_config(guild.id)
+        if not config.get("antinuke", {}).get("enabled", True):
+            return
+        
+        # Check audit logs to see who added the bot
+        entry = await self.resolve_perpetrator(guild, discord.AuditLogAction.bot_add, member.id)
+        if entry is None:
+            return
+        
+        # Only act once the actor exceeds the guild's limit for this action
+        if not self.action_tripped(guild, entry.user.id, "bot_add"):
+            return
+        
+        self.contain(guild, entry.user, "Unauthorized bot addition", detected_at)
+        self.contain(guild, member, "Bot added without authorization", detected_at)
+        
+        self.queue_log(guild, warning_embed(
+            title="⚠️ Antinuke Triggered",
+            description=f"**Action:** Unauthorized bot addition\n**Bot:** {member} ({member.id})\n**Permissions:** {dangerous_names(permissions)}\n**Perpetrator:** {entry.user} ({entry.user.id})\n**Action Taken:** Banned perpetrator and the bot"
+        ))
 
 async def setup(bot):
     await bot.add_cog(Antinuke(bot))
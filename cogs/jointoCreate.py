@@ -5,8 +5,8 @@ import datetime
 from config import CONFIG
 from utils.helpers import (
     is_mod, is_admin, is_owner, get_guild_config, update_guild_config,
-    get_join_to_create_config, update_join_to_create_config,
-    add_temp_channel, remove_temp_channel
+    get_join_to_create_config_async, update_join_to_create_config_async,
+    add_temp_channel_async, remove_temp_channel_async
 )
 from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed
@@ -61,14 +61,14 @@ class JoinToCreate(commands.Cog):
                 return
         
         # Get the config
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         
         # Update the config
         config["setup_channel"] = str(channel.id)
         if category:
             config["category"] = str(category.id)
         
-        update_join_to_create_config(ctx.guild.id, config)
+        await update_join_to_create_config_async(ctx.guild.id, config)
         
         await ctx.send(embed=success_embed(
             title="Join to Create Setup",
@@ -80,7 +80,7 @@ class JoinToCreate(commands.Cog):
     async def remove(self, ctx):
         """Remove the Join to Create system"""
         # Get the config
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         
         if not config.get("setup_channel"):
             await ctx.send(embed=error_embed(
@@ -127,7 +127,7 @@ class JoinToCreate(commands.Cog):
             config["category"] = None
             config["temp_channels"] = []
             
-            update_join_to_create_config(ctx.guild.id, config)
+            await update_join_to_create_config_async(ctx.guild.id, config)
             
             await ctx.send(embed=success_embed(
                 title="Join to Create Removed",
@@ -154,7 +154,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -214,7 +214,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -276,7 +276,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -322,7 +322,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -368,7 +368,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -411,7 +411,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -496,7 +496,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -551,7 +551,7 @@ class JoinToCreate(commands.Cog):
         voice_channel = ctx.author.voice.channel
         
         # Check if it's a temporary channel
-        config = get_join_to_create_config(ctx.guild.id)
+        config = await get_join_to_create_config_async(ctx.guild.id)
         if str(voice_channel.id) not in config.get("temp_channels", []):
             await ctx.send(embed=error_embed(
                 title="Not a Temporary Channel",
@@ -623,7 +623,7 @@ class JoinToCreate(commands.Cog):
         
         # Handle channel creation
         if after.channel:
-            config = get_join_to_create_config(member.guild.id)
+            config = await get_join_to_create_config_async(member.guild.id)
             setup_channel_id = config.get("setup_channel")
             
             # Check if the user joined the setup channel
@@ -656,8 +656,8 @@ class JoinToCreate(commands.Cog):
                     await member.move_to(new_channel, reason="Join to Create channel")
                     
                     # Add the channel to the temporary channels list
-                    config = get_join_to_create_config(member.guild.id)
-                    add_temp_channel(member.guild.id, new_channel.id)
+                    config = await get_join_to_create_config_async(member.guild.id)
+                    await add_temp_channel_async(member.guild.id, new_channel.id)
                     
                     # Store the channel owner
                     self.voice_channels[str(new_channel.id)] = member.id
@@ -687,7 +687,7 @@ class JoinToCreate(commands.Cog):
         
         # Handle channel deletion
         if before.channel:
-            config = get_join_to_create_config(member.guild.id)
+            config = await get_join_to_create_config_async(member.guild.id)
             
             # Skip the setup channel
             setup_channel_id = config.get("setup_channel")
@@ -702,8 +702,8 @@ class JoinToCreate(commands.Cog):
                         await before.channel.delete(reason="Empty Join to Create channel")
                         
                         # Remove the channel from the temporary channels list
-                        config = get_join_to_create_config(member.guild.id)
-                        remove_temp_channel(member.guild.id, before.channel.id)
+                        config = await get_join_to_create_config_async(member.guild.id)
+                        await remove_temp_channel_async(member.guild.id, before.channel.id)
                         
                         # Remove the channel owner
                         if str(before.channel.id) in self.voice_channels:
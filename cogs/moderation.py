@@ -1,8 +1,10 @@
 import discord
 from discord.ext import commands
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import re
+import shlex
+import time
 from typing import Optional, Union
 from config import CONFIG
 from utils.helpers import (
@@ -13,15 +15,77 @@ from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed
 )
 from utils.db import (
-    add_warning, get_warnings, remove_warning, clear_warnings,
-    add_mute, remove_mute, is_muted
+    add_warning_async, get_warnings_async, remove_warning_async, clear_warnings_async,
+    add_mute_async, remove_mute_async, get_mute_async, get_timed_mutes_async
 )
+from utils.scheduler import DeadlineScheduler
+from utils.bulk import stream_bounded
+from utils.bulk_jobs import BulkJobRunner, ROLE_JOB_CONCURRENCY, PROGRESS_INTERVAL
+from utils.channel_lock import set_everyone_permission, restore_everyone_permission
+from utils.snipe import SNIPES
+from utils.message_pipeline import MESSAGE_PIPELINE
+from utils.purge import PurgeFilter, purge_channel, URL_PATTERN, BULK_DELETE_SIZE, MAX_PURGE_AMOUNT
+
+# Unbans kept in flight; the ban routes share one per-guild rate limit bucket
+UNBAN_CONCURRENCY = 4
+# Discord keeps audit log entries for 45 days, which bounds ban age filters
+AUDIT_LOG_RETENTION_DAYS = 45
+# Discord caps member timeouts at 28 days; role mutes follow the same limit
+MAX_MUTE_SECONDS = 60 * 60 * 24 * 28
+MUTE_MODES = ("role", "timeout")
+
+TIME_UNITS = {
+    's': 1,               # seconds
+    'm': 60,              # minutes
+    'h': 60 * 60,         # hours
+    'd': 60 * 60 * 24,    # days
+    'w': 60 * 60 * 24 * 7 # weeks
+}
+
+def bulk_edit_summary(skipped, failed):
+    """Extra result lines for a bulk channel edit"""
+    summary = ""
+    if skipped:
+        summary += f"\n{skipped} channel(s) needed no change."
+    if failed:
+        summary += f"\n{failed} channel(s) could not be changed."
+    return summary
+
+def parse_duration(text):
+    """Seconds in a `<number><unit>` duration such as 10s, 5m, 2h, 1d or 1w; None if malformed"""
+    match = re.match(r"^(\d+)([smhdw])$", text)
+    if not match:
+        return None
+    amount, unit = match.groups()
+    return int(amount) * TIME_UNITS[unit]
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.snipe_messages = {}
-        self.mute_tasks = {}
+        self.mute_scheduler = DeadlineScheduler(self.expire_mutes)
+        self.role_jobs = BulkJobRunner(bot)
+        self.role_jobs.register("role_add", self.role_job_targets, self.apply_role_job, ROLE_JOB_CONCURRENCY)
+        MESSAGE_PIPELINE.register(
+            "media_channels",
+            lambda context: context.message.channel.id in context.state.media_channels,
+            self.media_channel_stage
+        )
+        
+        # On a cog reload on_ready will not fire again
+        if bot.is_ready():
+            bot.loop.create_task(self.rehydrate_mutes())
+            bot.loop.create_task(self.role_jobs.resume())
+    
+    def cog_unload(self):
+        self.mute_scheduler.stop()
+        self.role_jobs.stop()
+        MESSAGE_PIPELINE.unregister("media_channels")
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pick up timed mutes and bulk role jobs that were stored before the restart"""
+        await self.rehydrate_mutes()
+        await self.role_jobs.resume()
     
     @commands.Cog.listener()
     async def on_message_delete(self, message):
@@ -29,24 +93,23 @@ class Moderation(commands.Cog):
         if message.author.bot:
             return
         
-        channel_id = str(message.channel.id)
-        
-        if channel_id not in self.snipe_messages:
-            self.snipe_messages[channel_id] = []
-        
-        # Keep only the last 10 deleted messages per channel
-        if len(self.snipe_messages[channel_id]) >= 10:
-            self.snipe_messages[channel_id].pop(0)
+        SNIPES.add_deleted(message)
+    
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        """Store the previous content of edited messages for the editsnipe command"""
+        # Embeds unfurling also fire edits; only a content change is worth sniping
+        if before.author.bot or before.content == after.content:
+            return
         
-        self.snipe_messages[channel_id].append({
-            'content': message.content or "[No content]",
-            'author': message.author,
-            'avatar_url': message.author.display_avatar.url,
-            'created_at': message.created_at
-        })
+        SNIPES.add_edited(before, after)
     
-    async def get_mute_role(self, guild):
-        """Get or create a mute role for the guild"""
+    def mute_mode(self, guild):
+        """How the guild mutes: "role" (Muted role overwrites) or "timeout" (Discord member timeout)"""
+        return get_guild_config(guild.id).get("mute_mode", "role")
+    
+    def find_mute_role(self, guild):
+        """Get the guild's mute role if one already exists, without creating it"""
         config = get_guild_config(guild.id)
         muted_role_id = config.get("muted_role")
         
@@ -62,8 +125,16 @@ class Moderation(commands.Cog):
             # Save the role ID
             config["muted_role"] = str(role.id)
             update_guild_config(guild.id, config)
+        return role
+    
+    async def get_mute_role(self, guild):
+        """Get or create a mute role for the guild"""
+        role = self.find_mute_role(guild)
+        if role:
             return role
         
+        config = get_guild_config(guild.id)
+        
         # Create a new mute role
         try:
             muted_role = await guild.create_role(
@@ -86,58 +157,77 @@ class Moderation(commands.Cog):
         except discord.Forbidden:
             return None
     
-    async def schedule_unmute(self, guild_id, user_id, duration):
-        """Schedule an unmute task for a user"""
-        task_key = f"{guild_id}_{user_id}"
+    async def rehydrate_mutes(self):
+        """Load every timed mute from storage into the expiry scheduler"""
+        for guild_id, user_id, expire_time in await get_timed_mutes_async():
+            self.mute_scheduler.schedule((str(guild_id), str(user_id)), expire_time)
         
-        # Cancel any existing unmute task for this user
-        if task_key in self.mute_tasks:
-            self.mute_tasks[task_key].cancel()
+        # Mutes that expired while the bot was offline are due immediately and get handled in one batch
+        self.mute_scheduler.start()
+    
+    async def schedule_unmute(self, guild_id, user_id, duration):
+        """Schedule an unmute for a user"""
+        expire_time = datetime.now().timestamp() + duration.total_seconds()
+        self.mute_scheduler.schedule((str(guild_id), str(user_id)), expire_time)
+    
+    async def timeout_member(self, guild, member, moderator, seconds, reason, audit_reason, source="mute"):
+        """Mute with a native timeout: one request, recorded and scheduled like a role mute
+
+        The record's source says which command applied the timeout, so mute
+        and chatban only ever lift their own.
+        """
+        await member.timeout(discord.utils.utcnow() + timedelta(seconds=seconds), reason=audit_reason)
+        await add_mute_async(guild.id, member.id, moderator.id, reason, datetime.now().timestamp() + seconds, source)
+        await self.schedule_unmute(str(guild.id), str(member.id), timedelta(seconds=seconds))
+    
+    async def lift_mute(self, member, reason, mute_role=None):
+        """Clear a mute of either mode: an active timeout and the mute role, whichever the member has"""
+        if member.is_timed_out():
+            await member.timeout(None, reason=reason)
+        
+        mute_role = mute_role or self.find_mute_role(member.guild)
+        if mute_role and mute_role in member.roles:
+            await member.remove_roles(mute_role, reason=reason)
+    
+    async def expire_mutes(self, due):
+        """Lift a batch of expired mutes, resolving each guild's mute role once"""
+        by_guild = {}
+        for (guild_id, user_id), _ in due:
+            by_guild.setdefault(guild_id, []).append(user_id)
+        
+        for guild_id, user_ids in by_guild.items():
+            guild = self.bot.get_guild(int(guild_id))
+            # Expired timeouts end on Discord's side; only a role mute needs a request
+            mute_role = self.find_mute_role(guild) if guild else None
+            
+            for user_id in user_ids:
+                # The scheduler already popped this batch, so one failing member must not drop the rest
+                try:
+                    await self.expire_mute(guild, guild_id, user_id, mute_role)
+                except Exception as e:
+                    print(f"Mute expiry failed for {user_id} in {guild_id}: {e}")
+    
+    async def expire_mute(self, guild, guild_id, user_id, mute_role):
+        await remove_mute_async(guild_id, user_id)
         
-        # Create a new unmute task
-        guild = self.bot.get_guild(int(guild_id))
-        if not guild:
+        member = guild.get_member(int(user_id)) if guild else None
+        if not member:
             return
         
-        async def unmute_task():
-            await asyncio.sleep(duration.total_seconds())
-            
-            # If the bot was restarted, this task might not be valid anymore
-            if task_key not in self.mute_tasks:
-                return
-            
-            # Remove the mute
-            member = guild.get_member(int(user_id))
-            if not member:
-                remove_mute(guild_id, user_id)
-                return
-            
-            mute_role = await self.get_mute_role(guild)
-            if not mute_role:
-                return
+        try:
+            await self.lift_mute(member, "ESCUDO: Mute duration expired", mute_role)
             
+            # Try to DM the user
             try:
-                await member.remove_roles(mute_role, reason="ESCUDO: Mute duration expired")
-                remove_mute(guild_id, user_id)
-                
-                # Try to DM the user
-                try:
-                    await member.send(embed=success_embed(
-                        title="Mute Expired",
-                        description=f"Your mute in **{guild.name}** has expired."
-                    ))
-                except discord.Forbidden:
-                    pass
-                
-            except discord.Forbidden:
+                await member.send(embed=success_embed(
+                    title="Mute Expired",
+                    description=f"Your mute in **{guild.name}** has expired."
+                ))
+            except discord.HTTPException:
                 pass
             
-            # Remove the task from the list
-            del self.mute_tasks[task_key]
-        
-        # Start the task
-        task = asyncio.create_task(unmute_task())
-        self.mute_tasks[task_key] = task
+        except discord.HTTPException:
+            pass
     
     @commands.command(name="prefix", help="Change the command prefix for this server")
     @commands.check(is_admin)
@@ -256,14 +346,75 @@ class Moderation(commands.Cog):
                 description="I don't have permission to unban users."
             ))
     
-    @commands.command(name="unbanall", help="Unban all users from the server")
+    async def ban_filter(self, guild, filters):
+        """Build a predicate on ban entries from `reason:<text>`, `older:<duration>` and `newer:<duration>`
+
+        Raises ValueError with a user-facing message for malformed filters.
+        """
+        reason = None
+        older = newer = None
+        
+        for token in shlex.split(filters or ""):
+            key, _, value = token.partition(":")
+            key = key.lower()
+            if key == "reason" and value:
+                reason = value.lower()
+            elif key in ("older", "newer"):
+                seconds = parse_duration(value.lower())
+                if seconds is None:
+                    raise ValueError(f"`{token}` needs a duration like `7d` or `12h`.")
+                if seconds > AUDIT_LOG_RETENTION_DAYS * 24 * 60 * 60:
+                    raise ValueError(f"Ban age filters can look back at most {AUDIT_LOG_RETENTION_DAYS} days.")
+                if key == "older":
+                    older = seconds
+                else:
+                    newer = seconds
+            else:
+                raise ValueError(f"Unknown filter `{token}`. Use `reason:<text>`, `older:<duration>` or `newer:<duration>`.")
+        
+        # Ban entries carry no date, so ban times come from the audit log
+        ban_times = {}
+        if older is not None or newer is not None:
+            cutoff = discord.utils.utcnow() - timedelta(seconds=max(older or 0, newer or 0))
+            # Paging with `after` runs oldest first, so a user's latest ban overwrites earlier ones
+            async for entry in guild.audit_logs(action=discord.AuditLogAction.ban, after=cutoff, limit=None):
+                if entry.target is not None:
+                    ban_times[entry.target.id] = entry.created_at
+        
+        now = discord.utils.utcnow()
+        
+        def matches(entry):
+            if reason is not None and reason not in (entry.reason or "").lower():
+                return False
+            
+            # A ban missing from the audit window is older than every allowed filter
+            banned_at = ban_times.get(entry.user.id)
+            if older is not None and banned_at is not None and (now - banned_at).total_seconds() < older:
+                return False
+            if newer is not None and (banned_at is None or (now - banned_at).total_seconds() > newer):
+                return False
+            return True
+        
+        return matches
+    
+    @commands.command(name="unbanall", help="Unban all users, optionally filtered by reason:<text>, older:<duration> or newer:<duration>")
     @commands.has_permissions(administrator=True)
-    async def unbanall(self, ctx):
-        """Unban all users from the server"""
-        # Ask for confirmation
+    async def unbanall(self, ctx, *, filters: str = None):
+        """Unban all users from the server, streaming the ban list page by page"""
+        try:
+            matches = await self.ban_filter(ctx.guild, filters)
+        except ValueError as e:
+            await ctx.send(embed=error_embed(
+                title="Invalid Filter",
+                description=str(e)
+            ))
+            return
+        
+        # Confirm before reading the ban list; matches are counted while the single unban pass streams it
+        target = f"all banned users matching `{filters}`" if filters else "all banned users"
         confirmation = await ctx.send(embed=warning_embed(
             title="Unban All Confirmation",
-            description="⚠️ Are you sure you want to unban all users? This cannot be undone.\nReact with ✅ to confirm or ❌ to cancel."
+            description=f"⚠️ Are you sure you want to unban {target}? This cannot be undone.\nReact with ✅ to confirm or ❌ to cancel."
         ))
         
         await confirmation.add_reaction("✅")
@@ -282,50 +433,70 @@ class Moderation(commands.Cog):
                     description="Operation has been cancelled."
                 ))
                 return
-            
-            # Get all bans
-            ban_list = [entry async for entry in ctx.guild.bans()]
-            
-            if not ban_list:
-                await ctx.send(embed=info_embed(
-                    title="No Bans",
-                    description="There are no banned users in this server."
-                ))
-                return
-            
-            unbanned_count = 0
-            
-            # Send initial progress message
-            progress_msg = await ctx.send(embed=info_embed(
-                title="Unbanning Users",
-                description=f"Unbanning 0/{len(ban_list)} users..."
-            ))
-            
-            # Unban each user
-            for entry in ban_list:
-                try:
-                    await ctx.guild.unban(entry.user, reason=f"Mass unban initiated by {ctx.author}")
-                    unbanned_count += 1
-                    
-                    # Update progress every 5 unbans
-                    if unbanned_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Unbanning Users",
-                            description=f"Unbanning {unbanned_count}/{len(ban_list)} users..."
-                        ))
-                except:
-                    continue
-            
-            await ctx.send(embed=success_embed(
-                title="Mass Unban Complete",
-                description=f"✅ Successfully unbanned {unbanned_count} users."
-            ))
         
         except asyncio.TimeoutError:
             await ctx.send(embed=info_embed(
                 title="Unban All Cancelled",
                 description="Confirmation timed out after 60 seconds."
             ))
+            return
+        
+        progress = {"scanned": 0, "unbanned": 0, "failed": 0}
+        started = time.monotonic()
+        
+        def describe():
+            processed = progress["unbanned"] + progress["failed"]
+            elapsed = max(time.monotonic() - started, 0.001)
+            return (f"Unbanned **{progress['unbanned']}** users ({progress['failed']} failed), "
+                    f"{progress['scanned']} bans scanned\n"
+                    f"**Speed:** {processed / elapsed:.1f}/s")
+        
+        # Send initial progress message
+        progress_msg = await ctx.send(embed=info_embed(
+            title="Unbanning Users",
+            description="Reading the ban list..."
+        ))
+        
+        async def report():
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                try:
+                    await progress_msg.edit(embed=info_embed(title="Unbanning Users", description=describe()))
+                except discord.HTTPException:
+                    pass
+        
+        async def matching_bans():
+            async for entry in ctx.guild.bans(limit=None):
+                progress["scanned"] += 1
+                if matches(entry):
+                    yield entry
+        
+        async def unban(entry):
+            try:
+                await ctx.guild.unban(entry.user, reason=f"Mass unban initiated by {ctx.author}")
+            except discord.HTTPException:
+                progress["failed"] += 1
+                raise
+            progress["unbanned"] += 1
+        
+        reporter = asyncio.create_task(report())
+        try:
+            await stream_bounded(unban, matching_bans(), UNBAN_CONCURRENCY)
+        finally:
+            reporter.cancel()
+        
+        if not progress["unbanned"] and not progress["failed"]:
+            await progress_msg.edit(embed=info_embed(
+                title="No Bans",
+                description="There are no banned users matching those filters." if filters else "There are no banned users in this server."
+            ))
+            return
+        
+        await progress_msg.edit(embed=success_embed(
+            title="Mass Unban Complete",
+            description=f"✅ Successfully unbanned {progress['unbanned']} users in {timedelta(seconds=int(time.monotonic() - started))}."
+                        + (f"\n{progress['failed']} unban(s) failed." if progress["failed"] else "")
+        ))
     
     @commands.command(name="kick", help="Kick a user from the server")
     @commands.has_permissions(kick_members=True)
@@ -384,7 +555,7 @@ class Moderation(commands.Cog):
             return
         
         # Add the warning
-        warning_id = add_warning(ctx.guild.id, member.id, ctx.author.id, reason)
+        warning_id = await add_warning_async(ctx.guild.id, member.id, ctx.author.id, reason)
         
         # Send a DM to the user if possible
         try:
@@ -405,7 +576,7 @@ class Moderation(commands.Cog):
     @commands.check(is_mod)
     async def warnings(self, ctx, member: discord.Member):
         """View all warnings for a user"""
-        warnings = get_warnings(ctx.guild.id, member.id)
+        warnings = await get_warnings_async(ctx.guild.id, member.id)
         
         if not warnings:
             await ctx.send(embed=info_embed(
@@ -438,7 +609,7 @@ class Moderation(commands.Cog):
     @commands.check(is_mod)
     async def unwarn(self, ctx, member: discord.Member, warning_id: int):
         """Remove a specific warning from a user"""
-        if remove_warning(ctx.guild.id, member.id, warning_id):
+        if await remove_warning_async(ctx.guild.id, member.id, warning_id):
             await ctx.send(embed=success_embed(
                 title="Warning Removed",
                 description=f"✅ Warning #{warning_id} has been removed from {member.mention}"
@@ -453,7 +624,7 @@ class Moderation(commands.Cog):
     @commands.check(is_admin)
     async def clearwarns(self, ctx, member: discord.Member):
         """Clear all warnings for a user"""
-        if clear_warnings(ctx.guild.id, member.id):
+        if await clear_warnings_async(ctx.guild.id, member.id):
             await ctx.send(embed=success_embed(
                 title="Warnings Cleared",
                 description=f"✅ All warnings have been cleared for {member.mention}"
@@ -464,6 +635,40 @@ class Moderation(commands.Cog):
                 description=f"{member.mention} has no warnings to clear."
             ))
     
+    @commands.command(name="mutemode", help="Choose how mute and chatban work: role or timeout")
+    @commands.check(is_admin)
+    async def mutemode(self, ctx, mode: str = None):
+        """Switch between Muted role overwrites and Discord's native member timeout"""
+        config = get_guild_config(ctx.guild.id)
+        
+        if mode is None:
+            await ctx.send(embed=info_embed(
+                title="Current Mute Mode",
+                description=f"The current mute mode is `{config.get('mute_mode', 'role')}`"
+            ))
+            return
+        
+        mode = mode.lower()
+        if mode not in MUTE_MODES:
+            await ctx.send(embed=error_embed(
+                title="Invalid Mode",
+                description="Mute mode must be `role` or `timeout`."
+            ))
+            return
+        
+        config["mute_mode"] = mode
+        update_guild_config(ctx.guild.id, config)
+        
+        if mode == "timeout":
+            description = "✅ Mute and chatban now use Discord timeouts (at most 28 days, so mutes without a duration last 28 days)."
+        else:
+            description = "✅ Mute and chatban now use the Muted role and channel overwrites."
+        
+        await ctx.send(embed=success_embed(
+            title="Mute Mode Changed",
+            description=description
+        ))
+    
     @commands.command(name="mute", help="Mute a user")
     @commands.check(is_mod)
     async def mute(self, ctx, member: discord.Member, duration: Optional[str] = None, *, reason="No reason provided"):
@@ -476,40 +681,42 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Check if the user is already muted
-        if is_muted(ctx.guild.id, member.id):
+        # Check if the user is already muted; a chatban timeout cannot hold a mute on top of it
+        mute_data = await get_mute_async(ctx.guild.id, member.id)
+        if mute_data is not None and mute_data["source"] == "chatban":
+            await ctx.send(embed=error_embed(
+                title="Chat Banned",
+                description=f"{member.mention} is chat banned. Use `chatunban` before muting them."
+            ))
+            return
+        if mute_data is not None:
             await ctx.send(embed=error_embed(
                 title="Already Muted",
                 description=f"{member.mention} is already muted."
             ))
             return
         
+        timeout_mode = self.mute_mode(ctx.guild) == "timeout"
+        
+        # Timeouts cannot be permanent, so timeout mode falls back to the longest one
+        if duration is None and timeout_mode:
+            duration = "28d"
+        
         # Parse duration if provided
         expire_time = None
         if duration:
-            time_units = {
-                's': 1,               # seconds
-                'm': 60,              # minutes
-                'h': 60 * 60,         # hours
-                'd': 60 * 60 * 24,    # days
-                'w': 60 * 60 * 24 * 7 # weeks
-            }
-            
-            match = re.match(r"^(\d+)([smhdw])$", duration)
-            if not match:
+            seconds = parse_duration(duration)
+            if seconds is None:
                 await ctx.send(embed=error_embed(
                     title="Invalid Duration",
                     description="Duration must be in the format `<number><unit>` (e.g. 10s, 5m, 2h, 1d, 1w)"
                 ))
                 return
             
-            amount, unit = match.groups()
-            seconds = int(amount) * time_units[unit]
             expire_time = datetime.now() + timedelta(seconds=seconds)
             
             # Don't allow mutes longer than 28 days
-            max_seconds = 60 * 60 * 24 * 28
-            if seconds > max_seconds:
+            if seconds > MAX_MUTE_SECONDS:
                 await ctx.send(embed=error_embed(
                     title="Duration Too Long",
                     description="Mute duration cannot be longer than 28 days."
@@ -517,8 +724,8 @@ class Moderation(commands.Cog):
                 return
         
         # Get the mute role
-        mute_role = await self.get_mute_role(ctx.guild)
-        if not mute_role:
+        mute_role = None if timeout_mode else await self.get_mute_role(ctx.guild)
+        if not mute_role and not timeout_mode:
             await ctx.send(embed=error_embed(
                 title="Mute Role Error",
                 description="Could not create or find a Muted role."
@@ -526,19 +733,22 @@ class Moderation(commands.Cog):
             return
         
         try:
-            # Add the mute role
-            await member.add_roles(mute_role, reason=f"{reason} | Muted by {ctx.author}")
-            
-            # Add mute to database
-            add_mute(
-                ctx.guild.id, member.id, ctx.author.id, reason,
-                expire_time.timestamp() if expire_time else None
-            )
-            
-            # Schedule unmute if duration is provided
-            if expire_time:
-                duration_delta = expire_time - datetime.now()
-                await self.schedule_unmute(str(ctx.guild.id), str(member.id), duration_delta)
+            if timeout_mode:
+                await self.timeout_member(ctx.guild, member, ctx.author, seconds, reason, f"{reason} | Muted by {ctx.author}")
+            else:
+                # Add the mute role
+                await member.add_roles(mute_role, reason=f"{reason} | Muted by {ctx.author}")
+                
+                # Add mute to database
+                await add_mute_async(
+                    ctx.guild.id, member.id, ctx.author.id, reason,
+                    expire_time.timestamp() if expire_time else None
+                )
+                
+                # Schedule unmute if duration is provided
+                if expire_time:
+                    duration_delta = expire_time - datetime.now()
+                    await self.schedule_unmute(str(ctx.guild.id), str(member.id), duration_delta)
             
             # Send a DM to the user if possible
             try:
@@ -575,35 +785,27 @@ class Moderation(commands.Cog):
     @commands.check(is_mod)
     async def unmute(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Unmute a previously muted user"""
-        # Check if the user is actually muted
-        if not is_muted(ctx.guild.id, member.id):
+        # Check if the user is actually muted; chatban timeouts are lifted by chatunban
+        mute_data = await get_mute_async(ctx.guild.id, member.id)
+        if mute_data is None or mute_data["source"] != "mute":
+            description = f"{member.mention} is not muted."
+            if mute_data is not None:
+                description += " They are chat banned; use `chatunban` instead."
             await ctx.send(embed=error_embed(
                 title="Not Muted",
-                description=f"{member.mention} is not muted."
-            ))
-            return
-        
-        # Get the mute role
-        mute_role = await self.get_mute_role(ctx.guild)
-        if not mute_role:
-            await ctx.send(embed=error_embed(
-                title="Mute Role Error",
-                description="Could not find the Muted role."
+                description=description
             ))
             return
         
         try:
-            # Remove the mute role
-            await member.remove_roles(mute_role, reason=f"{reason} | Unmuted by {ctx.author}")
+            # Remove the timeout or mute role, whichever mode the mute used
+            await self.lift_mute(member, f"{reason} | Unmuted by {ctx.author}")
             
             # Remove mute from database
-            remove_mute(ctx.guild.id, member.id)
+            await remove_mute_async(ctx.guild.id, member.id)
             
-            # Cancel any scheduled unmute task
-            task_key = f"{ctx.guild.id}_{member.id}"
-            if task_key in self.mute_tasks:
-                self.mute_tasks[task_key].cancel()
-                del self.mute_tasks[task_key]
+            # Cancel any scheduled unmute
+            self.mute_scheduler.cancel((str(ctx.guild.id), str(member.id)))
             
             # Send a DM to the user if possible
             try:
@@ -630,17 +832,18 @@ class Moderation(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def unmuteall(self, ctx):
         """Unmute all muted users in the server"""
-        # Get the mute role
-        mute_role = await self.get_mute_role(ctx.guild)
-        if not mute_role:
-            await ctx.send(embed=error_embed(
-                title="Mute Role Error",
-                description="Could not find the Muted role."
-            ))
-            return
-        
-        # Find all members with the mute role
-        muted_members = [member for member in ctx.guild.members if mute_role in member.roles]
+        mute_role = self.find_mute_role(ctx.guild)
+        
+        # Find all members with the mute role or an active timeout
+        muted_members = []
+        for member in ctx.guild.members:
+            if mute_role and mute_role in member.roles:
+                muted_members.append(member)
+            elif member.is_timed_out():
+                # Timeouts applied by chatban are left for chatunban
+                mute_data = await get_mute_async(ctx.guild.id, member.id)
+                if mute_data is None or mute_data["source"] != "chatban":
+                    muted_members.append(member)
         
         if not muted_members:
             await ctx.send(embed=info_embed(
@@ -654,14 +857,11 @@ class Moderation(commands.Cog):
         # Unmute each member
         for member in muted_members:
             try:
-                await member.remove_roles(mute_role, reason=f"Mass unmute initiated by {ctx.author}")
-                remove_mute(ctx.guild.id, member.id)
+                await self.lift_mute(member, f"Mass unmute initiated by {ctx.author}", mute_role)
+                await remove_mute_async(ctx.guild.id, member.id)
                 
-                # Cancel any scheduled unmute task
-                task_key = f"{ctx.guild.id}_{member.id}"
-                if task_key in self.mute_tasks:
-                    self.mute_tasks[task_key].cancel()
-                    del self.mute_tasks[task_key]
+                # Cancel any scheduled unmute
+                self.mute_scheduler.cancel((str(ctx.guild.id), str(member.id)))
                 
                 unmuted_count += 1
             except discord.Forbidden:
@@ -684,13 +884,33 @@ class Moderation(commands.Cog):
             ))
             return
         
+        timeout_mode = self.mute_mode(ctx.guild) == "timeout"
+        
+        # A member holds one timeout at a time, so it must not replace a mute's or an earlier chatban's
+        if timeout_mode:
+            mute_data = await get_mute_async(ctx.guild.id, member.id)
+            if mute_data is not None:
+                await ctx.send(embed=error_embed(
+                    title="Already Restricted",
+                    description=f"{member.mention} is already chat banned." if mute_data["source"] == "chatban"
+                    else f"{member.mention} is muted. Use `unmute` before chat banning them."
+                ))
+                return
+        
         try:
-            # Set permissions in all text channels
-            for channel in ctx.guild.text_channels:
-                try:
-                    await channel.set_permissions(member, send_messages=False, reason=f"{reason} | Chatbanned by {ctx.author}")
-                except discord.Forbidden:
-                    continue
+            if timeout_mode:
+                # One timeout instead of an overwrite per channel; it lapses after 28 days like a mute
+                await self.timeout_member(
+                    ctx.guild, member, ctx.author, MAX_MUTE_SECONDS, reason, f"{reason} | Chatbanned by {ctx.author}",
+                    source="chatban"
+                )
+            else:
+                # Set permissions in all text channels
+                for channel in ctx.guild.text_channels:
+                    try:
+                        await channel.set_permissions(member, send_messages=False, reason=f"{reason} | Chatbanned by {ctx.author}")
+                    except discord.Forbidden:
+                        continue
             
             # Send a DM to the user if possible
             try:
@@ -718,7 +938,15 @@ class Moderation(commands.Cog):
     async def chatunban(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Allow a user to send messages in text channels again"""
         try:
-            # Reset permissions in all text channels
+            # Only lift a timeout chatban applied; a mute's timeout is left to unmute
+            mute_data = await get_mute_async(ctx.guild.id, member.id)
+            if mute_data is not None and mute_data["source"] == "chatban":
+                if member.is_timed_out():
+                    await member.timeout(None, reason=f"{reason} | Chat unbanned by {ctx.author}")
+                await remove_mute_async(ctx.guild.id, member.id)
+                self.mute_scheduler.cancel((str(ctx.guild.id), str(member.id)))
+            
+            # Reset permissions in all text channels; only channels with an overwrite cost a request
             for channel in ctx.guild.text_channels:
                 try:
                     # Get the current overwrite
@@ -781,10 +1009,53 @@ class Moderation(commands.Cog):
                 description="I don't have permission to change that user's nickname. They might have a higher role than me."
             ))
     
-    @commands.command(name="purge", aliases=["clear"], help="Delete a specified number of messages")
-    @commands.check(is_mod)
-    async def purge(self, ctx, amount: int):
-        """Delete a specified number of messages from the channel"""
+    def purge_filter(self, filters):
+        """Build a compound purge filter from space-separated criteria that must all match
+
+        `user:<user>` (repeatable), `bots`, `humans`, `contains:<text>`,
+        `regex:<pattern>`, `image`, `embed`, `link`, `emoji`, `text`,
+        `before:<duration>` (older than) and `after:<duration>` (newer than).
+        Raises ValueError with a user-facing message for malformed filters.
+        """
+        purge_filter = PurgeFilter()
+        now = discord.utils.utcnow()
+        
+        for token in shlex.split(filters or ""):
+            key, _, value = token.partition(":")
+            key = key.lower()
+            if key == "user" and value:
+                user_id = re.sub(r"[<@!>]", "", value)
+                if not user_id.isdigit():
+                    raise ValueError(f"`{token}` needs a user mention or ID.")
+                purge_filter.author_ids.add(int(user_id))
+            elif key in ("bots", "humans") and not value:
+                purge_filter.bots = key == "bots"
+            elif key == "contains" and value:
+                purge_filter.add_contains(value)
+            elif key == "regex" and value:
+                try:
+                    purge_filter.add_regex(value)
+                except re.error as e:
+                    raise ValueError(f"`{token}` is not a valid regex: {e}.")
+            elif key in ("image", "embed", "link", "emoji") and not value:
+                setattr(purge_filter, key, True)
+            elif key == "text" and not value:
+                purge_filter.text_only = True
+            elif key in ("before", "after"):
+                seconds = parse_duration(value.lower())
+                if seconds is None:
+                    raise ValueError(f"`{token}` needs a duration like `2h` or `7d`.")
+                setattr(purge_filter, key, now - timedelta(seconds=seconds))
+            else:
+                raise ValueError(
+                    f"Unknown filter `{token}`. Use `user:<user>`, `bots`, `humans`, `contains:<text>`, `regex:<pattern>`, "
+                    "`image`, `embed`, `link`, `emoji`, `text`, `before:<duration>` or `after:<duration>`."
+                )
+        
+        return purge_filter
+    
+    async def run_purge(self, ctx, amount, purge_filter, title, what):
+        """Validate the amount, purge the channel and report "deleted N <what>"; shared by every purge command"""
         if amount <= 0:
             await ctx.send(embed=error_embed(
                 title="Invalid Amount",
@@ -792,229 +1063,170 @@ class Moderation(commands.Cog):
             ))
             return
         
-        if amount > 100:
+        if amount > MAX_PURGE_AMOUNT:
             await ctx.send(embed=error_embed(
                 title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
+                description=f"You can only purge up to {MAX_PURGE_AMOUNT} messages at once."
             ))
             return
         
-        # Delete the command message first
+        # Delete the command message first; history is read from just before it
         await ctx.message.delete()
         
-        # Delete the specified number of messages
-        deleted = await ctx.channel.purge(limit=amount)
+        progress = {}
+        progress_msg = None
+        reporter = None
         
-        # Send a confirmation message that will delete itself after 5 seconds
-        await temp_message(ctx, embed=success_embed(
-            title="Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} messages."
-        ), seconds=5)
-    
-    @commands.command(name="purgebots", help="Delete messages from bots")
-    @commands.check(is_mod)
-    async def purgebots(self, ctx, amount: int = 100):
-        """Delete messages from bots in the channel"""
-        if amount <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Amount",
-                description="Please specify a positive number."
+        # A purge that needs more than one bulk request reports as it goes
+        if amount > BULK_DELETE_SIZE:
+            progress_msg = await ctx.send(embed=info_embed(
+                title="Purging Messages",
+                description=f"Scanning up to {amount} messages..."
             ))
-            return
+            
+            async def report():
+                while True:
+                    await asyncio.sleep(PROGRESS_INTERVAL)
+                    try:
+                        await progress_msg.edit(embed=info_embed(
+                            title="Purging Messages",
+                            description=f"Scanned **{progress['scanned']}/{amount}** messages, deleted **{progress['deleted']}**"
+                        ))
+                    except discord.HTTPException:
+                        pass
+            
+            reporter = asyncio.create_task(report())
         
-        if amount > 100:
+        try:
+            deleted, failed = await purge_channel(
+                ctx.channel, amount, purge_filter, anchor=ctx.message, progress=progress,
+                reason=f"Purge by {ctx.author}"
+            )
+        except discord.Forbidden:
             await ctx.send(embed=error_embed(
-                title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
+                title="Purge Failed",
+                description="I don't have permission to delete messages in this channel."
             ))
             return
-        
-        # Delete the command message first
-        await ctx.message.delete()
-        
-        # Delete messages from bots
-        def is_bot(message):
-            return message.author.bot
-        
-        deleted = await ctx.channel.purge(limit=amount, check=is_bot)
+        finally:
+            if reporter:
+                reporter.cancel()
+            if progress_msg:
+                try:
+                    await progress_msg.delete()
+                except discord.HTTPException:
+                    pass
         
         # Send a confirmation message that will delete itself after 5 seconds
         await temp_message(ctx, embed=success_embed(
-            title="Bot Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} bot messages."
+            title=title,
+            description=f"✅ Successfully deleted {deleted} {what}."
+                        + (f"\n{failed} message(s) could not be deleted." if failed else "")
         ), seconds=5)
     
-    @commands.command(name="purgeuser", aliases=["clearuser"], help="Delete messages from a specific user")
+    @commands.command(name="purge", aliases=["clear"], help="Delete messages, optionally filtered by user:, contains:, regex:, bots, humans, image, embed, link, emoji, text, before: and after:")
     @commands.check(is_mod)
-    async def purgeuser(self, ctx, user: discord.Member, amount: int = 100):
-        """Delete messages from a specific user in the channel"""
-        if amount <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Amount",
-                description="Please specify a positive number."
-            ))
-            return
-        
-        if amount > 100:
+    async def purge(self, ctx, amount: int, *, filters: str = None):
+        """Delete matching messages among the last `amount` in the channel"""
+        try:
+            purge_filter = self.purge_filter(filters)
+        except ValueError as e:
             await ctx.send(embed=error_embed(
-                title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
+                title="Invalid Filter",
+                description=str(e)
             ))
             return
         
-        # Delete the command message first
-        await ctx.message.delete()
-        
-        # Delete messages from the specified user
-        def is_user(message):
-            return message.author.id == user.id
-        
-        deleted = await ctx.channel.purge(limit=amount, check=is_user)
-        
-        # Send a confirmation message that will delete itself after 5 seconds
-        await temp_message(ctx, embed=success_embed(
-            title="User Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} messages from {user.mention}."
-        ), seconds=5)
+        await self.run_purge(ctx, amount, purge_filter, "Messages Purged", "matching messages" if filters else "messages")
+    
+    @commands.command(name="purgebots", help="Delete messages from bots")
+    @commands.check(is_mod)
+    async def purgebots(self, ctx, amount: int = 100):
+        """Delete messages from bots in the channel"""
+        purge_filter = PurgeFilter()
+        purge_filter.bots = True
+        await self.run_purge(ctx, amount, purge_filter, "Bot Messages Purged", "bot messages")
+    
+    @commands.command(name="purgeuser", aliases=["clearuser"], help="Delete messages from a specific user")
+    @commands.check(is_mod)
+    async def purgeuser(self, ctx, user: discord.Member, amount: int = 100):
+        """Delete messages from a specific user in the channel"""
+        purge_filter = PurgeFilter()
+        purge_filter.author_ids.add(user.id)
+        await self.run_purge(ctx, amount, purge_filter, "User Messages Purged", f"messages from {user.mention}")
     
     @commands.command(name="purgecontains", aliases=["clearcontains"], help="Delete messages containing specific text")
     @commands.check(is_mod)
     async def purgecontains(self, ctx, text: str, amount: int = 100):
         """Delete messages containing specific text"""
-        if amount <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Amount",
-                description="Please specify a positive number."
-            ))
-            return
-        
-        if amount > 100:
-            await ctx.send(embed=error_embed(
-                title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
-            ))
-            return
-        
-        # Delete the command message first
-        await ctx.message.delete()
-        
-        # Delete messages containing the specified text
-        def contains_text(message):
-            return text.lower() in message.content.lower()
-        
-        deleted = await ctx.channel.purge(limit=amount, check=contains_text)
-        
-        # Send a confirmation message that will delete itself after 5 seconds
-        await temp_message(ctx, embed=success_embed(
-            title="Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} messages containing '{text}'."
-        ), seconds=5)
+        purge_filter = PurgeFilter()
+        purge_filter.add_contains(text)
+        await self.run_purge(ctx, amount, purge_filter, "Messages Purged", f"messages containing '{text}'")
     
     @commands.command(name="purgeemoji", aliases=["clearemoji"], help="Delete messages containing emojis")
     @commands.check(is_mod)
-    async def purgeemoji(self, ctx, amount: int = 100):
-        """Delete messages containing emojis"""
-        if amount <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Amount",
-                description="Please specify a positive number."
-            ))
-            return
-        
-        if amount > 100:
-            await ctx.send(embed=error_embed(
-                title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
-            ))
-            return
-        
-        # Delete the command message first
-        await ctx.message.delete()
-        
-        # Emoji pattern to match both Unicode emojis and Discord custom emojis
-        emoji_pattern = re.compile(r'<a?:[a-zA-Z0-9_]+:\d+>|[\U00010000-\U0010ffff]', flags=re.UNICODE)
-        
-        # Delete messages containing emojis
-        def contains_emoji(message):
-            return bool(emoji_pattern.search(message.content))
-        
-        deleted = await ctx.channel.purge(limit=amount, check=contains_emoji)
-        
-        # Send a confirmation message that will delete itself after 5 seconds
-        await temp_message(ctx, embed=success_embed(
-            title="Emoji Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} messages containing emojis."
-        ), seconds=5)
-    
-    @commands.command(name="purgeimage", aliases=["clearimage"], help="Delete messages containing images")
-    @commands.check(is_mod)
-    async def purgeimage(self, ctx, amount: int = 100):
-        """Delete messages containing images/attachments"""
-        if amount <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Amount",
-                description="Please specify a positive number."
-            ))
-            return
-        
-        if amount > 100:
-            await ctx.send(embed=error_embed(
-                title="Amount Too Large",
-                description="You can only purge up to 100 messages at once."
-            ))
-            return
-        
-        # Delete the command message first
-        await ctx.message.delete()
-        
-        # Delete messages containing attachments or embeds with images
-        def has_image(message):
-            # Check for attachments
-            if message.attachments:
-                for attachment in message.attachments:
-                    if attachment.content_type and attachment.content_type.startswith("image/"):
-                        return True
-            
-            # Check for embeds with images
-            if message.embeds:
-                for embed in message.embeds:
-                    if embed.image or embed.thumbnail:
-                        return True
-            
-            return False
-        
-        deleted = await ctx.channel.purge(limit=amount, check=has_image)
-        
-        # Send a confirmation message that will delete itself after 5 seconds
-        await temp_message(ctx, embed=success_embed(
-            title="Image Messages Purged",
-            description=f"✅ Successfully deleted {len(deleted)} messages containing images."
-        ), seconds=5)
+    async def purgeemoji(self, ctx, amount: int = 100):
+        """Delete messages containing emojis"""
+        purge_filter = PurgeFilter()
+        purge_filter.emoji = True
+        await self.run_purge(ctx, amount, purge_filter, "Emoji Messages Purged", "messages containing emojis")
+    
+    @commands.command(name="purgeimage", aliases=["clearimage"], help="Delete messages containing images")
+    @commands.check(is_mod)
+    async def purgeimage(self, ctx, amount: int = 100):
+        """Delete messages containing images/attachments"""
+        purge_filter = PurgeFilter()
+        purge_filter.image = True
+        await self.run_purge(ctx, amount, purge_filter, "Image Messages Purged", "messages containing images")
     
     @commands.command(name="snipe", help="See the last deleted message in the channel")
     @commands.check(is_mod)
     async def snipe(self, ctx):
         """View the last message deleted in the current channel"""
-        channel_id = str(ctx.channel.id)
+        # Get the most recent deleted message
+        message = SNIPES.latest_deleted(ctx.channel.id)
         
-        if channel_id not in self.snipe_messages or not self.snipe_messages[channel_id]:
+        if message is None:
             await ctx.send(embed=error_embed(
                 title="No Sniped Messages",
                 description="There are no deleted messages to snipe in this channel."
             ))
             return
         
-        # Get the most recent deleted message
-        message = self.snipe_messages[channel_id][-1]
-        
         # Create and send the embed
         embed = discord.Embed(
-            description=message["content"],
+            description=message.content,
+            color=CONFIG["embed_color"],
+            timestamp=datetime.fromtimestamp(message.created_at, timezone.utc)
+        )
+        
+        embed.set_author(name=message.author_name, icon_url=message.avatar_url)
+        embed.set_footer(text=f"Sniped by {ctx.author}")
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name="editsnipe", aliases=["esnipe"], help="See the last edited message in the channel")
+    @commands.check(is_mod)
+    async def editsnipe(self, ctx):
+        """View the content a message in the current channel had before its last edit"""
+        message = SNIPES.latest_edited(ctx.channel.id)
+        
+        if message is None:
+            await ctx.send(embed=error_embed(
+                title="No Sniped Edits",
+                description="There are no edited messages to snipe in this channel."
+            ))
+            return
+        
+        embed = discord.Embed(
             color=CONFIG["embed_color"],
-            timestamp=message["created_at"]
+            timestamp=datetime.fromtimestamp(message.created_at, timezone.utc)
         )
         
-        embed.set_author(name=f"{message['author']}", icon_url=message["avatar_url"])
+        embed.set_author(name=message.author_name, icon_url=message.avatar_url)
+        embed.add_field(name="Before", value=message.content[:1024], inline=False)
+        embed.add_field(name="After", value=message.edited[:1024], inline=False)
+        embed.add_field(name="Message", value=f"[Jump](https://discord.com/channels/{ctx.guild.id}/{ctx.channel.id}/{message.message_id})", inline=False)
         embed.set_footer(text=f"Sniped by {ctx.author}")
         
         await ctx.send(embed=embed)
@@ -1061,17 +1273,35 @@ class Moderation(commands.Cog):
                 description="I don't have permission to assign or remove that role."
             ))
     
-    @commands.command(name="roleall", help="Add a role to all members")
-    @commands.has_permissions(administrator=True)
-    async def roleall(self, ctx, *, role: discord.Role):
-        """Add a role to all members in the server"""
+    # Bulk role jobs
+    def role_job_targets(self, guild, job):
+        """Members a bulk role job still has to give its role to"""
+        role = guild.get_role(int(job["role_id"]))
+        if role is None:
+            return []
+        
+        have_role = {member.id for member in role.members}
+        target = job["target"]
+        return [
+            member for member in guild.members
+            if member.id not in have_role and (target == "all" or member.bot == (target == "bots"))
+        ]
+    
+    async def apply_role_job(self, guild, job, member):
+        role = guild.get_role(int(job["role_id"]))
+        if role is None:
+            raise LookupError("The role was deleted")
+        await member.add_roles(role, reason=job["reason"])
+    
+    async def check_role_job(self, ctx, role):
+        """Send an error and return False if a bulk role job cannot start"""
         # Check if the bot has permission to manage roles
         if not ctx.guild.me.guild_permissions.manage_roles:
             await ctx.send(embed=error_embed(
                 title="Missing Permissions",
                 description="I don't have permission to manage roles."
             ))
-            return
+            return False
         
         # Check if the role is higher than the bot's highest role
         if role.position >= ctx.guild.me.top_role.position:
@@ -1079,6 +1309,37 @@ class Moderation(commands.Cog):
                 title="Role Too High",
                 description="I can't assign roles that are higher than or equal to my highest role."
             ))
+            return False
+        
+        # Role edits share one rate limit per server, so only one job runs at a time
+        if self.role_jobs.get(ctx.guild.id):
+            await ctx.send(embed=error_embed(
+                title="Bulk Job Running",
+                description="A bulk role job is already running in this server. Use `rolestatus` to check it or `rolecancel` to stop it."
+            ))
+            return False
+        
+        return True
+    
+    async def start_role_job(self, ctx, job, members):
+        """Post the progress message and hand the job to the runner"""
+        progress_msg = await ctx.send(embed=info_embed(
+            title="Adding Roles",
+            description=f"{job['label']}: **0/{len(members)}** processed\n\nUse `rolestatus` to check progress or `rolecancel` to stop."
+        ))
+        
+        job.update({
+            "channel_id": str(ctx.channel.id),
+            "message_id": str(progress_msg.id),
+            "total": len(members)
+        })
+        await self.role_jobs.start(ctx.guild, job)
+    
+    @commands.command(name="roleall", help="Add a role to all members")
+    @commands.has_permissions(administrator=True)
+    async def roleall(self, ctx, *, role: discord.Role):
+        """Add a role to all members in the server"""
+        if not await self.check_role_job(ctx, role):
             return
         
         # Ask for confirmation
@@ -1104,8 +1365,16 @@ class Moderation(commands.Cog):
                 ))
                 return
             
+            job = {
+                "kind": "role_add",
+                "role_id": str(role.id),
+                "target": "all",
+                "label": f"Adding {role.mention} to all members",
+                "reason": f"Mass role add initiated by {ctx.author}"
+            }
+            
             # Count members who don't already have the role
-            members_to_add = [member for member in ctx.guild.members if role not in member.roles]
+            members_to_add = self.role_job_targets(ctx.guild, job)
             
             if not members_to_add:
                 await ctx.send(embed=info_embed(
@@ -1114,33 +1383,7 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            added_count = 0
-            
-            # Send initial progress message
-            progress_msg = await ctx.send(embed=info_embed(
-                title="Adding Roles",
-                description=f"Adding role to 0/{len(members_to_add)} members..."
-            ))
-            
-            # Add role to each member
-            for member in members_to_add:
-                try:
-                    await member.add_roles(role, reason=f"Mass role add initiated by {ctx.author}")
-                    added_count += 1
-                    
-                    # Update progress every 5 members
-                    if added_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Adding Roles",
-                            description=f"Adding role to {added_count}/{len(members_to_add)} members..."
-                        ))
-                except:
-                    continue
-            
-            await ctx.send(embed=success_embed(
-                title="Mass Role Add Complete",
-                description=f"✅ Successfully added {role.mention} to {added_count} members."
-            ))
+            await self.start_role_job(ctx, job, members_to_add)
         
         except asyncio.TimeoutError:
             await ctx.send(embed=info_embed(
@@ -1152,24 +1395,19 @@ class Moderation(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def rolehumans(self, ctx, *, role: discord.Role):
         """Add a role to all human (non-bot) members in the server"""
-        # Check if the bot has permission to manage roles
-        if not ctx.guild.me.guild_permissions.manage_roles:
-            await ctx.send(embed=error_embed(
-                title="Missing Permissions",
-                description="I don't have permission to manage roles."
-            ))
+        if not await self.check_role_job(ctx, role):
             return
         
-        # Check if the role is higher than the bot's highest role
-        if role.position >= ctx.guild.me.top_role.position:
-            await ctx.send(embed=error_embed(
-                title="Role Too High",
-                description="I can't assign roles that are higher than or equal to my highest role."
-            ))
-            return
+        job = {
+            "kind": "role_add",
+            "role_id": str(role.id),
+            "target": "humans",
+            "label": f"Adding {role.mention} to human members",
+            "reason": f"Mass role add to humans initiated by {ctx.author}"
+        }
         
         # Count human members who don't already have the role
-        members_to_add = [member for member in ctx.guild.members if not member.bot and role not in member.roles]
+        members_to_add = self.role_job_targets(ctx.guild, job)
         
         if not members_to_add:
             await ctx.send(embed=info_embed(
@@ -1201,33 +1439,7 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            added_count = 0
-            
-            # Send initial progress message
-            progress_msg = await ctx.send(embed=info_embed(
-                title="Adding Roles",
-                description=f"Adding role to 0/{len(members_to_add)} human members..."
-            ))
-            
-            # Add role to each human member
-            for member in members_to_add:
-                try:
-                    await member.add_roles(role, reason=f"Mass role add to humans initiated by {ctx.author}")
-                    added_count += 1
-                    
-                    # Update progress every 5 members
-                    if added_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Adding Roles",
-                            description=f"Adding role to {added_count}/{len(members_to_add)} human members..."
-                        ))
-                except:
-                    continue
-            
-            await ctx.send(embed=success_embed(
-                title="Mass Role Add Complete",
-                description=f"✅ Successfully added {role.mention} to {added_count} human members."
-            ))
+            await self.start_role_job(ctx, job, members_to_add)
         
         except asyncio.TimeoutError:
             await ctx.send(embed=info_embed(
@@ -1239,24 +1451,19 @@ class Moderation(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def rolebots(self, ctx, *, role: discord.Role):
         """Add a role to all bot members in the server"""
-        # Check if the bot has permission to manage roles
-        if not ctx.guild.me.guild_permissions.manage_roles:
-            await ctx.send(embed=error_embed(
-                title="Missing Permissions",
-                description="I don't have permission to manage roles."
-            ))
+        if not await self.check_role_job(ctx, role):
             return
         
-        # Check if the role is higher than the bot's highest role
-        if role.position >= ctx.guild.me.top_role.position:
-            await ctx.send(embed=error_embed(
-                title="Role Too High",
-                description="I can't assign roles that are higher than or equal to my highest role."
-            ))
-            return
+        job = {
+            "kind": "role_add",
+            "role_id": str(role.id),
+            "target": "bots",
+            "label": f"Adding {role.mention} to bot members",
+            "reason": f"Mass role add to bots initiated by {ctx.author}"
+        }
         
         # Count bot members who don't already have the role
-        members_to_add = [member for member in ctx.guild.members if member.bot and role not in member.roles]
+        members_to_add = self.role_job_targets(ctx.guild, job)
         
         if not members_to_add:
             await ctx.send(embed=info_embed(
@@ -1265,20 +1472,49 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Add role to each bot member
-        added_count = 0
-        for member in members_to_add:
-            try:
-                await member.add_roles(role, reason=f"Mass role add to bots initiated by {ctx.author}")
-                added_count += 1
-            except:
-                continue
+        await self.start_role_job(ctx, job, members_to_add)
+    
+    @commands.command(name="rolestatus", aliases=["rolejob"], help="Show the progress of a bulk role job")
+    @commands.has_permissions(administrator=True)
+    async def rolestatus(self, ctx):
+        """Show the progress of the server's bulk role job"""
+        job = self.role_jobs.get(ctx.guild.id)
+        
+        if job is None:
+            await ctx.send(embed=info_embed(
+                title="No Bulk Job",
+                description="There is no bulk role job running in this server."
+            ))
+            return
+        
+        await ctx.send(embed=info_embed(
+            title="Bulk Role Job",
+            description=self.role_jobs.describe(job)
+        ))
+    
+    @commands.command(name="rolecancel", aliases=["rolestop"], help="Cancel a running bulk role job")
+    @commands.has_permissions(administrator=True)
+    async def rolecancel(self, ctx):
+        """Cancel the server's bulk role job"""
+        job = await self.role_jobs.cancel(ctx.guild.id)
+        
+        if job is None:
+            await ctx.send(embed=info_embed(
+                title="No Bulk Job",
+                description="There is no bulk role job running in this server."
+            ))
+            return
         
         await ctx.send(embed=success_embed(
-            title="Mass Role Add Complete",
-            description=f"✅ Successfully added {role.mention} to {added_count} bot members."
+            title="Bulk Role Job Cancelled",
+            description=f"✅ {self.role_jobs.describe(job)}\n\nThe remaining members were left unchanged."
         ))
     
+    def channel_lock_state(self, guild, permission):
+        """The guild config and its saved @everyone overwrites for one permission"""
+        config = get_guild_config(guild.id)
+        return config, config.setdefault("channel_locks", {}).setdefault(permission, {})
+    
     @commands.command(name="lock", help="Lock a channel")
     @commands.check(is_mod)
     async def lock(self, ctx, channel: discord.TextChannel = None):
@@ -1293,18 +1529,28 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Prevent @everyone from sending messages
-        try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=False)
-            await ctx.send(embed=success_embed(
-                title="Channel Locked",
-                description=f"✅ {channel.mention} has been locked."
-            ))
-        except discord.Forbidden:
+        # Prevent @everyone from sending messages, remembering the overwrite it replaces
+        config, saved = self.channel_lock_state(ctx.guild, "send_messages")
+        changed, skipped, failed = await set_everyone_permission(
+            ctx.guild, [channel], "send_messages", False, saved, f"Channel locked by {ctx.author}"
+        )
+        update_guild_config(ctx.guild.id, config)
+        
+        if failed:
             await ctx.send(embed=error_embed(
                 title="Lock Failed",
                 description="I don't have permission to lock this channel."
             ))
+        elif skipped:
+            await ctx.send(embed=info_embed(
+                title="Nothing To Change",
+                description=f"{channel.mention} is already locked."
+            ))
+        else:
+            await ctx.send(embed=success_embed(
+                title="Channel Locked",
+                description=f"✅ {channel.mention} has been locked."
+            ))
     
     @commands.command(name="unlock", help="Unlock a channel")
     @commands.check(is_mod)
@@ -1320,18 +1566,28 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Allow @everyone to send messages
-        try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=None)
-            await ctx.send(embed=success_embed(
-                title="Channel Unlocked",
-                description=f"✅ {channel.mention} has been unlocked."
-            ))
-        except discord.Forbidden:
+        # Allow @everyone to send messages, restoring the overwrite from before the channel was locked
+        config, saved = self.channel_lock_state(ctx.guild, "send_messages")
+        changed, skipped, failed = await restore_everyone_permission(
+            ctx.guild, [channel], "send_messages", saved, f"Channel unlocked by {ctx.author}", reset_unsaved=True
+        )
+        update_guild_config(ctx.guild.id, config)
+        
+        if failed:
             await ctx.send(embed=error_embed(
                 title="Unlock Failed",
                 description="I don't have permission to unlock this channel."
             ))
+        elif skipped:
+            await ctx.send(embed=info_embed(
+                title="Nothing To Change",
+                description=f"{channel.mention} is already unlocked."
+            ))
+        else:
+            await ctx.send(embed=success_embed(
+                title="Channel Unlocked",
+                description=f"✅ {channel.mention} has been unlocked."
+            ))
     
     @commands.command(name="lockall", help="Lock all channels")
     @commands.has_permissions(administrator=True)
@@ -1368,30 +1624,21 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            # Lock all text channels
-            locked_count = 0
+            # Lock all text channels, remembering each overwrite so it can be restored exactly
             progress_msg = await ctx.send(embed=info_embed(
                 title="Locking Channels",
-                description=f"Locking 0/{len(ctx.guild.text_channels)} channels..."
+                description=f"Locking {len(ctx.guild.text_channels)} channels..."
             ))
             
-            for channel in ctx.guild.text_channels:
-                try:
-                    await channel.set_permissions(ctx.guild.default_role, send_messages=False)
-                    locked_count += 1
-                    
-                    # Update progress every 5 channels
-                    if locked_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Locking Channels",
-                            description=f"Locking {locked_count}/{len(ctx.guild.text_channels)} channels..."
-                        ))
-                except:
-                    continue
+            config, saved = self.channel_lock_state(ctx.guild, "send_messages")
+            locked_count, skipped, failed = await set_everyone_permission(
+                ctx.guild, ctx.guild.text_channels, "send_messages", False, saved, f"Mass lock initiated by {ctx.author}"
+            )
+            update_guild_config(ctx.guild.id, config)
             
-            await ctx.send(embed=success_embed(
+            await progress_msg.edit(embed=success_embed(
                 title="Mass Lock Complete",
-                description=f"✅ Successfully locked {locked_count} text channels."
+                description=f"✅ Successfully locked {locked_count} text channels." + bulk_edit_summary(skipped, failed)
             ))
         
         except asyncio.TimeoutError:
@@ -1435,30 +1682,21 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            # Unlock all text channels
-            unlocked_count = 0
+            # Unlock all text channels, restoring the overwrites saved when they were changed
             progress_msg = await ctx.send(embed=info_embed(
                 title="Unlocking Channels",
-                description=f"Unlocking 0/{len(ctx.guild.text_channels)} channels..."
+                description=f"Unlocking {len(ctx.guild.text_channels)} channels..."
             ))
             
-            for channel in ctx.guild.text_channels:
-                try:
-                    await channel.set_permissions(ctx.guild.default_role, send_messages=None)
-                    unlocked_count += 1
-                    
-                    # Update progress every 5 channels
-                    if unlocked_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Unlocking Channels",
-                            description=f"Unlocking {unlocked_count}/{len(ctx.guild.text_channels)} channels..."
-                        ))
-                except:
-                    continue
+            config, saved = self.channel_lock_state(ctx.guild, "send_messages")
+            unlocked_count, skipped, failed = await restore_everyone_permission(
+                ctx.guild, ctx.guild.text_channels, "send_messages", saved, f"Mass unlock initiated by {ctx.author}"
+            )
+            update_guild_config(ctx.guild.id, config)
             
-            await ctx.send(embed=success_embed(
+            await progress_msg.edit(embed=success_embed(
                 title="Mass Unlock Complete",
-                description=f"✅ Successfully unlocked {unlocked_count} text channels."
+                description=f"✅ Successfully unlocked {unlocked_count} text channels." + bulk_edit_summary(skipped, failed)
             ))
         
         except asyncio.TimeoutError:
@@ -1481,18 +1719,28 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Hide the channel from @everyone
-        try:
-            await channel.set_permissions(ctx.guild.default_role, view_channel=False)
-            await ctx.send(embed=success_embed(
-                title="Channel Hidden",
-                description=f"✅ {channel.mention} has been hidden from regular users."
-            ))
-        except discord.Forbidden:
+        # Hide the channel from @everyone, remembering the overwrite it replaces
+        config, saved = self.channel_lock_state(ctx.guild, "view_channel")
+        changed, skipped, failed = await set_everyone_permission(
+            ctx.guild, [channel], "view_channel", False, saved, f"Channel hidden by {ctx.author}"
+        )
+        update_guild_config(ctx.guild.id, config)
+        
+        if failed:
             await ctx.send(embed=error_embed(
                 title="Hide Failed",
                 description="I don't have permission to hide this channel."
             ))
+        elif skipped:
+            await ctx.send(embed=info_embed(
+                title="Nothing To Change",
+                description=f"{channel.mention} is already hidden."
+            ))
+        else:
+            await ctx.send(embed=success_embed(
+                title="Channel Hidden",
+                description=f"✅ {channel.mention} has been hidden from regular users."
+            ))
     
     @commands.command(name="unhide", help="Unhide a channel")
     @commands.check(is_mod)
@@ -1508,18 +1756,28 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Unhide the channel for @everyone
-        try:
-            await channel.set_permissions(ctx.guild.default_role, view_channel=None)
-            await ctx.send(embed=success_embed(
-                title="Channel Unhidden",
-                description=f"✅ {channel.mention} has been unhidden for regular users."
-            ))
-        except discord.Forbidden:
+        # Unhide the channel for @everyone, restoring the overwrite from before the channel was hidden
+        config, saved = self.channel_lock_state(ctx.guild, "view_channel")
+        changed, skipped, failed = await restore_everyone_permission(
+            ctx.guild, [channel], "view_channel", saved, f"Channel unhidden by {ctx.author}", reset_unsaved=True
+        )
+        update_guild_config(ctx.guild.id, config)
+        
+        if failed:
             await ctx.send(embed=error_embed(
                 title="Unhide Failed",
                 description="I don't have permission to unhide this channel."
             ))
+        elif skipped:
+            await ctx.send(embed=info_embed(
+                title="Nothing To Change",
+                description=f"{channel.mention} is already unhidden."
+            ))
+        else:
+            await ctx.send(embed=success_embed(
+                title="Channel Unhidden",
+                description=f"✅ {channel.mention} has been unhidden for regular users."
+            ))
     
     @commands.command(name="hideall", help="Hide all channels from regular users")
     @commands.has_permissions(administrator=True)
@@ -1556,30 +1814,21 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            # Hide all channels
-            hidden_count = 0
+            # Hide all channels, remembering each overwrite so it can be restored exactly
             progress_msg = await ctx.send(embed=info_embed(
                 title="Hiding Channels",
-                description=f"Hiding 0/{len(ctx.guild.channels)} channels..."
+                description=f"Hiding {len(ctx.guild.channels)} channels..."
             ))
             
-            for channel in ctx.guild.channels:
-                try:
-                    await channel.set_permissions(ctx.guild.default_role, view_channel=False)
-                    hidden_count += 1
-                    
-                    # Update progress every 5 channels
-                    if hidden_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Hiding Channels",
-                            description=f"Hiding {hidden_count}/{len(ctx.guild.channels)} channels..."
-                        ))
-                except:
-                    continue
+            config, saved = self.channel_lock_state(ctx.guild, "view_channel")
+            hidden_count, skipped, failed = await set_everyone_permission(
+                ctx.guild, ctx.guild.channels, "view_channel", False, saved, f"Mass hide initiated by {ctx.author}"
+            )
+            update_guild_config(ctx.guild.id, config)
             
-            await ctx.send(embed=success_embed(
+            await progress_msg.edit(embed=success_embed(
                 title="Mass Hide Complete",
-                description=f"✅ Successfully hidden {hidden_count} channels."
+                description=f"✅ Successfully hidden {hidden_count} channels." + bulk_edit_summary(skipped, failed)
             ))
         
         except asyncio.TimeoutError:
@@ -1623,30 +1872,21 @@ class Moderation(commands.Cog):
                 ))
                 return
             
-            # Unhide all channels
-            unhidden_count = 0
+            # Unhide all channels, restoring the overwrites saved when they were changed
             progress_msg = await ctx.send(embed=info_embed(
                 title="Unhiding Channels",
-                description=f"Unhiding 0/{len(ctx.guild.channels)} channels..."
+                description=f"Unhiding {len(ctx.guild.channels)} channels..."
             ))
             
-            for channel in ctx.guild.channels:
-                try:
-                    await channel.set_permissions(ctx.guild.default_role, view_channel=None)
-                    unhidden_count += 1
-                    
-                    # Update progress every 5 channels
-                    if unhidden_count % 5 == 0:
-                        await progress_msg.edit(embed=info_embed(
-                            title="Unhiding Channels",
-                            description=f"Unhiding {unhidden_count}/{len(ctx.guild.channels)} channels..."
-                        ))
-                except:
-                    continue
+            config, saved = self.channel_lock_state(ctx.guild, "view_channel")
+            unhidden_count, skipped, failed = await restore_everyone_permission(
+                ctx.guild, ctx.guild.channels, "view_channel", saved, f"Mass unhide initiated by {ctx.author}"
+            )
+            update_guild_config(ctx.guild.id, config)
             
-            await ctx.send(embed=success_embed(
+            await progress_msg.edit(embed=success_embed(
                 title="Mass Unhide Complete",
-                description=f"✅ Successfully unhidden {unhidden_count} channels."
+                description=f"✅ Successfully unhidden {unhidden_count} channels." + bulk_edit_summary(skipped, failed)
             ))
         
         except asyncio.TimeoutError:
@@ -1814,78 +2054,46 @@ class Moderation(commands.Cog):
                 description=f"✅ {channel.mention} is now a media-only channel. Only messages with images, videos, or links will be allowed."
             ))
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def media_channel_stage(self, context):
         """Check messages in media-only channels"""
-        # Ignore messages from bots
-        if message.author.bot:
-            return
+        message = context.message
         
-        # Ignore DMs
-        if not message.guild:
-            return
+        # Check if the message has any attachments, embeds, or links
+        has_media = False
         
-        # Get guild config
-        config = get_guild_config(message.guild.id)
-        media_channels = config.get("media_channels", [])
+        # Check for attachments
+        if message.attachments:
+            has_media = True
         
-        # Check if this is a media channel
-        if str(message.channel.id) in media_channels:
-            # Check if the message has any attachments, embeds, or links
-            has_media = False
-            
-            # Check for attachments
-            if message.attachments:
-                has_media = True
-            
-            # Check for embeds
-            if message.embeds:
+        # Check for embeds
+        if message.embeds:
+            has_media = True
+        
+        # Check for links in content
+        if message.content:
+            if URL_PATTERN.search(message.content):
                 has_media = True
-            
-            # Check for links in content
-            if message.content:
-                # Simple URL detection regex
-                url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-                if url_pattern.search(message.content):
-                    has_media = True
-            
-            # If no media, delete the message
-            if not has_media:
+        
+        # If no media, delete the message
+        if not has_media:
+            try:
+                await message.delete()
+                
+                # Send a warning DM to the user
                 try:
-                    await message.delete()
-                    
-                    # Send a warning DM to the user
-                    try:
-                        await message.author.send(embed=warning_embed(
-                            title="Message Deleted",
-                            description=f"Your message in {message.channel.mention} was deleted because it did not contain any media (images, videos, or links).\n\nThis channel is set to media-only mode."
-                        ))
-                    except discord.Forbidden:
-                        pass
+                    await message.author.send(embed=warning_embed(
+                        title="Message Deleted",
+                        description=f"Your message in {message.channel.mention} was deleted because it did not contain any media (images, videos, or links).\n\nThis channel is set to media-only mode."
+                    ))
                 except discord.Forbidden:
                     pass
+            except discord.Forbidden:
+                pass
     
     @commands.command(name="sanatise", aliases=["sanitize", "clean"], help="Clean a channel of unwanted messages")
     @commands.check(is_admin)
     async def sanatise(self, ctx, limit: int = 100, *, content_type=None):
         """Clean a channel of unwanted message types"""
-        if limit <= 0:
-            await ctx.send(embed=error_embed(
-                title="Invalid Limit",
-                description="Please specify a positive number."
-            ))
-            return
-        
-        if limit > 100:
-            await ctx.send(embed=error_embed(
-                title="Limit Too Large",
-                description="You can only clean up to 100 messages at once."
-            ))
-            return
-        
-        # Delete the command message
-        await ctx.message.delete()
-        
         valid_types = ["bot", "human", "image", "embed", "link", "emoji", "text"]
         
         if content_type and content_type.lower() not in valid_types:
@@ -1895,66 +2103,19 @@ class Moderation(commands.Cog):
             ))
             return
         
-        # Create a check function based on the content type
-        def check_message(message):
-            if content_type == "bot":
-                return message.author.bot
-            elif content_type == "human":
-                return not message.author.bot
-            elif content_type == "image":
-                has_image = False
-                # Check for attachments
-                if message.attachments:
-                    for attachment in message.attachments:
-                        if attachment.content_type and attachment.content_type.startswith("image/"):
-                            has_image = True
-                            break
-                
-                # Check for embeds with images
-                if message.embeds:
-                    for embed in message.embeds:
-                        if embed.image or embed.thumbnail:
-                            has_image = True
-                            break
-                
-                return has_image
-            elif content_type == "embed":
-                return bool(message.embeds)
-            elif content_type == "link":
-                # Simple URL detection regex
-                url_pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-                return bool(url_pattern.search(message.content))
-            elif content_type == "emoji":
-                # Emoji pattern to match both Unicode emojis and Discord custom emojis
-                emoji_pattern = re.compile(r'<a?:[a-zA-Z0-9_]+:\d+>|[\U00010000-\U0010ffff]', flags=re.UNICODE)
-                return bool(emoji_pattern.search(message.content))
+        # Each type is one criterion of the shared purge filter; no type cleans all messages
+        purge_filter = PurgeFilter()
+        if content_type:
+            content_type = content_type.lower()
+            if content_type in ("bot", "human"):
+                purge_filter.bots = content_type == "bot"
             elif content_type == "text":
-                # Only text with no attachments or embeds
-                return not (message.attachments or message.embeds) and message.content
+                purge_filter.text_only = True
             else:
-                # If no type specified, clean all messages
-                return True
+                setattr(purge_filter, content_type, True)
         
-        try:
-            # Purge messages based on the check
-            deleted = await ctx.channel.purge(limit=limit, check=check_message)
-            
-            # Send a confirmation message that will delete itself after 5 seconds
-            if content_type:
-                await temp_message(ctx, embed=success_embed(
-                    title="Channel Cleaned",
-                    description=f"✅ Successfully deleted {len(deleted)} messages of type '{content_type}'."
-                ), seconds=5)
-            else:
-                await temp_message(ctx, embed=success_embed(
-                    title="Channel Cleaned",
-                    description=f"✅ Successfully deleted {len(deleted)} messages."
-                ), seconds=5)
-        except discord.Forbidden:
-            await ctx.send(embed=error_embed(
-                title="Clean Failed",
-                description="I don't have permission to delete messages in this channel."
-            ))
+        what = f"messages of type '{content_type}'" if content_type else "messages"
+        await self.run_purge(ctx, limit, purge_filter, "Channel Cleaned", what)
 
 async def setup(bot):
     await bot.add_cog(Moderation(bot))
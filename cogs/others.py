@@ -10,10 +10,23 @@ from utils.helpers import (
 from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed, create_embed
 )
+from utils.message_pipeline import MESSAGE_PIPELINE
+
+def involves_afk(context):
+    """Whether a message comes from or mentions a user who is AFK in its guild"""
+    afk_users = context.state.afk_users
+    if not afk_users:
+        return False
+    message = context.message
+    return message.author.id in afk_users or any(mention.id in afk_users for mention in message.mentions)
 
 class Others(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        MESSAGE_PIPELINE.register("afk", involves_afk, self.afk_stage)
+    
+    def cog_unload(self):
+        MESSAGE_PIPELINE.unregister("afk")
     
     @commands.command(name="8ball", aliases=["eightball", "8b"], help="Ask the magic 8ball a question")
     async def eightball(self, ctx, *, question=None):
@@ -625,14 +638,10 @@ class Others(commands.Cog):
         except discord.Forbidden:
             pass  # Ignore if the bot can't change the nickname
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    async def afk_stage(self, context):
         """Check for AFK users when messages are sent"""
-        # Ignore messages from bots
-        if message.author.bot or not message.guild:
-            return
-        
-        config = get_guild_config(message.guild.id)
+        message = context.message
+        config = context.config
         afk_users = config.get("afk_users", {})
         
         # Check if the author was AFK
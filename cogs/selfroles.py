@@ -5,7 +5,7 @@ import re
 from config import CONFIG
 from utils.helpers import (
     is_mod, is_admin, is_owner, get_guild_config, update_guild_config,
-    get_self_roles, update_self_roles
+    get_self_roles_async, update_self_roles_async
 )
 from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed, create_embed
@@ -38,7 +38,7 @@ class SelfRoles(commands.Cog):
             return
 
         # Get current self roles
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         # Check if role is already in self roles
         if str(role.id) in self_roles:
@@ -55,7 +55,7 @@ class SelfRoles(commands.Cog):
             "added_at": discord.utils.utcnow().timestamp()
         }
 
-        update_self_roles(ctx.guild.id, self_roles)
+        await update_self_roles_async(ctx.guild.id, self_roles)
 
         await ctx.send(embed=success_embed(
             title="Self Role Added",
@@ -66,7 +66,7 @@ class SelfRoles(commands.Cog):
     @commands.check(is_admin)
     async def remove_self_role(self, ctx, role: discord.Role):
         """Remove a role from the self-assignable roles list"""
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         if str(role.id) not in self_roles:
             await ctx.send(embed=error_embed(
@@ -77,7 +77,7 @@ class SelfRoles(commands.Cog):
 
         # Remove the role
         del self_roles[str(role.id)]
-        update_self_roles(ctx.guild.id, self_roles)
+        await update_self_roles_async(ctx.guild.id, self_roles)
 
         await ctx.send(embed=success_embed(
             title="Self Role Removed",
@@ -87,7 +87,7 @@ class SelfRoles(commands.Cog):
     @commands.command(name="selfroles", aliases=["sr", "roles"], help="List all self-assignable roles")
     async def list_self_roles(self, ctx):
         """List all self-assignable roles"""
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         if not self_roles:
             await ctx.send(embed=info_embed(
@@ -128,14 +128,14 @@ class SelfRoles(commands.Cog):
             embed.description = "All self-assignable roles have been deleted from the server."
 
         # Update database if any roles were removed
-        update_self_roles(ctx.guild.id, self_roles)
+        await update_self_roles_async(ctx.guild.id, self_roles)
 
         await ctx.send(embed=embed)
 
     @commands.command(name="iam", help="Assign yourself a role")
     async def i_am(self, ctx, *, role_name):
         """Assign a self-assignable role to the user"""
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         if not self_roles:
             await ctx.send(embed=error_embed(
@@ -188,7 +188,7 @@ class SelfRoles(commands.Cog):
     @commands.command(name="iamnot", help="Remove a role from yourself")
     async def i_am_not(self, ctx, *, role_name):
         """Remove a self-assignable role from the user"""
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         if not self_roles:
             await ctx.send(embed=error_embed(
@@ -245,7 +245,7 @@ class SelfRoles(commands.Cog):
         if not channel:
             channel = ctx.channel
 
-        self_roles = get_self_roles(ctx.guild.id)
+        self_roles = await get_self_roles_async(ctx.guild.id)
 
         if not self_roles:
             await ctx.send(embed=error_embed(
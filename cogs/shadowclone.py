@@ -12,11 +12,16 @@ from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed, create_embed
 )
 from utils.webhook_db import (
-    create_shadowclone, get_shadowclone, get_shadowclone_by_channel,
-    update_shadowclone, delete_shadowclone, deactivate_shadowclone,
-    get_user_shadowclones
+    create_shadowclone_async, get_shadowclone_async,
+    update_shadowclone_async, delete_shadowclone_async, deactivate_shadowclone_async,
+    get_user_shadowclones_async, load_shadowclone_registry_async
 )
 from utils.command_router import CommandRouter
+from utils.message_pipeline import MESSAGE_PIPELINE
+
+def starts_with_clone_prefix(context):
+    """Whether a message starts with the prefix of a shadow clone in its channel"""
+    return any(context.message.content.startswith(clone_data["prefix"]) for clone_data in context.clones)
 
 class ShadowClone(commands.Cog):
     """Shadow Clone system - Create personalized webhook clones of ESCUDO"""
@@ -24,6 +29,10 @@ class ShadowClone(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.command_router = CommandRouter(bot)
+        MESSAGE_PIPELINE.register("shadowclones", starts_with_clone_prefix, self.clone_command_stage)
+    
+    def cog_unload(self):
+        MESSAGE_PIPELINE.unregister("shadowclones")
     
     @discord.slash_command(name="shadowclone", description="Manage your shadow clones")
     async def shadowclone(self, ctx):
@@ -70,7 +79,7 @@ class ShadowClone(commands.Cog):
             avatar_url = self.bot.user.display_avatar.url
         
         # Check if user already has a clone in this channel
-        existing_clone = get_shadowclone(ctx.author.id, ctx.channel.id)
+        existing_clone = await get_shadowclone_async(ctx.author.id, ctx.channel.id)
         if existing_clone:
             await ctx.followup.send(embed=error_embed(
                 title="Clone Already Exists",
@@ -79,7 +88,7 @@ class ShadowClone(commands.Cog):
             return
         
         # Check if user has reached clone limit (5 clones max per user)
-        user_clones = get_user_shadowclones(ctx.author.id)
+        user_clones = await get_user_shadowclones_async(ctx.author.id)
         if len(user_clones) >= 5:
             await ctx.followup.send(embed=error_embed(
                 title="Clone Limit Reached",
@@ -95,7 +104,7 @@ class ShadowClone(commands.Cog):
             )
             
             # Store in database
-            success = create_shadowclone(
+            success = await create_shadowclone_async(
                 user_id=ctx.author.id,
                 channel_id=ctx.channel.id,
                 webhook_id=webhook.id,
@@ -158,7 +167,7 @@ class ShadowClone(commands.Cog):
         await ctx.defer()
         
         # Check if user has a clone in this channel
-        clone_data = get_shadowclone(ctx.author.id, ctx.channel.id)
+        clone_data = await get_shadowclone_async(ctx.author.id, ctx.channel.id)
         if not clone_data:
             await ctx.followup.send(embed=error_embed(
                 title="No Clone Found",
@@ -175,7 +184,7 @@ class ShadowClone(commands.Cog):
             pass
         
         # Remove from database
-        success = delete_shadowclone(ctx.author.id, ctx.channel.id)
+        success = await delete_shadowclone_async(ctx.author.id, ctx.channel.id)
         
         if success:
             embed = success_embed(
@@ -201,7 +210,7 @@ class ShadowClone(commands.Cog):
         await ctx.defer()
         
         # Check if user has a clone in this channel
-        clone_data = get_shadowclone(ctx.author.id, ctx.channel.id)
+        clone_data = await get_shadowclone_async(ctx.author.id, ctx.channel.id)
         if not clone_data:
             await ctx.followup.send(embed=error_embed(
                 title="No Clone Found",
@@ -253,11 +262,11 @@ class ShadowClone(commands.Cog):
             return
         
         # Update in database
-        success = update_shadowclone(ctx.author.id, ctx.channel.id, **updates)
+        success = await update_shadowclone_async(ctx.author.id, ctx.channel.id, **updates)
         
         if success:
             # Get updated data
-            updated_clone = get_shadowclone(ctx.author.id, ctx.channel.id)
+            updated_clone = await get_shadowclone_async(ctx.author.id, ctx.channel.id)
             
             embed = success_embed(
                 title="🔮 Shadow Clone Updated!",
@@ -282,7 +291,7 @@ class ShadowClone(commands.Cog):
         """List all shadow clones for the user"""
         await ctx.defer()
         
-        user_clones = get_user_shadowclones(ctx.author.id)
+        user_clones = await get_user_shadowclones_async(ctx.author.id)
         
         if not user_clones:
             await ctx.followup.send(embed=info_embed(
@@ -312,24 +321,16 @@ class ShadowClone(commands.Cog):
         await ctx.followup.send(embed=embed)
     
     @commands.Cog.listener()
-    async def on_message(self, message):
-        """Listen for messages that match shadow clone prefixes"""
-        # Ignore bot messages
-        if message.author.bot:
-            return
-        
-        # Ignore DMs
-        if not message.guild:
-            return
-        
-        # Get all shadow clones in this channel
-        clones = get_shadowclone_by_channel(message.channel.id)
-        
-        if not clones:
-            return
+    async def on_ready(self):
+        """Load the shadow clone registry off the event loop"""
+        await load_shadowclone_registry_async()
+    
+    async def clone_command_stage(self, context):
+        """Run commands sent with the prefix of a shadow clone in the channel"""
+        message = context.message
         
         # Check if message starts with any clone prefix
-        for clone_data in clones:
+        for clone_data in context.clones:
             prefix = clone_data["prefix"]
             
             if message.content.startswith(prefix):
@@ -354,7 +355,7 @@ class ShadowClone(commands.Cog):
                     
                 except (discord.NotFound, discord.Forbidden):
                     # Webhook was deleted, deactivate the clone
-                    deactivate_shadowclone(clone_data["user_id"], clone_data["channel_id"])
+                    await deactivate_shadowclone_async(clone_data["user_id"], clone_data["channel_id"])
                 except discord.HTTPException:
                     # Other webhook errors
                     pass
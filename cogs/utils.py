@@ -17,10 +17,65 @@ from utils.helpers import (
 from utils.embeds import (
     success_embed, error_embed, info_embed, warning_embed, create_embed
 )
+from utils.db import add_reminder_async, get_reminders_async, remove_reminder_async
+from utils.scheduler import DeadlineScheduler
+from utils.snipe import SNIPES
+from utils.message_pipeline import MESSAGE_PIPELINE
 
 class Utils(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.reminder_scheduler = DeadlineScheduler(self.send_reminders)
+        
+        # On a cog reload on_ready will not fire again
+        if bot.is_ready():
+            bot.loop.create_task(self.rehydrate_reminders())
+    
+    def cog_unload(self):
+        self.reminder_scheduler.stop()
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pick up reminders that were stored before the restart"""
+        await self.rehydrate_reminders()
+    
+    async def rehydrate_reminders(self):
+        """Load every pending reminder from storage into the scheduler"""
+        for reminder in await get_reminders_async():
+            self.reminder_scheduler.schedule(reminder["id"], reminder["due_at"], reminder)
+        self.reminder_scheduler.start()
+    
+    async def send_reminders(self, due):
+        """Deliver a batch of due reminders and drop them from storage"""
+        for reminder_id, reminder in due:
+            await remove_reminder_async(reminder_id)
+            
+            user = self.bot.get_user(int(reminder["user_id"]))
+            if user is None:
+                try:
+                    user = await self.bot.fetch_user(int(reminder["user_id"]))
+                except discord.HTTPException:
+                    continue
+            
+            reminder_embed = info_embed(
+                title="⏰ Reminder",
+                description=f"{user.mention}, you asked me to remind you:\n\n**{reminder['content']}**"
+            )
+            reminder_embed.set_footer(text=f"Reminder #{reminder_id} • Set")
+            reminder_embed.timestamp = datetime.fromtimestamp(reminder["created_at"])
+            
+            channel = self.bot.get_channel(int(reminder["channel_id"])) if reminder.get("channel_id") else None
+            if channel is not None:
+                try:
+                    await channel.send(content=user.mention, embed=reminder_embed)
+                except discord.HTTPException:
+                    pass
+            
+            # Also try to DM the user
+            try:
+                await user.send(embed=reminder_embed)
+            except discord.HTTPException:
+                pass
     
     @commands.command(name="ping", help="Check the bot's latency")
     async def ping(self, ctx):
@@ -35,9 +90,17 @@ class Utils(commands.Cog):
         # Get websocket latency
         websocket_latency = round(self.bot.latency * 1000)
         
+        description = f"**API Latency:** {api_latency}ms\n**Websocket Latency:** {websocket_latency}ms"
+        
+        # Event loop lag (how late scheduled callbacks run)
+        loop_monitor = getattr(self.bot, "loop_monitor", None)
+        if loop_monitor:
+            lag = loop_monitor.stats()
+            description += f"\n**Event Loop Lag:** {lag['current']:.1f}ms (avg {lag['average']:.1f}ms, p95 {lag['p95']:.1f}ms, max {lag['max']:.1f}ms)"
+        
         embed = info_embed(
             title="🏓 Pong!",
-            description=f"**API Latency:** {api_latency}ms\n**Websocket Latency:** {websocket_latency}ms"
+            description=description
         )
         
         await message.edit(content=None, embed=embed)
@@ -248,6 +311,14 @@ class Utils(commands.Cog):
         embed.add_field(name="Memory", value=f"{memory_usage:.2f} MB", inline=True)
         embed.add_field(name="Uptime", value=uptime_str, inline=True)
         
+        # Snipe store size against its fixed budget
+        snipes = SNIPES.stats()
+        embed.add_field(
+            name="Snipe Cache",
+            value=f"{snipes['bytes'] / 1024:.0f} / {snipes['budget'] / 1024:.0f} KB\n{snipes['records']} messages in {snipes['channels']} channels",
+            inline=True
+        )
+        
         # Send the embed
         await ctx.send(embed=embed)
     
@@ -491,49 +562,74 @@ class Utils(commands.Cog):
             ))
             return
         
+        # Persist the reminder so it survives restarts, then hand it to the scheduler
+        due_at = datetime.now().timestamp() + seconds
+        reminder_id = await add_reminder_async(
+            ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None, reminder, due_at
+        )
+        self.reminder_scheduler.schedule(reminder_id, due_at, {
+            "id": reminder_id,
+            "user_id": str(ctx.author.id),
+            "channel_id": str(ctx.channel.id),
+            "content": reminder,
+            "created_at": datetime.now().timestamp()
+        })
+        
         # Confirm the reminder
         await ctx.send(embed=success_embed(
             title="Reminder Set",
-            description=f"I'll remind you about: **{reminder}** in **{amount}{unit}**"
+            description=f"I'll remind you about: **{reminder}** in **{amount}{unit}**\nReminder ID: `{reminder_id}`"
         ))
+    
+    @commands.command(name="reminders", help="List your pending reminders")
+    async def reminders(self, ctx):
+        """List your pending reminders"""
+        reminders = await get_reminders_async(ctx.author.id)
         
-        # Wait for the specified time
-        await asyncio.sleep(seconds)
+        if not reminders:
+            await ctx.send(embed=info_embed(
+                title="No Reminders",
+                description="You don't have any pending reminders."
+            ))
+            return
         
-        # Send the reminder
-        try:
-            reminder_embed = info_embed(
-                title="⏰ Reminder",
-                description=f"{ctx.author.mention}, you asked me to remind you:\n\n**{reminder}**"
+        embed = info_embed(
+            title="⏰ Your Reminders",
+            description=f"You have {len(reminders)} pending reminder(s)."
+        )
+        
+        # Discord caps embeds at 25 fields
+        for reminder in reminders[:25]:
+            content = reminder["content"]
+            if len(content) > 100:
+                content = content[:97] + "..."
+            embed.add_field(
+                name=f"Reminder #{reminder['id']}",
+                value=f"{content}\nDue <t:{int(reminder['due_at'])}:R>",
+                inline=False
             )
-            
-            # Add a timestamp for when the reminder was set
-            reminder_time = datetime.now().timestamp() - seconds
-            reminder_embed.set_footer(text=f"Reminder set {time} ago")
-            
-            await ctx.channel.send(content=ctx.author.mention, embed=reminder_embed)
-            
-            # Also try to DM the user
-            try:
-                await ctx.author.send(embed=reminder_embed)
-            except discord.Forbidden:
-                pass
-                
-        except discord.NotFound:
-            # If the channel was deleted, try to DM the user
-            try:
-                reminder_embed = info_embed(
-                    title="⏰ Reminder",
-                    description=f"You asked me to remind you:\n\n**{reminder}**"
-                )
-                
-                # Add a timestamp for when the reminder was set
-                reminder_time = datetime.now().timestamp() - seconds
-                reminder_embed.set_footer(text=f"Reminder set {time} ago")
-                
-                await ctx.author.send(embed=reminder_embed)
-            except discord.Forbidden:
-                pass
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name="cancelreminder", aliases=["delreminder", "unremind"], help="Cancel a pending reminder")
+    async def cancelreminder(self, ctx, reminder_id: int):
+        """Cancel one of your pending reminders"""
+        reminders = await get_reminders_async(ctx.author.id)
+        
+        if not any(reminder["id"] == reminder_id for reminder in reminders):
+            await ctx.send(embed=error_embed(
+                title="Reminder Not Found",
+                description=f"You don't have a reminder with ID `{reminder_id}`."
+            ))
+            return
+        
+        await remove_reminder_async(reminder_id)
+        self.reminder_scheduler.cancel(reminder_id)
+        
+        await ctx.send(embed=success_embed(
+            title="Reminder Cancelled",
+            description=f"Reminder `{reminder_id}` has been cancelled."
+        ))
     
     @commands.command(name="eval", hidden=True, help="Evaluate Python code")
     @commands.check(is_owner)
@@ -593,6 +689,21 @@ class Utils(commands.Cog):
     # Add the missing import
     import textwrap
     
+    @commands.command(name="pipeline", hidden=True, help="Show message pipeline stage timings")
+    @commands.check(is_owner)
+    async def pipeline(self, ctx):
+        """Show how often each message stage ran and how long it took (Owner only)"""
+        stats = MESSAGE_PIPELINE.stats()
+        lines = [
+            f"**{stage['name']}:** {stage['runs']} runs, {stage['errors']} errors, avg {stage['average']:.1f}ms, max {stage['max']:.1f}ms"
+            for stage in stats
+        ]
+        
+        await ctx.send(embed=info_embed(
+            title="Message Pipeline",
+            description=f"**Messages dispatched:** {MESSAGE_PIPELINE.dispatched}\n" + ("\n".join(lines) or "No stages registered.")
+        ))
+    
     @commands.command(name="reload", hidden=True, help="Reload a cog")
     @commands.check(is_owner)
     async def reload(self, ctx, cog=None):
@@ -16,8 +16,11 @@ CONFIG = {
         'admin_roles': {},
         'mod_roles': {}
     },
+    # Storage backend: "sqlite" (default) or "json" for the original data/*.json files
+    'storage_backend': os.getenv("STORAGE_BACKEND", "sqlite"),
+    'sqlite_path': os.getenv("SQLITE_PATH", os.path.join("data", "escudo.db")),
     'developer_commands': [
-        'extraowner', 'mainrole', 'whitelistreset', 'eval', 'reload', 'shutdown'
+        'extraowner', 'mainrole', 'whitelistreset', 'eval', 'reload', 'shutdown', 'pipeline'
     ],
     'embed_color': 0xE74C3C,  # Red color similar to the screenshot
     'success_color': 0x2ECC71,  # Green color for success messages
@@ -15,6 +15,10 @@ from datetime import datetime
 import platform
 import psutil
 from keep_alive import keep_alive
+from utils.helpers import flush_guild_configs, preload_guild_configs_async
+from utils.loop_monitor import LoopLagMonitor
+from utils.message_pipeline import MESSAGE_PIPELINE
+from utils.permission import register_permission_listeners
 
 # ANSI color codes for beautiful console output
 class Colors:
@@ -222,8 +226,18 @@ async def setup_hook():
     print(f"\n{Colors.PURPLE}{Colors.BOLD}🚀 INITIALIZATION SEQUENCE{Colors.END}")
     print(f"{Colors.PURPLE}{'─' * 50}{Colors.END}")
 
+    # Guild configs are read on every event; load them all before the gateway connects
+    await preload_guild_configs_async()
+
     await load_cogs()
 
+    # Keep cached permission decisions in step with role and member changes
+    register_permission_listeners(bot)
+
+    # Track event loop lag so blocking work on the loop shows up in ,ping
+    bot.loop_monitor = LoopLagMonitor()
+    bot.loop_monitor.start()
+
     # Count commands
     for command in bot.commands:
         bot.command_count += 1
@@ -246,34 +260,22 @@ async def on_message(message):
     if message.content.lower().startswith("test"):
         await message.channel.send("Bot is responding to 'test'!")
 
-    # This is required to process commands!
-    await bot.process_commands(message)
+    # Feature stages (media channels, AFK, shadow clones) run beside command processing
+    await asyncio.gather(MESSAGE_PIPELINE.dispatch(message), bot.process_commands(message))
 
 # Ensure all data files exist
 def ensure_data_files():
     """Ensure all required data files exist"""
     import os
-    import json
+    from utils.storage import migrate_legacy_layout
     
     data_dir = "data"
     os.makedirs(data_dir, exist_ok=True)
     
-    # Default data structures
-    default_files = {
-        "shadowclones.json": {"clones": {}},
-        "self_roles.json": {"guilds": {}},
-        "server_config.json": {"guilds": {}},
-        "warnings.json": {"guilds": {}},
-        "mutes.json": {"guilds": {}},
-        "join_to_create.json": {"guilds": {}},
-        "whitelist.json": {"guilds": {}}
-    }
-    
-    for filename, default_data in default_files.items():
-        filepath = os.path.join(data_dir, filename)
-        if not os.path.exists(filepath):
-            with open(filepath, 'w') as f:
-                json.dump(default_data, f, indent=4)
+    # Guild data is sharded into data/guilds/<guild_id>/; split the old monolithic files
+    migrated = migrate_legacy_layout(data_dir)
+    if migrated:
+        print_status_update(f"Migrated {migrated} guild documents to per-guild files", "SUCCESS")
 
 
 
@@ -329,6 +331,9 @@ def main():
         bot.run(token)
     except Exception as e:
         print_status_update(f"Failed to start bot: {e}", "ERROR")
+    finally:
+        # Persist any guild config changes still waiting in the write-back cache
+        flush_guild_configs()
 
 # Create an app object for gunicorn to use 
 # This will be completely ignored when the bot runs
@@ -11,7 +11,13 @@ ensure_data_files()
 
 print("\nChecking database files...")
 DB_DIR = "data"
-files = os.listdir(DB_DIR)
+# Guild data lives in data/guilds/<guild_id>/*.json
+files = [
+    os.path.relpath(os.path.join(root, name), DB_DIR)
+    for root, _, names in os.walk(DB_DIR)
+    for name in names
+    if name.endswith(".json")
+]
 
 if files:
     print(f"Found {len(files)} files in the data directory:")
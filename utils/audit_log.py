@@ -0,0 +1,221 @@
+import asyncio
+from collections import deque
+from datetime import timedelta
+import discord
+
+# How long events are collected before one audit log fetch serves them all
+AUDIT_LOG_COALESCE_DELAY = 0.5
+# Polls back off up to this delay while an entry has still not shown up
+AUDIT_LOG_MAX_DELAY = 2
+# Entries older than this are never attributed to a new event
+AUDIT_LOG_MAX_AGE = 60
+# An event only takes entries written at most this many seconds before it was seen, for clock skew
+AUDIT_LOG_CLOCK_SKEW = 2
+# How long a listener waits for its entry to show up before giving up
+AUDIT_LOG_TIMEOUT = 6
+# Actions whose gateway event does not carry the target id; their entries are handed out in order
+CLAIMABLE_ACTIONS = frozenset({discord.AuditLogAction.webhook_create})
+
+class GuildAuditState:
+    def __init__(self):
+        self.entries = {}
+        self.waiters = {}
+        self.unclaimed = {}
+        self.claims = {}
+        self.last_entry_id = None
+        self.new_waiters = False
+        self.task = None
+
+class AuditLogResolver:
+    """Attribute gateway events to audit log entries with one poller per guild
+
+    Listeners register the (action, target id) they need and wait. A single
+    task per guild collects the burst, reads the audit log newest-first in
+    one paged request stream, queues recent entries by (action, target id)
+    and resolves every waiter it can. Each entry explains one event only:
+    a waiter takes the oldest queued entry written no earlier than the
+    event (less AUDIT_LOG_CLOCK_SKEW), so an earlier edit of the same target
+    by someone else is never blamed for, or credited with, a later one. Unresolved waiters are retried on the
+    next poll until they time out, because Discord sometimes writes the entry
+    after the gateway event arrives. Events that do not say what they
+    targeted, such as webhook updates, claim the oldest unclaimed entry of
+    their action instead, so each entry is attributed to one event only.
+    """
+
+    def __init__(self, coalesce_delay=AUDIT_LOG_COALESCE_DELAY, timeout=AUDIT_LOG_TIMEOUT):
+        self.coalesce_delay = coalesce_delay
+        self.timeout = timeout
+        self._guilds = {}
+
+    async def resolve(self, guild, action, target_id):
+        """Return the audit log entry for an action on target_id, or None"""
+        state = self._guilds.setdefault(guild.id, GuildAuditState())
+        key = (action, target_id)
+        since = discord.utils.utcnow() - timedelta(seconds=AUDIT_LOG_CLOCK_SKEW)
+
+        entry = self._take(state, key, since)
+        if entry is not None:
+            return entry
+
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.setdefault(key, []).append((future, since))
+        state.new_waiters = True
+        if state.task is None:
+            state.task = asyncio.create_task(self._poll(guild, state))
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = state.waiters.get(key)
+            if waiters and (future, since) in waiters:
+                waiters.remove((future, since))
+                if not waiters:
+                    del state.waiters[key]
+
+    async def claim(self, guild, action):
+        """Return the oldest recent entry for action not yet claimed by another event, or None"""
+        state = self._guilds.setdefault(guild.id, GuildAuditState())
+
+        entry = self._next_unclaimed(state, action)
+        if entry is not None:
+            return entry
+
+        future = asyncio.get_running_loop().create_future()
+        state.claims.setdefault(action, []).append(future)
+        state.new_waiters = True
+        if state.task is None:
+            state.task = asyncio.create_task(self._poll(guild, state))
+
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            claims = state.claims.get(action)
+            if claims and future in claims:
+                claims.remove(future)
+                if not claims:
+                    del state.claims[action]
+
+    def _next_unclaimed(self, state, action):
+        entries = state.unclaimed.get(action)
+        now = discord.utils.utcnow()
+        while entries:
+            entry = entries.popleft()
+            if (now - entry.created_at).total_seconds() <= AUDIT_LOG_MAX_AGE:
+                return entry
+        return None
+
+    def _take(self, state, key, since):
+        """Remove and return the oldest queued entry for key written at or after since"""
+        entries = state.entries.get(key)
+        if not entries:
+            return None
+
+        for index, entry in enumerate(entries):
+            if entry.created_at >= since:
+                del entries[index]
+                if not entries:
+                    del state.entries[key]
+                return entry
+        return None
+
+    async def _poll(self, guild, state):
+        delay = self.coalesce_delay
+        try:
+            while state.waiters or state.claims:
+                # Fresh events get a prompt fetch; waiting on stragglers backs off
+                delay = self.coalesce_delay if state.new_waiters else min(delay * 2, AUDIT_LOG_MAX_DELAY)
+                state.new_waiters = False
+                await asyncio.sleep(delay)
+
+                try:
+                    await self._fetch(guild, state)
+                except discord.Forbidden:
+                    # No audit log access: nothing can ever be attributed
+                    self._resolve_waiters(state, give_up=True)
+                    return
+                except discord.HTTPException:
+                    continue
+
+                self._resolve_waiters(state)
+        finally:
+            state.task = None
+
+    async def _fetch(self, guild, state):
+        """Read every entry newer than the last fetch, newest first
+
+        Paging has no fixed limit: it stops at the last entry already seen or
+        at the first entry too old to be attributed, so a burst larger than
+        one page is read in full and the cursor never skips unread entries.
+        """
+        now = discord.utils.utcnow()
+        newest_id = None
+        fetched = {}
+        claimable = {}
+
+        async for entry in guild.audit_logs(limit=None):
+            if state.last_entry_id is not None and entry.id <= state.last_entry_id:
+                break
+            if (now - entry.created_at).total_seconds() > AUDIT_LOG_MAX_AGE:
+                break
+
+            if newest_id is None:
+                newest_id = entry.id
+
+            key = (entry.action, getattr(entry.target, "id", None))
+            fetched.setdefault(key, []).append(entry)
+            if entry.action in CLAIMABLE_ACTIONS:
+                claimable.setdefault(entry.action, []).append(entry)
+
+        if newest_id is not None:
+            state.last_entry_id = newest_id
+
+        # Queue entries oldest first
+        for key, entries in fetched.items():
+            state.entries.setdefault(key, deque()).extend(reversed(entries))
+        for action, entries in claimable.items():
+            state.unclaimed.setdefault(action, deque()).extend(reversed(entries))
+
+        # Drop entries that are too old to be matched again
+        for key, entries in list(state.entries.items()):
+            while entries and (now - entries[0].created_at).total_seconds() > AUDIT_LOG_MAX_AGE:
+                entries.popleft()
+            if not entries:
+                del state.entries[key]
+        for entries in state.unclaimed.values():
+            while entries and (now - entries[0].created_at).total_seconds() > AUDIT_LOG_MAX_AGE:
+                entries.popleft()
+
+    def _resolve_waiters(self, state, give_up=False):
+        # Hand entries to the waiters of each key in arrival order
+        for key, waiters in list(state.waiters.items()):
+            while waiters:
+                future, since = waiters[0]
+                if future.done():
+                    waiters.pop(0)
+                    continue
+                entry = None if give_up else self._take(state, key, since)
+                if entry is None and not give_up:
+                    break
+                waiters.pop(0)
+                future.set_result(entry)
+            if not waiters:
+                del state.waiters[key]
+
+        # Hand claimable entries to waiting events in arrival order
+        for action, claims in list(state.claims.items()):
+            while claims:
+                if claims[0].done():
+                    claims.pop(0)
+                    continue
+                entry = None if give_up else self._next_unclaimed(state, action)
+                if entry is None and not give_up:
+                    break
+                claims.pop(0).set_result(entry)
+            if not claims:
+                del state.claims[action]
+
+AUDIT_LOGS = AuditLogResolver()
@@ -0,0 +1,53 @@
+import asyncio
+
+# Default number of Discord API calls a bulk operation keeps in flight
+DEFAULT_CONCURRENCY = 5
+
+async def run_bounded(func, items, limit=DEFAULT_CONCURRENCY):
+    """Await func(item) for every item with at most `limit` calls in flight
+
+    A fixed pool of workers pulls from one shared iterator, so a large or lazy
+    iterable never turns into one task per item. Returns results in input
+    order; a call that raised contributes its exception instead of a result.
+    """
+    results = {}
+    iterator = enumerate(items)
+
+    async def worker():
+        for index, item in iterator:
+            try:
+                results[index] = await func(item)
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*(worker() for _ in range(max(1, limit))))
+    return [results[index] for index in sorted(results)]
+
+async def stream_bounded(func, items, limit=DEFAULT_CONCURRENCY):
+    """Await func(item) for every item of an async iterable with at most `limit` calls in flight
+
+    Workers pull the next item only once they are free, so a paginated
+    source is fetched no faster than it is consumed and nothing is collected.
+    Returns (succeeded, failed) counts; a call that raised counts as failed.
+    """
+    iterator = aiter(items)
+    lock = asyncio.Lock()
+    counts = [0, 0]
+
+    async def worker():
+        while True:
+            # An async iterator cannot be advanced from several tasks at once
+            async with lock:
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+
+            try:
+                await func(item)
+                counts[0] += 1
+            except Exception:
+                counts[1] += 1
+
+    await asyncio.gather(*(worker() for _ in range(max(1, limit))))
+    return counts[0], counts[1]
@@ -0,0 +1,158 @@
+import asyncio
+import time
+import discord
+from utils.bulk import run_bounded
+from utils.db import get_bulk_jobs_async, save_bulk_job_async, delete_bulk_job_async
+from utils.embeds import success_embed, error_embed, info_embed
+
+# Member role edits share one per-guild rate limit bucket; more requests in flight only queue behind it
+ROLE_JOB_CONCURRENCY = 3
+# Targets finished between two checkpoints; at most this many are repeated after a restart
+CHECKPOINT_SIZE = 50
+# Minimum seconds between two edits of a job's progress message
+PROGRESS_INTERVAL = 5
+
+class BulkJobRunner:
+    """Resumable bulk jobs, at most one per guild, checkpointed to storage
+
+    A job walks its targets in ascending id order in chunks of
+    CHECKPOINT_SIZE, runs each chunk with bounded concurrency and then
+    stores the highest id it finished as the job's cursor. After a restart
+    the job lists its targets again and skips everything up to the cursor,
+    so the per-target operation must be safe to repeat. Job kinds are
+    registered with a function listing their targets and a coroutine
+    function applying the operation to one target.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.jobs = {}
+        self._kinds = {}
+        self._tasks = {}
+
+    def register(self, kind, targets, apply, concurrency):
+        self._kinds[kind] = (targets, apply, concurrency)
+
+    def get(self, guild_id):
+        return self.jobs.get(str(guild_id))
+
+    def count_targets(self, guild, job):
+        targets, _, _ = self._kinds[job["kind"]]
+        return len(targets(guild, job))
+
+    async def start(self, guild, job):
+        """Persist a new job (kind, label, progress message and options) and start it"""
+        job.update({
+            "guild_id": str(guild.id),
+            "cursor": 0,
+            "done": 0,
+            "failed": 0,
+            "started_at": time.time()
+        })
+        job.setdefault("total", self.count_targets(guild, job))
+        self.jobs[job["guild_id"]] = job
+        await save_bulk_job_async(job["guild_id"], job)
+        self._spawn(guild, job)
+
+    async def resume(self):
+        """Restart every stored job whose guild is available and not already running"""
+        for job_id, job in (await get_bulk_jobs_async()).items():
+            guild = self.bot.get_guild(int(job["guild_id"]))
+            if job_id in self._tasks or guild is None or job["kind"] not in self._kinds:
+                continue
+            self.jobs[job_id] = job
+            self._spawn(guild, job)
+
+    async def cancel(self, guild_id):
+        """Stop a guild's job and forget it; returns the job or None"""
+        job = self.jobs.pop(str(guild_id), None)
+        if job is None:
+            return None
+
+        task = self._tasks.pop(str(guild_id), None)
+        if task is not None:
+            task.cancel()
+        await delete_bulk_job_async(str(guild_id))
+        return job
+
+    def stop(self):
+        """Stop every running job but keep the checkpoints for the next start"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def _spawn(self, guild, job):
+        self._tasks[job["guild_id"]] = asyncio.create_task(self._run(guild, job))
+
+    async def _run(self, guild, job):
+        job_id = job["guild_id"]
+        list_targets, apply, concurrency = self._kinds[job["kind"]]
+        last_progress = time.monotonic()
+        error = None
+
+        async def run(target):
+            await apply(guild, job, target)
+
+        try:
+            targets = sorted(
+                (target for target in list_targets(guild, job) if target.id > job["cursor"]),
+                key=lambda target: target.id
+            )
+
+            for start in range(0, len(targets), CHECKPOINT_SIZE):
+                chunk = targets[start:start + CHECKPOINT_SIZE]
+                results = await run_bounded(run, chunk, concurrency)
+                failures = [result for result in results if isinstance(result, Exception)]
+
+                # A whole chunk refused means the bot lost the permission or the role moved above it
+                if len(failures) == len(results) and all(isinstance(failure, discord.Forbidden) for failure in failures):
+                    error = "I no longer have permission to do this."
+                    break
+                # Role kinds raise LookupError once their role is gone, so every later chunk would fail too
+                if len(failures) == len(results) and all(isinstance(failure, LookupError) for failure in failures):
+                    error = "The role was deleted."
+                    break
+
+                job["done"] += len(results) - len(failures)
+                job["failed"] += len(failures)
+                job["cursor"] = chunk[-1].id
+                await save_bulk_job_async(job_id, job)
+
+                if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    await self._edit_progress(guild, job, info_embed(
+                        title="Bulk Job Running",
+                        description=self.describe(job)
+                    ))
+        finally:
+            self._tasks.pop(job_id, None)
+
+        self.jobs.pop(job_id, None)
+        await delete_bulk_job_async(job_id)
+
+        if error:
+            embed = error_embed(title="Bulk Job Stopped", description=f"{self.describe(job)}\n\n{error}")
+        else:
+            embed = success_embed(title="Bulk Job Complete", description=f"✅ {self.describe(job, finished=True)}")
+        await self._edit_progress(guild, job, embed)
+
+    def describe(self, job, finished=False):
+        processed = job["done"] + job["failed"]
+        description = f"{job['label']}: **{processed}/{job['total']}** processed"
+        if job["failed"]:
+            description += f", {job['failed']} failed"
+
+        # Targets that left, or were handled in the chunk a restart interrupted, are never counted
+        skipped = job["total"] - processed
+        if finished and skipped > 0:
+            description += f", {skipped} skipped"
+        return description
+
+    async def _edit_progress(self, guild, job, embed):
+        channel = guild.get_channel(int(job["channel_id"]))
+        if channel is None:
+            return
+        try:
+            await channel.get_partial_message(int(job["message_id"])).edit(embed=embed)
+        except discord.HTTPException:
+            pass
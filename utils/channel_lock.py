@@ -0,0 +1,79 @@
+import discord
+from utils.bulk import run_bounded
+
+# Channel permission edits kept in flight; they share one per-guild rate limit bucket
+CHANNEL_EDIT_CONCURRENCY = 5
+
+def overwrite_pair(overwrite):
+    """JSON-friendly [allow, deny] copy of an overwrite; None when there was none"""
+    if overwrite is None:
+        return None
+    allow, deny = overwrite.pair()
+    return [allow.value, deny.value]
+
+def saved_permission(pair, permission):
+    """True, False or None for one permission in a saved [allow, deny] pair"""
+    if pair is None:
+        return None
+    overwrite = discord.PermissionOverwrite.from_pair(discord.Permissions(pair[0]), discord.Permissions(pair[1]))
+    return getattr(overwrite, permission)
+
+async def set_everyone_permission(guild, channels, permission, value, saved, reason, concurrency=CHANNEL_EDIT_CONCURRENCY):
+    """Set one @everyone permission on every channel, saving the overwrite each edit replaces
+
+    `saved` maps channel ids to [allow, deny] pairs (or None for no
+    overwrite) and is updated in place for the caller to persist. Channels
+    already at `value` cost no request, and a channel that is already saved
+    keeps its first snapshot, so repeated runs never lose the original state.
+    Returns (changed, skipped, failed) counts.
+    """
+    everyone = guild.default_role
+    pending = [channel for channel in channels if getattr(channel.overwrites_for(everyone), permission) is not value]
+
+    async def apply(channel):
+        previous = channel.overwrites.get(everyone)
+        overwrite = channel.overwrites_for(everyone)
+        setattr(overwrite, permission, value)
+        await channel.set_permissions(everyone, overwrite=overwrite, reason=reason)
+        saved.setdefault(str(channel.id), overwrite_pair(previous))
+
+    results = await run_bounded(apply, pending, concurrency)
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    return len(pending) - failed, len(channels) - len(pending), failed
+
+async def restore_everyone_permission(guild, channels, permission, saved, reason, reset_unsaved=False, concurrency=CHANNEL_EDIT_CONCURRENCY):
+    """Put one @everyone permission back to its saved state on every channel
+
+    Only that permission is reverted, so other edits made in the meantime
+    survive, and an overwrite left empty is removed as it was before the
+    first edit. Channels with nothing saved were already in that state before
+    the bulk edit and are left alone, unless `reset_unsaved` asks for them to
+    go back to neutral (an explicit unlock of one channel). Restored and
+    deleted channels are dropped from `saved`; failed ones stay for a retry.
+    Returns (changed, skipped, failed) counts.
+    """
+    everyone = guild.default_role
+    pending = []
+    for channel in channels:
+        if str(channel.id) not in saved and not reset_unsaved:
+            continue
+        target = saved_permission(saved.get(str(channel.id)), permission)
+        if getattr(channel.overwrites_for(everyone), permission) is target:
+            saved.pop(str(channel.id), None)
+            continue
+        pending.append((channel, target))
+
+    async def restore(item):
+        channel, target = item
+        overwrite = channel.overwrites_for(everyone)
+        setattr(overwrite, permission, target)
+        await channel.set_permissions(everyone, overwrite=None if overwrite.is_empty() else overwrite, reason=reason)
+        saved.pop(str(channel.id), None)
+
+    results = await run_bounded(restore, pending, concurrency)
+
+    for channel_id in [channel_id for channel_id in saved if guild.get_channel(int(channel_id)) is None]:
+        del saved[channel_id]
+
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    return len(pending) - failed, len(channels) - len(pending), failed
@@ -1,157 +1,126 @@
-import json
 import os
 from datetime import datetime
+from utils.storage import get_storage, migrate_legacy_layout, offload
 
 # Directory for storing database files
 DB_DIR = "data"
 os.makedirs(DB_DIR, exist_ok=True)
 
-# Database files
-WARNINGS_FILE = os.path.join(DB_DIR, "warnings.json")
-MUTES_FILE = os.path.join(DB_DIR, "mutes.json")
-
 # Ensure database files exist
+# Warnings and mutes are sharded per guild; split any monolithic files left over
 def ensure_db_files():
-    files = {
-        WARNINGS_FILE: {"guilds": {}},
-        MUTES_FILE: {"guilds": {}}
-    }
-    
-    for file_path, default_data in files.items():
-        if not os.path.exists(file_path):
-            with open(file_path, 'w') as f:
-                json.dump(default_data, f, indent=4)
+    migrate_legacy_layout(DB_DIR)
 
 ensure_db_files()
 
-# File operations
-def load_db(file_path):
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        default_data = {"guilds": {}}
-        save_db(file_path, default_data)
-        return default_data
-
-def save_db(file_path, data):
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
-
 # Warning system
 def add_warning(guild_id, user_id, moderator_id, reason):
-    data = load_db(WARNINGS_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"]:
-        data["guilds"][guild_id] = {}
-    
-    if user_id not in data["guilds"][guild_id]:
-        data["guilds"][guild_id][user_id] = []
-    
-    warning_id = len(data["guilds"][guild_id][user_id]) + 1
-    
-    data["guilds"][guild_id][user_id].append({
-        "id": warning_id,
-        "moderator_id": str(moderator_id),
-        "reason": reason,
-        "timestamp": datetime.now().timestamp()
-    })
-    
-    save_db(WARNINGS_FILE, data)
-    return warning_id
+    return get_storage().add_warning(guild_id, user_id, moderator_id, reason, datetime.now().timestamp())
 
 def get_warnings(guild_id, user_id):
-    data = load_db(WARNINGS_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"] or user_id not in data["guilds"][guild_id]:
-        return []
-    
-    return data["guilds"][guild_id][user_id]
+    return get_storage().get_warnings(guild_id, user_id)
 
 def remove_warning(guild_id, user_id, warning_id):
-    data = load_db(WARNINGS_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"] or user_id not in data["guilds"][guild_id]:
-        return False
-    
-    for i, warning in enumerate(data["guilds"][guild_id][user_id]):
-        if warning["id"] == warning_id:
-            data["guilds"][guild_id][user_id].pop(i)
-            save_db(WARNINGS_FILE, data)
-            return True
-    
-    return False
+    return get_storage().remove_warning(guild_id, user_id, warning_id)
 
 def clear_warnings(guild_id, user_id):
-    data = load_db(WARNINGS_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"] or user_id not in data["guilds"][guild_id]:
-        return False
-    
-    data["guilds"][guild_id][user_id] = []
-    save_db(WARNINGS_FILE, data)
-    return True
+    return get_storage().clear_warnings(guild_id, user_id)
 
 # Mute system
-def add_mute(guild_id, user_id, moderator_id, reason, expire_time=None):
-    data = load_db(MUTES_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"]:
-        data["guilds"][guild_id] = {}
-    
-    data["guilds"][guild_id][user_id] = {
+def add_mute(guild_id, user_id, moderator_id, reason, expire_time=None, source="mute"):
+    """Record a mute; `source` is "mute" or "chatban", the command whose timeout or role it tracks"""
+    get_storage().set_mute(guild_id, user_id, {
         "moderator_id": str(moderator_id),
         "reason": reason,
         "timestamp": datetime.now().timestamp(),
-        "expire_time": expire_time
-    }
-    
-    save_db(MUTES_FILE, data)
+        "expire_time": expire_time,
+        "source": source
+    })
     return True
 
 def remove_mute(guild_id, user_id):
-    data = load_db(MUTES_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"] or user_id not in data["guilds"][guild_id]:
-        return False
-    
-    del data["guilds"][guild_id][user_id]
-    save_db(MUTES_FILE, data)
-    return True
+    return get_storage().remove_mute(guild_id, user_id)
 
-def is_muted(guild_id, user_id):
-    data = load_db(MUTES_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-    
-    if guild_id not in data["guilds"] or user_id not in data["guilds"][guild_id]:
-        return False
+def get_mute(guild_id, user_id):
+    """Return the active mute record of a user, or None; records from before sources existed are mutes"""
+    mute_data = get_storage().get_mute(guild_id, user_id)
+    if mute_data is None:
+        return None
     
-    mute_data = data["guilds"][guild_id][user_id]
     if mute_data.get("expire_time") is not None:
         if datetime.now().timestamp() > mute_data["expire_time"]:
             remove_mute(guild_id, user_id)
-            return False
+            return None
     
-    return True
+    mute_data.setdefault("source", "mute")
+    return mute_data
+
+def is_muted(guild_id, user_id):
+    """Whether the user is muted by the mute command; chatban timeouts do not count"""
+    mute_data = get_mute(guild_id, user_id)
+    return mute_data is not None and mute_data["source"] == "mute"
 
 def get_expired_mutes():
-    data = load_db(MUTES_FILE)
+    storage = get_storage()
     expired_mutes = []
     current_time = datetime.now().timestamp()
     
-    for guild_id, guild_data in data["guilds"].items():
-        for user_id, mute_data in list(guild_data.items()):
-            if mute_data.get("expire_time") is not None and current_time > mute_data["expire_time"]:
-                expired_mutes.append((guild_id, user_id))
-                del data["guilds"][guild_id][user_id]
-    
-    if expired_mutes:
-        save_db(MUTES_FILE, data)
+    for guild_id, user_id, mute_data in storage.get_all_mutes():
+        if mute_data.get("expire_time") is not None and current_time > mute_data["expire_time"]:
+            expired_mutes.append((guild_id, user_id))
+            storage.remove_mute(guild_id, user_id)
     
     return expired_mutes
+
+def get_timed_mutes():
+    """Return (guild_id, user_id, expire_time) for every mute with an expiry"""
+    return [
+        (guild_id, user_id, mute_data["expire_time"])
+        for guild_id, user_id, mute_data in get_storage().get_all_mutes()
+        if mute_data.get("expire_time") is not None
+    ]
+
+# Reminder system
+def add_reminder(user_id, channel_id, guild_id, content, due_at):
+    return get_storage().add_reminder({
+        "user_id": str(user_id),
+        "channel_id": str(channel_id) if channel_id else None,
+        "guild_id": str(guild_id) if guild_id else None,
+        "content": content,
+        "created_at": datetime.now().timestamp(),
+        "due_at": due_at
+    })
+
+def get_reminders(user_id=None):
+    return get_storage().get_reminders(user_id)
+
+def remove_reminder(reminder_id):
+    return get_storage().remove_reminder(reminder_id)
+
+# Bulk jobs
+def get_bulk_jobs():
+    return get_storage().get_bulk_jobs()
+
+def save_bulk_job(job_id, job_data):
+    get_storage().save_bulk_job(job_id, job_data)
+
+def delete_bulk_job(job_id):
+    return get_storage().delete_bulk_job(job_id)
+
+# Async API: blocking storage calls run on the storage executor
+add_warning_async = offload(add_warning)
+get_warnings_async = offload(get_warnings)
+remove_warning_async = offload(remove_warning)
+clear_warnings_async = offload(clear_warnings)
+add_mute_async = offload(add_mute)
+remove_mute_async = offload(remove_mute)
+get_mute_async = offload(get_mute)
+is_muted_async = offload(is_muted)
+get_expired_mutes_async = offload(get_expired_mutes)
+get_timed_mutes_async = offload(get_timed_mutes)
+add_reminder_async = offload(add_reminder)
+get_reminders_async = offload(get_reminders)
+remove_reminder_async = offload(remove_reminder)
+get_bulk_jobs_async = offload(get_bulk_jobs)
+save_bulk_job_async = offload(save_bulk_job)
+delete_bulk_job_async = offload(delete_bulk_job)
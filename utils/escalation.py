@@ -0,0 +1,25 @@
+# Permission bits that let an account nuke a server, by Discord permission flag name
+DANGEROUS_PERMISSIONS = {
+    "kick_members": 1 << 1,
+    "ban_members": 1 << 2,
+    "administrator": 1 << 3,
+    "manage_channels": 1 << 4,
+    "manage_guild": 1 << 5,
+    "mention_everyone": 1 << 17,
+    "manage_roles": 1 << 28,
+    "manage_webhooks": 1 << 29
+}
+
+# Every flag is a distinct bit, so the sum is the union
+DANGEROUS_MASK = sum(DANGEROUS_PERMISSIONS.values())
+
+def gained_dangerous(before, after):
+    """Dangerous permission bits set in after but not in before (both raw integers)"""
+    return after & ~before & DANGEROUS_MASK
+
+def dangerous_names(bits):
+    """Readable list of the dangerous permissions in a bitmask"""
+    return ", ".join(
+        name.replace("_", " ").title()
+        for name, bit in DANGEROUS_PERMISSIONS.items() if bits & bit
+    )
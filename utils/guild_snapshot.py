@@ -0,0 +1,296 @@
+import time
+from collections import namedtuple
+import discord
+from utils.bulk import run_bounded
+
+# Parallel API calls during a restore; the library queues anything over a route's rate limit
+RESTORE_CONCURRENCY = 4
+# How long deleted channels and roles stay restorable
+DELETED_RETENTION = 600
+
+ChannelRecord = namedtuple("ChannelRecord", [
+    "kind", "name", "category_id", "position", "topic", "nsfw", "slowmode",
+    "bitrate", "user_limit", "overwrites"
+])
+RoleRecord = namedtuple("RoleRecord", [
+    "name", "permissions", "colour", "hoist", "mentionable", "position"
+])
+
+def channel_record(channel):
+    """Compact, restorable copy of a channel; None for unsupported channel types"""
+    if isinstance(channel, discord.CategoryChannel):
+        kind = "category"
+    elif isinstance(channel, discord.TextChannel):
+        kind = "text"
+    elif isinstance(channel, discord.VoiceChannel):
+        kind = "voice"
+    else:
+        return None
+
+    overwrites = []
+    for target, overwrite in channel.overwrites.items():
+        allow, deny = overwrite.pair()
+        overwrites.append((target.id, isinstance(target, discord.Role), allow.value, deny.value))
+
+    return ChannelRecord(
+        kind, channel.name, channel.category_id, channel.position,
+        getattr(channel, "topic", None), getattr(channel, "nsfw", False),
+        getattr(channel, "slowmode_delay", 0), getattr(channel, "bitrate", None),
+        getattr(channel, "user_limit", None), tuple(overwrites)
+    )
+
+def role_record(role):
+    return RoleRecord(
+        role.name, role.permissions.value, role.colour.value,
+        role.hoist, role.mentionable, role.position
+    )
+
+class GuildSnapshot:
+    def __init__(self):
+        self.channels = {}
+        self.roles = {}
+        self.member_roles = {}
+        self.deleted_channels = {}
+        self.deleted_roles = {}
+        # Old id -> id of the recreated object, so later restores can point at it
+        self.remap = {}
+        self.last_restore = None
+
+class GuildSnapshotStore:
+    """Continuously maintained structure snapshot of every guild
+
+    Built once per guild and then kept current from gateway events. Deleted
+    channels and roles are retained for a while together with the actor the
+    audit log blamed, so an antinuke trip can rebuild everything that actor
+    removed: roles first, then categories, then the channels inside them with
+    their permission overwrites, and finally role memberships.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+
+    def get(self, guild_id):
+        return self._guilds.get(guild_id)
+
+    def build(self, guild):
+        snapshot = GuildSnapshot()
+
+        for channel in guild.channels:
+            record = channel_record(channel)
+            if record is not None:
+                snapshot.channels[channel.id] = record
+
+        for role in guild.roles:
+            if not role.is_default() and not role.managed:
+                snapshot.roles[role.id] = role_record(role)
+
+        for member in guild.members:
+            self._set_member(snapshot, member)
+
+        self._guilds[guild.id] = snapshot
+        return snapshot
+
+    def drop(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    # Gateway event hooks
+    def channel_changed(self, channel):
+        snapshot = self._guilds.get(channel.guild.id)
+        if snapshot is None:
+            return
+        record = channel_record(channel)
+        if record is not None:
+            snapshot.channels[channel.id] = record
+
+    def channel_deleted(self, channel):
+        snapshot = self._guilds.get(channel.guild.id)
+        if snapshot is None:
+            return
+        record = snapshot.channels.pop(channel.id, None) or channel_record(channel)
+        if record is not None:
+            snapshot.deleted_channels[channel.id] = [record, None, time.monotonic()]
+        self._prune(snapshot)
+
+    def role_changed(self, role):
+        snapshot = self._guilds.get(role.guild.id)
+        if snapshot is not None and not role.is_default() and not role.managed:
+            snapshot.roles[role.id] = role_record(role)
+
+    def role_deleted(self, role):
+        snapshot = self._guilds.get(role.guild.id)
+        if snapshot is None:
+            return
+        record = snapshot.roles.pop(role.id, None)
+        if record is not None:
+            snapshot.deleted_roles[role.id] = [record, None, time.monotonic()]
+        self._prune(snapshot)
+
+    def member_changed(self, member):
+        snapshot = self._guilds.get(member.guild.id)
+        if snapshot is None:
+            return
+
+        # Keep memberships of deleted roles so a restore can hand them back
+        previous = snapshot.member_roles.get(member.id, frozenset())
+        kept = {role_id for role_id in previous if role_id in snapshot.deleted_roles}
+        self._set_member(snapshot, member, kept)
+
+    def member_removed(self, member):
+        snapshot = self._guilds.get(member.guild.id)
+        if snapshot is not None:
+            snapshot.member_roles.pop(member.id, None)
+
+    def attribute(self, guild_id, target_id, actor_id):
+        """Record who deleted a channel or role so their damage can be undone together"""
+        snapshot = self._guilds.get(guild_id)
+        if snapshot is None:
+            return
+        deleted = snapshot.deleted_channels.get(target_id) or snapshot.deleted_roles.get(target_id)
+        if deleted is not None:
+            deleted[1] = actor_id
+
+    def _set_member(self, snapshot, member, extra=()):
+        role_ids = frozenset(
+            role.id for role in member.roles
+            if not role.is_default() and not role.managed
+        ).union(extra)
+        if role_ids:
+            snapshot.member_roles[member.id] = role_ids
+        else:
+            snapshot.member_roles.pop(member.id, None)
+
+    def _prune(self, snapshot):
+        cutoff = time.monotonic() - DELETED_RETENTION
+        for deleted in (snapshot.deleted_channels, snapshot.deleted_roles):
+            for target_id in [target_id for target_id, (_, _, at) in deleted.items() if at < cutoff]:
+                del deleted[target_id]
+
+    # Restoration
+    async def restore_actor(self, guild, actor_id):
+        """Rebuild everything actor_id deleted that has not been restored yet"""
+        snapshot = self._guilds.get(guild.id)
+        if snapshot is None:
+            return None
+        return await self.restore(guild, snapshot, {actor_id})
+
+    def _claim(self, deleted, actors):
+        claimed = [(target_id, record) for target_id, (record, actor, _) in deleted.items() if actor in actors]
+        for target_id, _ in claimed:
+            del deleted[target_id]
+        return claimed
+
+    async def restore(self, guild, snapshot, actors):
+        """Recreate the roles and channels the given actors deleted"""
+        started = time.perf_counter()
+        roles = self._claim(snapshot.deleted_roles, actors)
+        channels = self._claim(snapshot.deleted_channels, actors)
+        if not roles and not channels:
+            return None
+
+        restored_roles = await self._restore_roles(guild, snapshot, roles)
+
+        categories = [item for item in channels if item[1].kind == "category"]
+        others = [item for item in channels if item[1].kind != "category"]
+        restored_channels = await self._restore_channels(guild, snapshot, categories)
+        restored_channels += await self._restore_channels(guild, snapshot, others)
+
+        members = await self._restore_memberships(guild, snapshot, restored_roles)
+
+        snapshot.last_restore = {
+            "roles": len(restored_roles),
+            "channels": restored_channels,
+            "members": members,
+            "seconds": time.perf_counter() - started
+        }
+        print(f"Restored {len(restored_roles)} roles, {restored_channels} channels and "
+              f"{members} memberships in {guild.name} in {snapshot.last_restore['seconds']:.2f}s")
+        return snapshot.last_restore
+
+    async def _restore_roles(self, guild, snapshot, roles):
+        async def create(item):
+            old_id, record = item
+            role = await guild.create_role(
+                name=record.name,
+                permissions=discord.Permissions(record.permissions),
+                colour=discord.Colour(record.colour),
+                hoist=record.hoist,
+                mentionable=record.mentionable,
+                reason="ESCUDO Antinuke: Role restoration"
+            )
+            snapshot.remap[old_id] = role.id
+            return old_id, record, role
+
+        restored = [result for result in await run_bounded(create, roles, RESTORE_CONCURRENCY)
+                    if not isinstance(result, Exception)]
+
+        # One bulk position edit instead of one request per role
+        positions = {role: record.position for _, record, role in restored if record.position > 0}
+        if positions:
+            try:
+                await guild.edit_role_positions(positions=positions, reason="ESCUDO Antinuke: Role restoration")
+            except discord.HTTPException:
+                pass
+
+        return {old_id: role for old_id, _, role in restored}
+
+    def _resolve_overwrites(self, guild, snapshot, record):
+        overwrites = {}
+        for target_id, is_role, allow, deny in record.overwrites:
+            target_id = snapshot.remap.get(target_id, target_id)
+            target = guild.get_role(target_id) if is_role else guild.get_member(target_id)
+            if target is not None:
+                overwrites[target] = discord.PermissionOverwrite.from_pair(
+                    discord.Permissions(allow), discord.Permissions(deny)
+                )
+        return overwrites
+
+    async def _restore_channels(self, guild, snapshot, channels):
+        async def create(item):
+            old_id, record = item
+            category_id = snapshot.remap.get(record.category_id, record.category_id)
+            options = {
+                "name": record.name,
+                "position": record.position,
+                "overwrites": self._resolve_overwrites(guild, snapshot, record),
+                "reason": "ESCUDO Antinuke: Channel restoration"
+            }
+
+            if record.kind == "category":
+                channel = await guild.create_category(**options)
+            else:
+                options["category"] = guild.get_channel(category_id) if category_id else None
+                if record.kind == "text":
+                    channel = await guild.create_text_channel(
+                        topic=record.topic, nsfw=record.nsfw, slowmode_delay=record.slowmode, **options
+                    )
+                else:
+                    channel = await guild.create_voice_channel(
+                        bitrate=record.bitrate, user_limit=record.user_limit, **options
+                    )
+
+            snapshot.remap[old_id] = channel.id
+            return channel
+
+        results = await run_bounded(create, channels, RESTORE_CONCURRENCY)
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+    async def _restore_memberships(self, guild, snapshot, restored_roles):
+        if not restored_roles:
+            return 0
+
+        # One add_roles call per member covering every role they lost
+        assignments = []
+        for member_id, role_ids in snapshot.member_roles.items():
+            roles = [restored_roles[role_id] for role_id in role_ids if role_id in restored_roles]
+            member = guild.get_member(member_id) if roles else None
+            if member is not None:
+                assignments.append((member, roles))
+
+        async def assign(item):
+            member, roles = item
+            await member.add_roles(*roles, reason="ESCUDO Antinuke: Role restoration")
+
+        results = await run_bounded(assign, assignments, RESTORE_CONCURRENCY)
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+GUILD_SNAPSHOTS = GuildSnapshotStore()
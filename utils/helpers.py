@@ -1,222 +1,279 @@
 import discord
-import json
+import atexit
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import asyncio
 from config import CONFIG
+import copy
+from collections import Counter
+from utils.storage import get_storage, migrate_legacy_layout, offload, run_storage
+from utils.permission import DEVELOPER_ID, invalidate_guild_permissions
+from utils.message_pipeline import invalidate_message_state
 
 def get_self_roles(guild_id):
     """Get self-assignable roles for a guild"""
-    try:
-        with open(os.path.join("data", "self_roles.json"), 'r') as f:
-            data = json.load(f)
-            return data.get("guilds", {}).get(str(guild_id), {})
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    return get_storage().get_self_roles(guild_id)
 
 def update_self_roles(guild_id, self_roles):
     """Update self-assignable roles for a guild"""
-    try:
-        with open(os.path.join("data", "self_roles.json"), 'r') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        data = {"guilds": {}}
-
-    if "guilds" not in data:
-        data["guilds"] = {}
-
-    data["guilds"][str(guild_id)] = self_roles
-
-    with open(os.path.join("data", "self_roles.json"), 'w') as f:
-        json.dump(data, f, indent=4)
+    get_storage().set_self_roles(guild_id, self_roles)
 
 # File path for JSON storage
 DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
 
-# Data files
-WHITELIST_FILE = os.path.join(DATA_DIR, "whitelist.json")
-SERVER_CONFIG_FILE = os.path.join(DATA_DIR, "server_config.json")
-JOIN_TO_CREATE_FILE = os.path.join(DATA_DIR, "join_to_create.json")
-SELF_ROLES_FILE = os.path.join(DATA_DIR, "self_roles.json")
-SNIPE_CACHE = {}  # In-memory cache for snipe feature
-
 # Ensure data files exist
+# Guild data lives in data/guilds/<guild_id>/; split any monolithic files left over
 def ensure_data_files():
-    files = {
-        WHITELIST_FILE: {"guilds": {}},
-        SERVER_CONFIG_FILE: {"guilds": {}},
-        JOIN_TO_CREATE_FILE: {"channels": {}},
-        SELF_ROLES_FILE: {"guilds": {}}
-    }
-
-    for file_path, default_data in files.items():
-        if not os.path.exists(file_path):
-            with open(file_path, 'w') as f:
-                json.dump(default_data, f, indent=4)
+    migrate_legacy_layout(DATA_DIR)
 
 ensure_data_files()
 
-# General file operations
-def load_json(file_path):
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        default_data = {"guilds": {}} if "whitelist" in file_path or "server_config" in file_path or "self_roles" in file_path else {"channels": {}}
-        save_json(file_path, default_data)
-        return default_data
-
-def save_json(file_path, data):
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
-
 # Server configuration helpers
-def get_guild_config(guild_id):
-    data = load_json(SERVER_CONFIG_FILE)
-    guild_id = str(guild_id)
-
-    if guild_id not in data["guilds"]:
-        data["guilds"][guild_id] = {
-            "prefix": CONFIG["prefix"],
-            "mod_roles": [],
-            "admin_roles": [],
-            "muted_role": None,
-            "ignored_channels": [],
-            "media_channels": [],
-            "antinuke": {
-                "enabled": True,
-                "bypass_enabled": False
-            },
-            "nightmode": {
-                "enabled": False,
-                "start_hour": 22,
-                "end_hour": 6
-            }
+GUILD_CONFIG_FLUSH_INTERVAL = 2.0  # Seconds to coalesce config writes before flushing
+
+def default_guild_config():
+    return {
+        "prefix": CONFIG["prefix"],
+        "mod_roles": [],
+        "admin_roles": [],
+        "muted_role": None,
+        "mute_mode": "role",
+        "ignored_channels": [],
+        "media_channels": [],
+        "antinuke": {
+            "enabled": True,
+            "bypass_enabled": False
+        },
+        "nightmode": {
+            "enabled": False,
+            "start_hour": 22,
+            "end_hour": 6
         }
-        save_json(SERVER_CONFIG_FILE, data)
+    }
 
-    return data["guilds"][guild_id]
+class GuildConfigCache:
+    """Process-wide write-back cache for guild configs
+
+    The bot preloads every stored config on the storage executor before it
+    connects, so afterwards a miss means the guild has no stored config and
+    is answered with the defaults without touching storage. Only scripts
+    that never preload read single configs from storage on demand.
+
+    A guild stays unsaved from the moment its config is written until a
+    background save of it completes, so the final synchronous flush also
+    writes configs whose save was cancelled by shutdown.
+    """
+
+    def __init__(self, flush_interval=GUILD_CONFIG_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._guilds = {}
+        self._dirty = set()
+        self._saving = Counter()
+        self._flush_handle = None
+        self.preloaded = False
+
+    def preload(self):
+        """Cache every stored config; runs on the storage executor"""
+        for guild_id, config in get_storage().load_guild_configs().items():
+            self._guilds.setdefault(str(guild_id), config)
+        self.preloaded = True
+
+    def get(self, guild_id):
+        guild_id = str(guild_id)
+
+        config = self._guilds.get(guild_id)
+        if config is None:
+            config = None if self.preloaded else get_storage().load_guild_config(guild_id)
+            if config is None:
+                config = default_guild_config()
+                self.mark_dirty(guild_id)
+            self._guilds[guild_id] = config
+        return config
+
+    def set(self, guild_id, config_data):
+        guild_id = str(guild_id)
+        self._guilds[guild_id] = config_data
+        self.mark_dirty(guild_id)
+        invalidate_guild_permissions(guild_id)
+        invalidate_message_state(guild_id)
+
+    def mark_dirty(self, guild_id):
+        self._dirty.add(str(guild_id))
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, shutdown): write through immediately
+            self.flush()
+            return
+
+        self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+    def _take_dirty(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        dirty = {guild_id: self._guilds[guild_id] for guild_id in self._dirty if guild_id in self._guilds}
+        self._dirty.clear()
+        return dirty
+
+    def flush(self):
+        """Write all dirty guild configs to storage in a single batch"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_now()
+            return
+
+        dirty = self._take_dirty()
+        if not dirty:
+            return
+
+        # Snapshot on the loop so the storage thread never sees a dict being mutated
+        snapshot = copy.deepcopy(dirty)
+        self._saving.update(snapshot.keys())
+        loop.create_task(self._save(snapshot))
+
+    async def _save(self, snapshot):
+        try:
+            await run_storage(get_storage().save_guild_configs, snapshot)
+        except Exception as e:
+            print(f"Guild config save failed: {e}")
+            self._dirty.update(snapshot)
+            self._schedule_flush()
+        # Cancellation skips this, leaving the guilds for flush_now
+        self._saving.subtract(snapshot.keys())
+        self._saving = +self._saving
+
+    def flush_now(self):
+        """Synchronously write dirty configs and those whose background save never completed"""
+        dirty = self._take_dirty()
+        dirty.update({guild_id: self._guilds[guild_id] for guild_id in self._saving if guild_id in self._guilds})
+        self._saving.clear()
+        if dirty:
+            get_storage().save_guild_configs(dirty)
+
+GUILD_CONFIGS = GuildConfigCache()
+atexit.register(GUILD_CONFIGS.flush)
+
+def get_guild_config(guild_id):
+    return GUILD_CONFIGS.get(guild_id)
 
 def update_guild_config(guild_id, config_data):
-    data = load_json(SERVER_CONFIG_FILE)
-    guild_id = str(guild_id)
-    data["guilds"][guild_id] = config_data
-    save_json(SERVER_CONFIG_FILE, data)
+    GUILD_CONFIGS.set(guild_id, config_data)
+
+def preload_guild_configs():
+    GUILD_CONFIGS.preload()
+
+def flush_guild_configs():
+    GUILD_CONFIGS.flush_now()
+
+class WhitelistIndex:
+    """Per-guild frozensets of whitelisted user IDs and derived trusted-actor sets
+
+    A guild's whitelist is read from storage once and then kept in step by the
+    whitelist operations below. Sets are replaced rather than mutated, so
+    lookups from the event loop never see a half-applied update made on the
+    storage thread.
+    """
+
+    def __init__(self):
+        self._whitelists = {}
+        self._trusted = {}
+
+    def load(self, guild_id):
+        guild_id = int(guild_id)
+        user_ids = frozenset(int(user_id) for user_id in get_storage().get_whitelist(guild_id))
+        self._whitelists[guild_id] = user_ids
+        self._trusted.pop(guild_id, None)
+        return user_ids
+
+    def get(self, guild_id):
+        user_ids = self._whitelists.get(int(guild_id))
+        return user_ids if user_ids is not None else self.load(guild_id)
+
+    def is_loaded(self, guild_id):
+        return int(guild_id) in self._whitelists
+
+    def add(self, guild_id, user_id):
+        self._replace(guild_id, self.get(guild_id) | {int(user_id)})
+
+    def discard(self, guild_id, user_id):
+        self._replace(guild_id, self.get(guild_id) - {int(user_id)})
+
+    def clear(self, guild_id):
+        self._replace(guild_id, frozenset())
+
+    def _replace(self, guild_id, user_ids):
+        self._whitelists[int(guild_id)] = user_ids
+        self._trusted.pop(int(guild_id), None)
+
+    def trusted(self, guild):
+        """Whitelisted users, the developer, bot owners, extra owners and the guild owner
+
+        Called from event handlers on the event loop, so it never reads
+        storage: a guild whose whitelist is not loaded yet counts only its
+        owners, and that partial set is not cached.
+        """
+        trusted = self._trusted.get(guild.id)
+        if trusted is None:
+            whitelist = self._whitelists.get(guild.id)
+            trusted = (whitelist or frozenset()).union(
+                CONFIG["owner_ids"],
+                CONFIG["extra_owners"].get(str(guild.id), []),
+                (DEVELOPER_ID, guild.owner_id)
+            )
+            if whitelist is not None:
+                self._trusted[guild.id] = trusted
+        return trusted
+
+    def invalidate_trusted(self, guild_id):
+        self._trusted.pop(int(guild_id), None)
+
+WHITELISTS = WhitelistIndex()
 
 # Whitelist operations
 def is_whitelisted(guild_id, user_id):
-    data = load_json(WHITELIST_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
+    return int(user_id) in WHITELISTS.get(guild_id)
 
-    if guild_id not in data["guilds"]:
-        return False
+def is_trusted_actor(guild, user_id):
+    return user_id in WHITELISTS.trusted(guild)
 
-    return user_id in data["guilds"][guild_id]
+def invalidate_trusted_actors(guild_id):
+    WHITELISTS.invalidate_trusted(guild_id)
 
-def add_to_whitelist(guild_id, user_id):
-    data = load_json(WHITELIST_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
+def whitelist_loaded(guild_id):
+    return WHITELISTS.is_loaded(guild_id)
 
-    if guild_id not in data["guilds"]:
-        data["guilds"][guild_id] = []
+def load_whitelist(guild_id):
+    WHITELISTS.load(guild_id)
 
-    if user_id not in data["guilds"][guild_id]:
-        data["guilds"][guild_id].append(user_id)
-        save_json(WHITELIST_FILE, data)
-        return True
-    return False
+def add_to_whitelist(guild_id, user_id):
+    added = get_storage().add_whitelist(guild_id, user_id)
+    WHITELISTS.add(guild_id, user_id)
+    return added
 
 def remove_from_whitelist(guild_id, user_id):
-    data = load_json(WHITELIST_FILE)
-    guild_id, user_id = str(guild_id), str(user_id)
-
-    if guild_id not in data["guilds"]:
-        return False
-
-    if user_id in data["guilds"][guild_id]:
-        data["guilds"][guild_id].remove(user_id)
-        save_json(WHITELIST_FILE, data)
-        return True
-    return False
+    removed = get_storage().remove_whitelist(guild_id, user_id)
+    WHITELISTS.discard(guild_id, user_id)
+    return removed
 
 def reset_whitelist(guild_id):
-    data = load_json(WHITELIST_FILE)
-    guild_id = str(guild_id)
-
-    if guild_id in data["guilds"]:
-        data["guilds"][guild_id] = []
-        save_json(WHITELIST_FILE, data)
-        return True
-    return False
+    result = get_storage().reset_whitelist(guild_id)
+    WHITELISTS.clear(guild_id)
+    return result
 
 def get_whitelisted_users(guild_id):
-    data = load_json(WHITELIST_FILE)
-    guild_id = str(guild_id)
-
-    if guild_id not in data["guilds"]:
-        return []
-
-    return data["guilds"][guild_id]
-
-# Join to Create helpers
-def get_join_to_create_config(guild_id):
-    data = load_json(JOIN_TO_CREATE_FILE)
-    guild_id = str(guild_id)
-
-    if guild_id not in data["channels"]:
-        data["channels"][guild_id] = {
-            "setup_channel": None,
-            "temp_channels": [],
-            "category": None
-        }
-        save_json(JOIN_TO_CREATE_FILE, data)
-
-    return data["channels"][guild_id]
-
-def update_join_to_create_config(guild_id, config_data):
-    data = load_json(JOIN_TO_CREATE_FILE)
-    guild_id = str(guild_id)
-    data["channels"][guild_id] = config_data
-    save_json(JOIN_TO_CREATE_FILE, data)
-
-def add_temp_channel(guild_id, channel_id):
-    config = get_join_to_create_config(guild_id)
-    if str(channel_id) not in config["temp_channels"]:
-        config["temp_channels"].append(str(channel_id))
-        update_join_to_create_config(guild_id, config)
-
-def remove_temp_channel(guild_id, channel_id):
-    config = get_join_to_create_config(guild_id)
-    if str(channel_id) in config["temp_channels"]:
-        config["temp_channels"].remove(str(channel_id))
-        update_join_to_create_config(guild_id, config)
+    return get_storage().get_whitelist(guild_id)
 
 # Self Roles helpers
-# Snipe feature helpers
-def add_snipe(channel_id, message):
-    channel_id = str(channel_id)
-    if channel_id not in SNIPE_CACHE:
-        SNIPE_CACHE[channel_id] = []
-
-    # Keep only the last 10 deleted messages
-    if len(SNIPE_CACHE[channel_id]) >= 10:
-        SNIPE_CACHE[channel_id].pop(0)
-
-    SNIPE_CACHE[channel_id].append({
-        'content': message.content,
-        'author': str(message.author),
-        'author_id': message.author.id,
-        'timestamp': message.created_at.timestamp(),
-        'has_attachments': len(message.attachments) > 0
-    })
-
-def get_snipe(channel_id):
-    channel_id = str(channel_id)
-    if channel_id in SNIPE_CACHE and SNIPE_CACHE[channel_id]:
-        return SNIPE_CACHE[channel_id][-1]
-    return None
-
 # Permission checks
 def is_mod(ctx):
     if ctx.author.guild_permissions.administrator:
@@ -255,14 +312,14 @@ def is_owner(ctx):
     return False
 
 # Antinuke helpers
-def is_nightmode_active(guild_id):
+def is_nightmode_active(guild_id, now=None):
     config = get_guild_config(guild_id)
     nightmode = config.get("nightmode", {})
 
     if not nightmode.get("enabled", False):
         return False
 
-    now = datetime.now()
+    now = now or datetime.now()
     current_hour = now.hour
 
     start_hour = nightmode.get("start_hour", 22)
@@ -273,6 +330,25 @@ def is_nightmode_active(guild_id):
     else:
         return current_hour >= start_hour or current_hour < end_hour
 
+def next_nightmode_boundary(guild_id, now=None):
+    """Return the next datetime nightmode starts or ends, or None if it never changes"""
+    nightmode = get_guild_config(guild_id).get("nightmode", {})
+    start_hour = nightmode.get("start_hour", 22)
+    end_hour = nightmode.get("end_hour", 6)
+
+    if not nightmode.get("enabled", False) or start_hour == end_hour:
+        return None
+
+    now = now or datetime.now()
+    boundaries = []
+    for hour in (start_hour, end_hour):
+        boundary = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        if boundary <= now:
+            boundary += timedelta(days=1)
+        boundaries.append(boundary)
+
+    return min(boundaries)
+
 # Utils
 async def temp_message(ctx, content, seconds=5):
     """Send a temporary message that deletes itself after a specified time"""
@@ -286,24 +362,6 @@ import json
 import os
 from config import CONFIG
 
-def ensure_data_files():
-    """Ensure all required data files exist"""
-    os.makedirs("data", exist_ok=True)
-
-    files = [
-        "data/server_config.json",
-        "data/warnings.json", 
-        "data/mutes.json",
-        "data/join_to_create.json",
-        "data/self_roles.json",
-        "data/whitelist.json"
-    ]
-
-    for file_path in files:
-        if not os.path.exists(file_path):
-            with open(file_path, 'w') as f:
-                json.dump({}, f)
-
 def is_owner(ctx):
     """Check if user is bot owner"""
     return ctx.author.id in CONFIG["owner_ids"]
@@ -318,67 +376,33 @@ def is_mod(ctx):
             ctx.author.guild_permissions.manage_guild or 
             is_admin(ctx))
 
-def get_guild_config(guild_id):
-    """Get guild configuration"""
-    ensure_data_files()
-    try:
-        with open("data/server_config.json", "r") as f:
-            data = json.load(f)
-        return data.get(str(guild_id), {})
-    except:
-        return {}
-
-def update_guild_config(guild_id, config):
-    """Update guild configuration"""
-    ensure_data_files()
-    try:
-        with open("data/server_config.json", "r") as f:
-            data = json.load(f)
-    except:
-        data = {}
-
-    data[str(guild_id)] = config
-
-    with open("data/server_config.json", "w") as f:
-        json.dump(data, f, indent=2)
-
 def get_join_to_create_config(guild_id):
     """Get join to create configuration"""
-    ensure_data_files()
-    try:
-        with open("data/join_to_create.json", "r") as f:
-            data = json.load(f)
-        return data.get(str(guild_id), {})
-    except:
-        return {}
+    return get_storage().get_join_to_create(guild_id) or {}
 
 def update_join_to_create_config(guild_id, config):
     """Update join to create configuration"""
-    ensure_data_files()
-    try:
-        with open("data/join_to_create.json", "r") as f:
-            data = json.load(f)
-    except:
-        data = {}
+    get_storage().set_join_to_create(guild_id, config)
 
-    data[str(guild_id)] = config
-
-    with open("data/join_to_create.json", "w") as f:
-        json.dump(data, f, indent=2)
-
-def add_temp_channel(guild_id, channel_id, user_id):
+def add_temp_channel(guild_id, channel_id, user_id=None):
     """Add temporary channel to tracking"""
     config = get_join_to_create_config(guild_id)
-    if "temp_channels" not in config:
-        config["temp_channels"] = {}
-    config["temp_channels"][str(channel_id)] = user_id
+    temp_channels = config.setdefault("temp_channels", [])
+    if isinstance(temp_channels, dict):
+        temp_channels[str(channel_id)] = user_id
+    elif str(channel_id) not in temp_channels:
+        temp_channels.append(str(channel_id))
     update_join_to_create_config(guild_id, config)
 
 def remove_temp_channel(guild_id, channel_id):
     """Remove temporary channel from tracking"""
     config = get_join_to_create_config(guild_id)
-    if "temp_channels" in config and str(channel_id) in config["temp_channels"]:
-        del config["temp_channels"][str(channel_id)]
+    temp_channels = config.get("temp_channels", [])
+    if str(channel_id) in temp_channels:
+        if isinstance(temp_channels, dict):
+            del temp_channels[str(channel_id)]
+        else:
+            temp_channels.remove(str(channel_id))
         update_join_to_create_config(guild_id, config)
 
 async def temp_message(ctx, embed, seconds=5):
@@ -388,4 +412,19 @@ async def temp_message(ctx, embed, seconds=5):
     try:
         await msg.delete()
     except:
-        pass
\ No newline at end of file
+        pass
+
+# Async API: blocking storage calls run on the storage executor
+get_self_roles_async = offload(get_self_roles)
+update_self_roles_async = offload(update_self_roles)
+is_whitelisted_async = offload(is_whitelisted)
+add_to_whitelist_async = offload(add_to_whitelist)
+remove_from_whitelist_async = offload(remove_from_whitelist)
+reset_whitelist_async = offload(reset_whitelist)
+get_whitelisted_users_async = offload(get_whitelisted_users)
+load_whitelist_async = offload(load_whitelist)
+preload_guild_configs_async = offload(preload_guild_configs)
+get_join_to_create_config_async = offload(get_join_to_create_config)
+update_join_to_create_config_async = offload(update_join_to_create_config)
+add_temp_channel_async = offload(add_temp_channel)
+remove_temp_channel_async = offload(remove_temp_channel)
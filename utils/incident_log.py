@@ -0,0 +1,108 @@
+import asyncio
+from collections import deque
+import discord
+from utils.embeds import warning_embed
+from utils.mitigation import MITIGATION
+
+LOG_CHANNEL_NAME = "escudo-logs"
+# One log message per guild per interval keeps well under the channel rate limit
+LOG_FLUSH_INTERVAL = 1.0
+# Discord allows at most 10 embeds per message
+EMBEDS_PER_MESSAGE = 10
+# Incidents buffered per guild; anything beyond this is only counted and summarized
+MAX_BUFFERED = 50
+
+class GuildLogBuffer:
+    def __init__(self):
+        self.embeds = deque()
+        self.overflow = 0
+        self.task = None
+
+class IncidentLogger:
+    """Buffered delivery of antinuke incidents to each guild's log channel
+
+    The log channel is looked up by name once and then cached by id.
+    Incidents are collected per guild and sent as up to ten embeds per
+    message at most once per LOG_FLUSH_INTERVAL, after any containment in
+    flight. Incidents past MAX_BUFFERED, or in a batch Discord refused, are
+    folded into a single summary embed instead of more messages. A summary
+    gets one attempt; if that fails too, its incidents are dropped.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._buffers = {}
+
+    def log_channel(self, guild):
+        if guild.id not in self._channels:
+            channel = discord.utils.get(guild.text_channels, name=LOG_CHANNEL_NAME)
+            self._channels[guild.id] = channel.id if channel else None
+
+        channel_id = self._channels[guild.id]
+        return guild.get_channel(channel_id) if channel_id else None
+
+    def forget_channel(self, guild_id):
+        """Drop the cached log channel after a channel is created, renamed or deleted"""
+        self._channels.pop(guild_id, None)
+
+    def log(self, guild, embed):
+        buffer = self._buffers.get(guild.id)
+        if buffer is None:
+            buffer = self._buffers[guild.id] = GuildLogBuffer()
+
+        if len(buffer.embeds) < MAX_BUFFERED:
+            buffer.embeds.append(embed)
+        else:
+            buffer.overflow += 1
+
+        if buffer.task is None:
+            buffer.task = asyncio.create_task(self._flush_loop(guild, buffer))
+
+    async def _flush_loop(self, guild, buffer):
+        try:
+            while buffer.embeds or buffer.overflow:
+                await asyncio.sleep(LOG_FLUSH_INTERVAL)
+                await MITIGATION.wait_contained(guild.id)
+                await self._flush(guild, buffer)
+        finally:
+            buffer.task = None
+            if not buffer.embeds and not buffer.overflow:
+                self._buffers.pop(guild.id, None)
+
+    async def _flush(self, guild, buffer):
+        channel = self.log_channel(guild)
+        if channel is None:
+            buffer.embeds.clear()
+            buffer.overflow = 0
+            return
+
+        batch = [buffer.embeds.popleft() for _ in range(min(EMBEDS_PER_MESSAGE, len(buffer.embeds)))]
+        incidents = len(batch)
+        summarized = False
+
+        # Summarize overflow in the last slot once the buffer has drained
+        if buffer.overflow and len(batch) < EMBEDS_PER_MESSAGE and not buffer.embeds:
+            batch.append(warning_embed(
+                title="⚠️ More Incidents",
+                description=f"{buffer.overflow} more antinuke incident(s) were not logged individually."
+            ))
+            incidents += buffer.overflow
+            buffer.overflow = 0
+            summarized = True
+
+        try:
+            await channel.send(embeds=batch)
+        except discord.Forbidden:
+            # Nothing can be logged here until permissions change
+            buffer.embeds.clear()
+            buffer.overflow = 0
+        except discord.NotFound:
+            self.forget_channel(guild.id)
+            if not summarized:
+                buffer.overflow += incidents
+        except discord.HTTPException:
+            # Rate limited or rejected: count the batch instead of retrying it, unless it was already the summary
+            if not summarized:
+                buffer.overflow += incidents
+
+INCIDENT_LOG = IncidentLogger()
@@ -0,0 +1,39 @@
+import asyncio
+from collections import deque
+
+class LoopLagMonitor:
+    """Measure event loop lag by timing how late a periodic sleep wakes up"""
+
+    def __init__(self, interval=0.5, window=240):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def stats(self):
+        """Return current, average, p95 and max lag in milliseconds"""
+        if not self.samples:
+            return {"current": 0.0, "average": 0.0, "p95": 0.0, "max": 0.0}
+
+        ordered = sorted(self.samples)
+        return {
+            "current": self.samples[-1] * 1000,
+            "average": sum(ordered) / len(ordered) * 1000,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max": ordered[-1] * 1000
+        }
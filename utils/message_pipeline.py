@@ -0,0 +1,120 @@
+import asyncio
+import time
+from utils.webhook_db import SHADOWCLONES
+
+class GuildMessageState:
+    """The parts of a guild config that message stages check, as id sets"""
+
+    __slots__ = ("config", "media_channels", "afk_users")
+
+    def __init__(self, config):
+        self.config = config
+        self.media_channels = frozenset(int(channel_id) for channel_id in config.get("media_channels", []))
+        self.afk_users = frozenset(int(user_id) for user_id in config.get("afk_users", {}))
+
+class MessageContext:
+    """One guild message with its guild state and channel clones, resolved once for every stage"""
+
+    __slots__ = ("message", "state", "clones")
+
+    def __init__(self, message, state, clones):
+        self.message = message
+        self.state = state
+        self.clones = clones
+
+    @property
+    def config(self):
+        return self.state.config
+
+class Stage:
+    __slots__ = ("name", "predicate", "handler", "runs", "errors", "total_time", "max_time")
+
+    def __init__(self, name, predicate, handler):
+        self.name = name
+        self.predicate = predicate
+        self.handler = handler
+        self.runs = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+class MessagePipeline:
+    """Single on_message dispatcher for the feature stages of every cog
+
+    Each guild message gets one MessageContext. Stages register a cheap
+    synchronous predicate on that context and an async handler; only stages
+    whose predicate holds run, concurrently with each other, so a guild that
+    does not use a feature pays one set lookup for it. Guild states are built
+    from the guild config on first use and dropped whenever it changes.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._states = {}
+        self.dispatched = 0
+
+    def register(self, name, predicate, handler):
+        """Add a stage, replacing one of the same name (a reloaded cog registers again)"""
+        self._stages[name] = Stage(name, predicate, handler)
+
+    def unregister(self, name):
+        self._stages.pop(name, None)
+
+    def guild_state(self, guild_id):
+        state = self._states.get(guild_id)
+        if state is None:
+            # Import here to avoid circular imports
+            from utils.helpers import get_guild_config
+
+            state = self._states[guild_id] = GuildMessageState(get_guild_config(guild_id))
+        return state
+
+    def invalidate_guild(self, guild_id):
+        self._states.pop(int(guild_id), None)
+
+    async def dispatch(self, message):
+        """Run the stages that apply to a message; stage errors are counted, never raised"""
+        if message.author.bot or not message.guild:
+            return
+
+        self.dispatched += 1
+        context = MessageContext(
+            message,
+            self.guild_state(message.guild.id),
+            SHADOWCLONES.by_channel(message.channel.id)
+        )
+
+        matched = [stage for stage in list(self._stages.values()) if stage.predicate(context)]
+        if matched:
+            await asyncio.gather(*(self._run(stage, context) for stage in matched))
+
+    async def _run(self, stage, context):
+        started = time.perf_counter()
+        try:
+            await stage.handler(context)
+        except Exception as e:
+            stage.errors += 1
+            print(f"Message stage {stage.name} failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            stage.runs += 1
+            stage.total_time += elapsed
+            stage.max_time = max(stage.max_time, elapsed)
+
+    def stats(self):
+        """Return per-stage runs, errors and average/max handler time in milliseconds"""
+        return [
+            {
+                "name": stage.name,
+                "runs": stage.runs,
+                "errors": stage.errors,
+                "average": stage.total_time / stage.runs * 1000 if stage.runs else 0.0,
+                "max": stage.max_time * 1000
+            }
+            for stage in self._stages.values()
+        ]
+
+MESSAGE_PIPELINE = MessagePipeline()
+
+def invalidate_message_state(guild_id):
+    MESSAGE_PIPELINE.invalidate_guild(guild_id)
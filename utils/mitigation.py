@@ -0,0 +1,126 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+
+# Job priorities; lower runs first
+CONTAIN = 0
+RESTORE = 1
+
+# A ban of the same perpetrator is not repeated within this window
+BAN_DEDUPE_TTL = 60
+# Containment latency samples kept per guild
+LATENCY_WINDOW = 50
+
+class GuildMitigation:
+    def __init__(self):
+        self.queue = []
+        self.counter = 0
+        self.pending = set()
+        self.completed = {}
+        self.containing = 0
+        self.contained = asyncio.Event()
+        self.contained.set()
+        self.worker = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+class MitigationQueue:
+    """Per-guild antinuke response queue with strict priorities
+
+    Containment jobs start the moment they are submitted. Restore jobs wait
+    in a priority queue drained by one worker per guild, which only takes
+    the next job while no containment is in flight, so a restore never
+    delays a ban. Incident logs do not go through this queue: the incident
+    logger batches them itself and waits on wait_contained before each send.
+    Jobs are deduplicated by key: a key already queued or running is
+    dropped, and a job submitted with a dedupe_ttl is not repeated for that
+    long after it succeeds.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+
+    def _state(self, guild_id):
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = self._guilds[guild_id] = GuildMitigation()
+        return state
+
+    def submit(self, guild_id, priority, key, job, detected_at=None, dedupe_ttl=0):
+        """Queue job (a coroutine function); returns False if it was deduplicated"""
+        state = self._state(guild_id)
+
+        if key is not None:
+            if key in state.pending or state.completed.get(key, 0) > time.monotonic():
+                return False
+            state.pending.add(key)
+
+        if priority == CONTAIN:
+            state.containing += 1
+            state.contained.clear()
+            asyncio.create_task(self._contain(state, key, job, detected_at, dedupe_ttl))
+            return True
+
+        state.counter += 1
+        heapq.heappush(state.queue, (priority, state.counter, key, job, dedupe_ttl))
+        if state.worker is None:
+            state.worker = asyncio.create_task(self._drain(state))
+        return True
+
+    async def _contain(self, state, key, job, detected_at, dedupe_ttl):
+        try:
+            if await self._run(job):
+                self._complete(state, key, dedupe_ttl)
+                if detected_at is not None:
+                    state.latencies.append(time.monotonic() - detected_at)
+        finally:
+            state.pending.discard(key)
+            state.containing -= 1
+            if not state.containing:
+                state.contained.set()
+            self._prune(state)
+
+    async def _drain(self, state):
+        try:
+            while state.queue:
+                await state.contained.wait()
+                _, _, key, job, dedupe_ttl = heapq.heappop(state.queue)
+                try:
+                    if await self._run(job):
+                        self._complete(state, key, dedupe_ttl)
+                finally:
+                    state.pending.discard(key)
+        finally:
+            state.worker = None
+
+    async def _run(self, job):
+        try:
+            await job()
+            return True
+        except Exception as e:
+            print(f"Antinuke mitigation step failed: {e}")
+            return False
+
+    def _complete(self, state, key, dedupe_ttl):
+        if key is not None and dedupe_ttl:
+            state.completed[key] = time.monotonic() + dedupe_ttl
+
+    def _prune(self, state):
+        now = time.monotonic()
+        for key in [key for key, expires in state.completed.items() if expires <= now]:
+            del state.completed[key]
+
+    async def wait_contained(self, guild_id):
+        """Wait until no containment job is in flight for the guild"""
+        state = self._guilds.get(guild_id)
+        if state is not None:
+            await state.contained.wait()
+
+    def latency_stats(self, guild_id):
+        """Return (last, average) containment latency in milliseconds, or None"""
+        state = self._guilds.get(guild_id)
+        if state is None or not state.latencies:
+            return None
+        return state.latencies[-1] * 1000, sum(state.latencies) / len(state.latencies) * 1000
+
+MITIGATION = MitigationQueue()
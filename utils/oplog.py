@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+
+# Fold a log into its snapshot once it holds this many records
+COMPACT_THRESHOLD = 500
+COMPACT_INTERVAL = 60  # Seconds between background compaction passes
+
+class OpLog:
+    """Snapshot plus append-only mutation log for one JSON document
+
+    Every mutation is a single appended JSON line tagged with a sequence
+    number. The snapshot records the last sequence number folded into it, so
+    replaying after a crash (even one in the middle of a compaction) skips
+    records that are already part of the snapshot, and a torn final line is
+    dropped.
+    """
+
+    def __init__(self, snapshot_path, apply, default):
+        self.snapshot_path = snapshot_path
+        self.log_path = os.path.splitext(snapshot_path)[0] + ".log"
+        self.apply = apply
+        self.default = default
+        self.state = None
+        self.seq = 0
+        self.pending = 0
+
+    def load(self):
+        """Read the snapshot and replay any log records written after it"""
+        if self.state is not None:
+            return self.state
+
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            snapshot = None
+
+        if isinstance(snapshot, dict) and "seq" in snapshot and "data" in snapshot:
+            self.state, self.seq = snapshot["data"], snapshot["seq"]
+        elif snapshot is not None:
+            # Plain document written before the log existed
+            self.state = snapshot
+        else:
+            self.state = self.default()
+
+        self._replay()
+        return self.state
+
+    def _replay(self):
+        try:
+            f = open(self.log_path, 'rb')
+        except FileNotFoundError:
+            return
+
+        good_offset = 0
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn write from a crash; everything after it is garbage
+
+                good_offset += len(line)
+                if record["seq"] <= self.seq:
+                    continue
+
+                self.apply(self.state, record)
+                self.seq = record["seq"]
+                self.pending += 1
+
+        # Cut off the torn tail so new records are not appended after it
+        if good_offset < os.path.getsize(self.log_path):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(good_offset)
+
+    def append(self, record):
+        """Apply a mutation in memory and persist it as one appended line"""
+        self.load()
+        self.seq += 1
+        record["seq"] = self.seq
+
+        self.apply(self.state, record)
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.pending += 1
+
+    def compact(self):
+        """Fold the log into a new snapshot and start an empty log"""
+        if self.state is None or not self.pending:
+            return False
+
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"seq": self.seq, "data": self.state}, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # A crash before this truncate is harmless: replay skips seq <= snapshot seq
+        open(self.log_path, 'w').close()
+        self.pending = 0
+        return True
+
+class Compactor(threading.Thread):
+    """Daemon thread that periodically runs a compaction callback"""
+
+    def __init__(self, callback, interval=COMPACT_INTERVAL):
+        super().__init__(name="escudo-oplog-compactor", daemon=True)
+        self.callback = callback
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.callback()
+            except OSError:
+                continue
+
+    def stop(self):
+        self._stopped.set()
+
+# Mutation handlers for the moderation documents
+def apply_warning_op(state, record):
+    user_id = record["user"]
+
+    if record["op"] == "add":
+        state.setdefault(user_id, []).append(record["warning"])
+    elif record["op"] == "remove":
+        warnings = state.get(user_id, [])
+        for i, warning in enumerate(warnings):
+            if warning["id"] == record["id"]:
+                warnings.pop(i)
+                break
+    elif record["op"] == "clear":
+        state[user_id] = []
+
+def apply_mute_op(state, record):
+    if record["op"] == "set":
+        state[record["user"]] = record["mute"]
+    elif record["op"] == "remove":
+        state.pop(record["user"], None)
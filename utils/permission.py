@@ -36,61 +36,103 @@ def is_extra_owner(ctx):
     extra_owners = CONFIG['extra_owners'].get(str(guild_id), [])
     return user_id in extra_owners
 
+class PermissionCache:
+    """Per-guild admin/mod role ID sets and per-member admin/mod decisions
+
+    Role sets are rebuilt from the guild config on first use; decisions are
+    computed once per member and dropped whenever the guild config, a role or
+    the member changes.
+    """
+
+    def __init__(self):
+        self._role_sets = {}
+        self._decisions = {}
+
+    def role_sets(self, guild_id):
+        """Return (admin_role_ids, mod_role_ids) as frozensets of ints"""
+        role_sets = self._role_sets.get(guild_id)
+        if role_sets is None:
+            # Import here to avoid circular imports
+            from utils.helpers import get_guild_config
+
+            config = get_guild_config(guild_id)
+            role_sets = (
+                frozenset(int(role_id) for role_id in config.get('admin_roles', [])),
+                frozenset(int(role_id) for role_id in config.get('mod_roles', []))
+            )
+            self._role_sets[guild_id] = role_sets
+        return role_sets
+
+    def decision(self, member):
+        """Return the cached (is_admin, is_mod) pair for a member"""
+        guild_decisions = self._decisions.setdefault(member.guild.id, {})
+        decision = guild_decisions.get(member.id)
+        if decision is None:
+            decision = self._resolve(member)
+            guild_decisions[member.id] = decision
+        return decision
+
+    def _resolve(self, member):
+        admin_roles, mod_roles = self.role_sets(member.guild.id)
+        role_ids = [role.id for role in member.roles]
+        permissions = member.guild_permissions
+
+        # Owners and extra owners are always considered admins
+        admin = (
+            is_owner(member) or is_extra_owner(member)
+            or permissions.administrator
+            or not admin_roles.isdisjoint(role_ids)
+        )
+        # Admins are also considered mods
+        mod = (
+            admin
+            or permissions.manage_messages or permissions.kick_members
+            or not mod_roles.isdisjoint(role_ids)
+        )
+        return admin, mod
+
+    def invalidate_guild(self, guild_id):
+        guild_id = int(guild_id)
+        self._role_sets.pop(guild_id, None)
+        self._decisions.pop(guild_id, None)
+
+    def invalidate_member(self, guild_id, member_id):
+        self._decisions.get(int(guild_id), {}).pop(member_id, None)
+
+PERMISSIONS = PermissionCache()
+
 def is_admin(ctx):
     """Check if the user has admin permissions or roles"""
-    if isinstance(ctx, discord.Member):
-        member = ctx
-    else:
-        member = ctx.author
-    
-    # Owner and extra owners are always considered admins
-    if is_owner(ctx) or is_extra_owner(ctx):
-        return True
-    
-    # Check if user has admin permissions
-    if member.guild_permissions.administrator:
-        return True
-    
-    # Import here to avoid circular imports
-    from utils.helpers import get_guild_config
-    
-    # Check if user has admin role
-    config = get_guild_config(member.guild.id)
-    admin_roles = config.get('admin_roles', [])
-    
-    for role in member.roles:
-        if str(role.id) in admin_roles:
-            return True
-    
-    return False
+    member = ctx if isinstance(ctx, discord.Member) else ctx.author
+    return PERMISSIONS.decision(member)[0]
 
 def is_mod(ctx):
     """Check if the user has moderator permissions or roles"""
-    if isinstance(ctx, discord.Member):
-        member = ctx
-    else:
-        member = ctx.author
-    
-    # Admins are also considered mods
-    if is_admin(ctx):
-        return True
-    
-    # Check if user has mod permissions
-    if member.guild_permissions.manage_messages or member.guild_permissions.kick_members:
-        return True
-    
-    # Import here to avoid circular imports
-    from utils.helpers import get_guild_config
-    
-    # Check if user has mod role
-    config = get_guild_config(member.guild.id)
-    mod_roles = config.get('mod_roles', [])
-    
-    for role in member.roles:
-        if str(role.id) in mod_roles:
-            return True
-    
-    return False
+    member = ctx if isinstance(ctx, discord.Member) else ctx.author
+    return PERMISSIONS.decision(member)[1]
+
+def invalidate_guild_permissions(guild_id):
+    PERMISSIONS.invalidate_guild(guild_id)
+
+def register_permission_listeners(bot):
+    """Drop cached decisions whenever roles, members or the guild change"""
+    async def on_guild_role_change(role, after=None):
+        PERMISSIONS.invalidate_guild(role.guild.id)
+
+    async def on_guild_update(before, after):
+        PERMISSIONS.invalidate_guild(after.id)
+
+    async def on_member_update(before, after):
+        PERMISSIONS.invalidate_member(after.guild.id, after.id)
+
+    async def on_member_remove(member):
+        PERMISSIONS.invalidate_member(member.guild.id, member.id)
+
+    bot.add_listener(on_guild_role_change, "on_guild_role_update")
+    bot.add_listener(on_guild_role_change, "on_guild_role_delete")
+    bot.add_listener(on_guild_update, "on_guild_update")
+    bot.add_listener(on_member_update, "on_member_update")
+    bot.add_listener(on_member_remove, "on_member_remove")
 
 def is_antinuke_whitelisted(ctx):
     """Check if the user is whitelisted for antinuke actions"""
@@ -0,0 +1,145 @@
+import asyncio
+import re
+import time
+from datetime import timedelta
+import discord
+
+# Discord bulk-deletes at most 100 messages per request, and only messages younger than 14 days
+BULK_DELETE_SIZE = 100
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+# Keeps a message that ages past the limit while the purge runs out of a bulk request
+BULK_DELETE_MARGIN = timedelta(minutes=5)
+# Seconds between single deletes of older messages, which have a much smaller rate limit
+SINGLE_DELETE_INTERVAL = 1.0
+# Most messages one purge command may scan
+MAX_PURGE_AMOUNT = 10000
+
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+# Matches both Unicode emojis and Discord custom emojis
+EMOJI_PATTERN = re.compile(r'<a?:[a-zA-Z0-9_]+:\d+>|[\U00010000-\U0010ffff]', flags=re.UNICODE)
+
+def has_image(message):
+    """Whether a message carries an image attachment or an embed with an image"""
+    for attachment in message.attachments:
+        if attachment.content_type and attachment.content_type.startswith("image/"):
+            return True
+
+    for embed in message.embeds:
+        if embed.image or embed.thumbnail:
+            return True
+
+    return False
+
+class PurgeFilter:
+    """Compound message filter; a message must pass every criterion that is set
+
+    Criteria are checked cheapest first and text patterns are compiled once
+    when the filter is built, so each message is judged in a single pass.
+    """
+
+    def __init__(self):
+        self.author_ids = set()
+        self.bots = None
+        self.patterns = []
+        self.image = False
+        self.embed = False
+        self.link = False
+        self.emoji = False
+        self.text_only = False
+        self.before = None
+        self.after = None
+
+    def add_contains(self, text):
+        self.patterns.append(re.compile(re.escape(text), re.IGNORECASE))
+
+    def add_regex(self, pattern):
+        """Raises re.error for an invalid pattern"""
+        self.patterns.append(re.compile(pattern, re.IGNORECASE))
+
+    def matches(self, message):
+        if self.author_ids and message.author.id not in self.author_ids:
+            return False
+        if self.bots is not None and message.author.bot != self.bots:
+            return False
+        if self.before is not None and message.created_at >= self.before:
+            return False
+        if self.after is not None and message.created_at <= self.after:
+            return False
+        if self.embed and not message.embeds:
+            return False
+        if self.text_only and (message.attachments or message.embeds or not message.content):
+            return False
+        if self.image and not has_image(message):
+            return False
+        if self.link and not URL_PATTERN.search(message.content):
+            return False
+        if self.emoji and not EMOJI_PATTERN.search(message.content):
+            return False
+        return all(pattern.search(message.content) for pattern in self.patterns)
+
+async def purge_channel(channel, amount, purge_filter, anchor=None, progress=None, reason=None):
+    """Delete the messages matching `purge_filter` among the last `amount` in a channel
+
+    History is read lazily page by page, newest first, from just before
+    `anchor` (a message or None) and never further back than the filter's
+    `after`. Matches younger than 14 days are bulk-deleted in chunks of 100;
+    older ones are deleted one at a time, spaced by SINGLE_DELETE_INTERVAL.
+    `progress`, if given, is a dict kept up to date with scanned, deleted and
+    failed counts. Forbidden propagates; other failed deletes are counted.
+    Returns (deleted, failed).
+    """
+    progress = progress if progress is not None else {}
+    progress.update(scanned=0, deleted=0, failed=0)
+    batch = []
+
+    async def flush():
+        try:
+            await channel.delete_messages(batch, reason=reason)
+            progress["deleted"] += len(batch)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException:
+            progress["failed"] += len(batch)
+        batch.clear()
+
+    bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE + BULK_DELETE_MARGIN
+    last_single = 0.0
+
+    # The filter's time window bounds the walk itself, so skipped history is never fetched
+    start = anchor
+    if purge_filter.before is not None and (anchor is None or purge_filter.before < anchor.created_at):
+        start = purge_filter.before
+
+    history = channel.history(limit=amount, before=start, after=purge_filter.after, oldest_first=False)
+    async for message in history:
+        progress["scanned"] += 1
+        if not purge_filter.matches(message):
+            continue
+
+        if message.created_at > bulk_cutoff:
+            batch.append(message)
+            if len(batch) >= BULK_DELETE_SIZE:
+                await flush()
+            continue
+
+        # History runs newest first, so every young match is already batched
+        if batch:
+            await flush()
+
+        wait = SINGLE_DELETE_INTERVAL - (time.monotonic() - last_single)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        last_single = time.monotonic()
+
+        try:
+            await message.delete(reason=reason)
+            progress["deleted"] += 1
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException:
+            progress["failed"] += 1
+
+    if batch:
+        await flush()
+
+    return progress["deleted"], progress["failed"]
@@ -0,0 +1,89 @@
+import asyncio
+import heapq
+import time
+
+class DeadlineScheduler:
+    """Fire a callback for keyed deadlines from one sleeping task
+
+    Deadlines are wall-clock timestamps so they can be stored and reloaded
+    after a restart. Entries live in a min-heap; rescheduling or cancelling a
+    key just replaces its entry in ``_deadlines`` and the stale heap item is
+    skipped when it reaches the top. Everything due at the same wake-up is
+    handed to the callback in one batch as a list of ``(key, payload)``.
+    """
+
+    def __init__(self, callback, batch_size=100):
+        self.callback = callback
+        self.batch_size = batch_size
+        self._heap = []
+        self._deadlines = {}
+        self._counter = 0
+        self._wakeup = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def schedule(self, key, deadline, payload=None):
+        """Schedule or reschedule a key to fire at the given timestamp"""
+        self._counter += 1
+        entry = (deadline, self._counter, key, payload)
+        self._deadlines[key] = entry
+        heapq.heappush(self._heap, entry)
+
+        # Only wake the runner if this is now the earliest deadline
+        if self._wakeup is not None and self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Drop a pending key; returns True if it was scheduled"""
+        return self._deadlines.pop(key, None) is not None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _peek(self):
+        # Discard heap items that were cancelled or superseded by a reschedule
+        while self._heap and self._deadlines.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _pop_due(self, now):
+        due = []
+        while len(due) < self.batch_size:
+            entry = self._peek()
+            if entry is None or entry[0] > now:
+                break
+            heapq.heappop(self._heap)
+            del self._deadlines[entry[2]]
+            due.append((entry[2], entry[3]))
+        return due
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            entry = self._peek()
+            timeout = None if entry is None else entry[0] - time.time()
+
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self._pop_due(time.time())
+            try:
+                await self.callback(due)
+            except Exception as e:
+                print(f"Scheduler callback failed: {e}")
@@ -0,0 +1,127 @@
+import sys
+import time
+from collections import OrderedDict, deque
+
+# Deleted and edited messages kept per channel, each
+SNIPES_PER_CHANNEL = 10
+# Approximate bytes all snipe records may hold together; least recently used channels go first
+SNIPE_BYTE_BUDGET = 4 * 1024 * 1024
+# Seconds a deleted or edited message stays snipeable
+SNIPE_MAX_AGE = 2 * 60 * 60
+# Longer message content is cut, which bounds the size of a single record
+MAX_SNIPE_CONTENT = 2000
+# Approximate cost of a slotted record and its ints and floats, on top of its strings
+RECORD_OVERHEAD = 200
+# A channel's two deques and its slot in the LRU order
+CHANNEL_OVERHEAD = 2 * sys.getsizeof(deque(maxlen=SNIPES_PER_CHANNEL)) + 100
+
+class SnipeRecord:
+    """Snapshot of a deleted or edited message: ids, strings and timestamps only"""
+
+    __slots__ = ("message_id", "author_id", "author_name", "avatar_url", "content", "edited", "created_at", "captured_at", "size")
+
+    def __init__(self, message, edited=None):
+        self.message_id = message.id
+        self.author_id = message.author.id
+        self.author_name = str(message.author)
+        self.avatar_url = str(message.author.display_avatar.url)
+        self.content = (message.content or "[No content]")[:MAX_SNIPE_CONTENT]
+        self.edited = edited[:MAX_SNIPE_CONTENT] if edited is not None else None
+        self.created_at = message.created_at.timestamp()
+        self.captured_at = time.monotonic()
+        self.size = RECORD_OVERHEAD + sum(
+            sys.getsizeof(value) for value in (self.author_name, self.avatar_url, self.content, self.edited)
+            if value is not None
+        )
+
+class ChannelSnipes:
+    __slots__ = ("deleted", "edited")
+
+    def __init__(self, per_channel):
+        self.deleted = deque(maxlen=per_channel)
+        self.edited = deque(maxlen=per_channel)
+
+    def newest(self):
+        return max((records[-1].captured_at for records in (self.deleted, self.edited) if records), default=0.0)
+
+class SnipeStore:
+    """Deleted and edited message snapshots per channel under one global byte budget
+
+    Channels are kept in least-recently-used order. Adding a record first
+    drops channels whose newest record has aged out, then evicts from the
+    least recently used end until the store fits its byte budget again, so
+    memory stays bounded however many channels the bot sees.
+    """
+
+    def __init__(self, byte_budget=SNIPE_BYTE_BUDGET, per_channel=SNIPES_PER_CHANNEL, max_age=SNIPE_MAX_AGE):
+        self.byte_budget = byte_budget
+        self.per_channel = per_channel
+        self.max_age = max_age
+        self.bytes = 0
+        self._channels = OrderedDict()
+
+    def add_deleted(self, message):
+        self._add(message.channel.id, "deleted", SnipeRecord(message))
+
+    def add_edited(self, before, after):
+        self._add(before.channel.id, "edited", SnipeRecord(before, edited=after.content or "[No content]"))
+
+    def latest_deleted(self, channel_id):
+        return self._latest(channel_id, "deleted")
+
+    def latest_edited(self, channel_id):
+        return self._latest(channel_id, "edited")
+
+    def _add(self, channel_id, kind, record):
+        now = time.monotonic()
+        snipes = self._channels.get(channel_id)
+        if snipes is None:
+            snipes = self._channels[channel_id] = ChannelSnipes(self.per_channel)
+            self.bytes += CHANNEL_OVERHEAD
+        else:
+            self._channels.move_to_end(channel_id)
+
+        records = getattr(snipes, kind)
+        if len(records) == records.maxlen:
+            self.bytes -= records[0].size
+        records.append(record)
+        self.bytes += record.size
+
+        # The channel just written is last, so eviction reaches it only if it alone exceeds the budget
+        while self._channels:
+            oldest_id, oldest = next(iter(self._channels.items()))
+            if self.bytes <= self.byte_budget and now - oldest.newest() <= self.max_age:
+                break
+            self._drop(oldest_id)
+
+    def _latest(self, channel_id, kind):
+        snipes = self._channels.get(channel_id)
+        if snipes is None:
+            return None
+
+        records = getattr(snipes, kind)
+        cutoff = time.monotonic() - self.max_age
+        while records and records[0].captured_at < cutoff:
+            self.bytes -= records.popleft().size
+
+        if not snipes.deleted and not snipes.edited:
+            self._drop(channel_id)
+            return None
+
+        self._channels.move_to_end(channel_id)
+        return records[-1] if records else None
+
+    def _drop(self, channel_id):
+        snipes = self._channels.pop(channel_id)
+        self.bytes -= CHANNEL_OVERHEAD + sum(record.size for records in (snipes.deleted, snipes.edited) for record in records)
+
+    def stats(self):
+        """Return channel and record counts and the estimated bytes held against the budget"""
+        return {
+            "channels": len(self._channels),
+            "records": sum(len(snipes.deleted) + len(snipes.edited) for snipes in self._channels.values()),
+            "bytes": self.bytes,
+            "budget": self.byte_budget
+        }
+
+SNIPES = SnipeStore()
@@ -0,0 +1,936 @@
+import asyncio
+import copy
+import functools
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import CONFIG
+from utils.oplog import COMPACT_THRESHOLD, Compactor, OpLog, apply_mute_op, apply_warning_op
+
+# Directory for storing data files
+DATA_DIR = "data"
+os.makedirs(DATA_DIR, exist_ok=True)
+
+class StorageBackend:
+    """Interface implemented by every storage backend"""
+
+    name = None
+
+    # Guild configuration
+    def load_guild_config(self, guild_id):
+        raise NotImplementedError
+
+    def load_guild_configs(self):
+        """Return every stored config as a {guild_id: config} mapping"""
+        raise NotImplementedError
+
+    def save_guild_configs(self, configs):
+        """Persist a {guild_id: config} mapping of changed guilds"""
+        raise NotImplementedError
+
+    # Whitelist
+    def get_whitelist(self, guild_id):
+        raise NotImplementedError
+
+    def add_whitelist(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def remove_whitelist(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def reset_whitelist(self, guild_id):
+        raise NotImplementedError
+
+    # Join to Create
+    def get_join_to_create(self, guild_id):
+        raise NotImplementedError
+
+    def set_join_to_create(self, guild_id, config_data):
+        raise NotImplementedError
+
+    # Self roles
+    def get_self_roles(self, guild_id):
+        raise NotImplementedError
+
+    def set_self_roles(self, guild_id, self_roles):
+        raise NotImplementedError
+
+    # Warnings
+    def add_warning(self, guild_id, user_id, moderator_id, reason, timestamp):
+        raise NotImplementedError
+
+    def get_warnings(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def remove_warning(self, guild_id, user_id, warning_id):
+        raise NotImplementedError
+
+    def clear_warnings(self, guild_id, user_id):
+        raise NotImplementedError
+
+    # Mutes
+    def set_mute(self, guild_id, user_id, mute_data):
+        raise NotImplementedError
+
+    def get_mute(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def remove_mute(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def get_all_mutes(self):
+        """Return a list of (guild_id, user_id, mute_data) tuples"""
+        raise NotImplementedError
+
+    # Shadow clones
+    def get_shadowclones(self):
+        """Return a {clone_key: clone_data} mapping of every clone"""
+        raise NotImplementedError
+
+    def save_shadowclone(self, clone_key, clone_data):
+        raise NotImplementedError
+
+    def delete_shadowclone(self, clone_key):
+        raise NotImplementedError
+
+    # Reminders
+    def add_reminder(self, reminder):
+        """Store a reminder and return its new integer id"""
+        raise NotImplementedError
+
+    def get_reminders(self, user_id=None):
+        """Return pending reminders ordered by due time, optionally for one user"""
+        raise NotImplementedError
+
+    def remove_reminder(self, reminder_id):
+        raise NotImplementedError
+
+    # Bulk jobs
+    def get_bulk_jobs(self):
+        """Return a {job_id: job_data} mapping of every unfinished bulk job"""
+        raise NotImplementedError
+
+    def save_bulk_job(self, job_id, job_data):
+        raise NotImplementedError
+
+    def delete_bulk_job(self, job_id):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# Legacy monolithic documents and the per-guild shard each one splits into
+LEGACY_GUILD_FILES = {
+    "server_config.json": ("config", "guilds"),
+    "whitelist.json": ("whitelist", "guilds"),
+    "warnings.json": ("warnings", "guilds"),
+    "mutes.json": ("mutes", "guilds"),
+    "self_roles.json": ("self_roles", "guilds"),
+    "join_to_create.json": ("join_to_create", "channels")
+}
+
+# Export table name -> shard kind
+EXPORT_KINDS = {
+    "guild_configs": "config",
+    "whitelist": "whitelist",
+    "join_to_create": "join_to_create",
+    "self_roles": "self_roles",
+    "warnings": "warnings",
+    "mutes": "mutes"
+}
+
+def read_json_file(file_path, default=None):
+    try:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return default
+
+def write_json_file(file_path, data):
+    """Write a JSON document atomically so a crash never leaves a torn file"""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, file_path)
+
+def migrate_legacy_layout(data_dir=DATA_DIR):
+    """Split the monolithic data/*.json documents into data/guilds/<guild_id>/<kind>.json"""
+    guilds_dir = os.path.join(data_dir, "guilds")
+    os.makedirs(guilds_dir, exist_ok=True)
+    migrated = 0
+
+    for filename, (kind, root) in LEGACY_GUILD_FILES.items():
+        file_path = os.path.join(data_dir, filename)
+        if not os.path.exists(file_path):
+            continue
+
+        data = read_json_file(file_path, {})
+        entries = dict(data.get(root, {}))
+
+        # Entries written by the old flat {guild_id: config} layout
+        for key, value in data.items():
+            if key != root and isinstance(value, dict):
+                entries.setdefault(key, value)
+
+        for guild_id, document in entries.items():
+            shard_path = os.path.join(guilds_dir, str(guild_id), f"{kind}.json")
+            if not os.path.exists(shard_path):
+                os.makedirs(os.path.dirname(shard_path), exist_ok=True)
+                write_json_file(shard_path, document)
+                migrated += 1
+
+        # Keep the original around for rollback, but never re-import it
+        if entries:
+            os.replace(file_path, f"{file_path}.migrated")
+        else:
+            os.remove(file_path)
+
+    return migrated
+
+class JSONBackend(StorageBackend):
+    """JSON storage sharded per guild: data/guilds/<guild_id>/<kind>.json
+
+    Shards are loaded lazily the first time a guild is touched, so a write
+    only re-serializes that guild's document.
+    """
+
+    name = "json"
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self.guilds_dir = os.path.join(data_dir, "guilds")
+        self.shadowclones_file = os.path.join(data_dir, "shadowclones.json")
+        self.reminders_file = os.path.join(data_dir, "reminders.json")
+        self.bulk_jobs_file = os.path.join(data_dir, "bulk_jobs.json")
+        self._shards = {}
+        self._logs = {}
+        self._lock = threading.RLock()
+        migrate_legacy_layout(data_dir)
+
+        self._compactor = Compactor(self.compact_logs)
+        self._compactor.start()
+
+    def _shard(self, guild_id, kind, default):
+        """Return the cached shard document, loading it from disk on first use"""
+        key = (str(guild_id), kind)
+        if key not in self._shards:
+            path = os.path.join(self.guilds_dir, str(guild_id), f"{kind}.json")
+            self._shards[key] = read_json_file(path)
+
+        document = self._shards[key]
+        return default if document is None else document
+
+    def _write_shard(self, guild_id, kind, document):
+        self._shards[(str(guild_id), kind)] = document
+        guild_dir = os.path.join(self.guilds_dir, str(guild_id))
+        os.makedirs(guild_dir, exist_ok=True)
+        write_json_file(os.path.join(guild_dir, f"{kind}.json"), document)
+
+    def _log(self, guild_id, kind):
+        """Return the operation log backing a moderation shard, replaying it on first use"""
+        key = (str(guild_id), kind)
+        if key not in self._logs:
+            apply = apply_warning_op if kind == "warnings" else apply_mute_op
+            path = os.path.join(self.guilds_dir, str(guild_id), f"{kind}.json")
+            self._logs[key] = OpLog(path, apply, dict)
+            self._logs[key].load()
+        return self._logs[key]
+
+    def compact_logs(self, threshold=COMPACT_THRESHOLD):
+        """Fold every operation log holding at least `threshold` records into its snapshot"""
+        with self._lock:
+            return sum(1 for log in self._logs.values() if log.pending >= threshold and log.compact())
+
+    def _guild_ids(self):
+        try:
+            return [entry for entry in os.listdir(self.guilds_dir) if os.path.isdir(os.path.join(self.guilds_dir, entry))]
+        except FileNotFoundError:
+            return []
+
+    # Guild configuration
+    def load_guild_config(self, guild_id):
+        with self._lock:
+            return copy.deepcopy(self._shard(guild_id, "config", None))
+
+    def load_guild_configs(self):
+        with self._lock:
+            configs = {guild_id: self._shard(guild_id, "config", None) for guild_id in self._guild_ids()}
+            return {guild_id: copy.deepcopy(config) for guild_id, config in configs.items() if config is not None}
+
+    def save_guild_configs(self, configs):
+        with self._lock:
+            for guild_id, config_data in configs.items():
+                self._write_shard(guild_id, "config", copy.deepcopy(config_data))
+
+    # Whitelist
+    def get_whitelist(self, guild_id):
+        with self._lock:
+            return list(self._shard(guild_id, "whitelist", []))
+
+    def add_whitelist(self, guild_id, user_id):
+        with self._lock:
+            users = self._shard(guild_id, "whitelist", [])
+
+            if str(user_id) in users:
+                return False
+
+            self._write_shard(guild_id, "whitelist", users + [str(user_id)])
+            return True
+
+    def remove_whitelist(self, guild_id, user_id):
+        with self._lock:
+            users = self._shard(guild_id, "whitelist", [])
+
+            if str(user_id) not in users:
+                return False
+
+            self._write_shard(guild_id, "whitelist", [u for u in users if u != str(user_id)])
+            return True
+
+    def reset_whitelist(self, guild_id):
+        with self._lock:
+            if not self._shard(guild_id, "whitelist", None):
+                return False
+
+            self._write_shard(guild_id, "whitelist", [])
+            return True
+
+    # Join to Create
+    def get_join_to_create(self, guild_id):
+        with self._lock:
+            return copy.deepcopy(self._shard(guild_id, "join_to_create", None))
+
+    def set_join_to_create(self, guild_id, config_data):
+        with self._lock:
+            self._write_shard(guild_id, "join_to_create", copy.deepcopy(config_data))
+
+    # Self roles
+    def get_self_roles(self, guild_id):
+        with self._lock:
+            return copy.deepcopy(self._shard(guild_id, "self_roles", {}))
+
+    def set_self_roles(self, guild_id, self_roles):
+        with self._lock:
+            self._write_shard(guild_id, "self_roles", copy.deepcopy(self_roles))
+
+    # Warnings (append-only log, see utils/oplog.py)
+    def add_warning(self, guild_id, user_id, moderator_id, reason, timestamp):
+        with self._lock:
+            log = self._log(guild_id, "warnings")
+            warning_id = len(log.state.get(str(user_id), [])) + 1
+
+            log.append({"op": "add", "user": str(user_id), "warning": {
+                "id": warning_id,
+                "moderator_id": str(moderator_id),
+                "reason": reason,
+                "timestamp": timestamp
+            }})
+            return warning_id
+
+    def get_warnings(self, guild_id, user_id):
+        with self._lock:
+            return copy.deepcopy(self._log(guild_id, "warnings").state.get(str(user_id), []))
+
+    def remove_warning(self, guild_id, user_id, warning_id):
+        with self._lock:
+            log = self._log(guild_id, "warnings")
+
+            if not any(w["id"] == warning_id for w in log.state.get(str(user_id), [])):
+                return False
+
+            log.append({"op": "remove", "user": str(user_id), "id": warning_id})
+            return True
+
+    def clear_warnings(self, guild_id, user_id):
+        with self._lock:
+            log = self._log(guild_id, "warnings")
+
+            if str(user_id) not in log.state:
+                return False
+
+            log.append({"op": "clear", "user": str(user_id)})
+            return True
+
+    # Mutes (append-only log, see utils/oplog.py)
+    def set_mute(self, guild_id, user_id, mute_data):
+        with self._lock:
+            self._log(guild_id, "mutes").append({"op": "set", "user": str(user_id), "mute": dict(mute_data)})
+
+    def get_mute(self, guild_id, user_id):
+        with self._lock:
+            mute_data = self._log(guild_id, "mutes").state.get(str(user_id))
+            return dict(mute_data) if mute_data is not None else None
+
+    def remove_mute(self, guild_id, user_id):
+        with self._lock:
+            log = self._log(guild_id, "mutes")
+
+            if str(user_id) not in log.state:
+                return False
+
+            log.append({"op": "remove", "user": str(user_id)})
+            return True
+
+    def get_all_mutes(self):
+        with self._lock:
+            return [
+                (guild_id, user_id, dict(mute_data))
+                for guild_id in self._guild_ids()
+                for user_id, mute_data in self._log(guild_id, "mutes").state.items()
+            ]
+
+    # Shadow clones
+    def _load_shadowclones(self):
+        return read_json_file(self.shadowclones_file, {}).setdefault("clones", {})
+
+    def get_shadowclones(self):
+        with self._lock:
+            return self._load_shadowclones()
+
+    def save_shadowclone(self, clone_key, clone_data):
+        with self._lock:
+            clones = self._load_shadowclones()
+            clones[clone_key] = clone_data
+            write_json_file(self.shadowclones_file, {"clones": clones})
+
+    def delete_shadowclone(self, clone_key):
+        with self._lock:
+            clones = self._load_shadowclones()
+
+            if clone_key not in clones:
+                return False
+
+            del clones[clone_key]
+            write_json_file(self.shadowclones_file, {"clones": clones})
+            return True
+
+    # Reminders
+    def _load_reminders(self):
+        document = read_json_file(self.reminders_file, {})
+        document.setdefault("next_id", 1)
+        document.setdefault("reminders", {})
+        return document
+
+    def add_reminder(self, reminder):
+        with self._lock:
+            document = self._load_reminders()
+            reminder_id = document["next_id"]
+            document["next_id"] += 1
+            document["reminders"][str(reminder_id)] = dict(reminder, id=reminder_id)
+            write_json_file(self.reminders_file, document)
+            return reminder_id
+
+    def get_reminders(self, user_id=None):
+        with self._lock:
+            reminders = [
+                reminder for reminder in self._load_reminders()["reminders"].values()
+                if user_id is None or reminder["user_id"] == str(user_id)
+            ]
+            return sorted(reminders, key=lambda reminder: reminder["due_at"])
+
+    def remove_reminder(self, reminder_id):
+        with self._lock:
+            document = self._load_reminders()
+
+            if document["reminders"].pop(str(reminder_id), None) is None:
+                return False
+
+            write_json_file(self.reminders_file, document)
+            return True
+
+    # Bulk jobs
+    def _load_bulk_jobs(self):
+        return read_json_file(self.bulk_jobs_file, {}).setdefault("jobs", {})
+
+    def get_bulk_jobs(self):
+        with self._lock:
+            return self._load_bulk_jobs()
+
+    def save_bulk_job(self, job_id, job_data):
+        with self._lock:
+            jobs = self._load_bulk_jobs()
+            jobs[job_id] = job_data
+            write_json_file(self.bulk_jobs_file, {"jobs": jobs})
+
+    def delete_bulk_job(self, job_id):
+        with self._lock:
+            jobs = self._load_bulk_jobs()
+
+            if job_id not in jobs:
+                return False
+
+            del jobs[job_id]
+            write_json_file(self.bulk_jobs_file, {"jobs": jobs})
+            return True
+
+    def close(self):
+        self._compactor.stop()
+        self.compact_logs(threshold=1)
+
+    def export(self):
+        """Dump every document for migration into another backend"""
+        with self._lock:
+            dump = {table: {} for table in EXPORT_KINDS}
+
+            for guild_id in self._guild_ids():
+                for table, kind in EXPORT_KINDS.items():
+                    if kind in ("warnings", "mutes"):
+                        document = self._log(guild_id, kind).state or None
+                    else:
+                        document = self._shard(guild_id, kind, None)
+                    if document is not None:
+                        dump[table][guild_id] = document
+
+            dump["shadowclones"] = self._load_shadowclones()
+            dump["reminders"] = self._load_reminders()["reminders"]
+            dump["bulk_jobs"] = self._load_bulk_jobs()
+            return dump
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS whitelist (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS join_to_create (
+    guild_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS self_roles (
+    guild_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS warnings (
+    row_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    warning_id INTEGER NOT NULL,
+    moderator_id TEXT,
+    reason TEXT,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_member ON warnings (guild_id, user_id);
+CREATE TABLE IF NOT EXISTS mutes (
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    moderator_id TEXT,
+    reason TEXT,
+    timestamp REAL,
+    expire_time REAL,
+    source TEXT NOT NULL DEFAULT 'mute',
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_mutes_expire ON mutes (expire_time);
+CREATE TABLE IF NOT EXISTS shadowclones (
+    clone_key TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shadowclones_channel ON shadowclones (channel_id);
+CREATE INDEX IF NOT EXISTS idx_shadowclones_user ON shadowclones (user_id);
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    channel_id TEXT,
+    guild_id TEXT,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    due_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (due_at);
+CREATE INDEX IF NOT EXISTS idx_reminders_user ON reminders (user_id);
+CREATE TABLE IF NOT EXISTS bulk_jobs (
+    job_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+class SQLiteBackend(StorageBackend):
+    """SQLite storage in WAL mode with one indexed table per data type"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._migrate_schema()
+
+    def _migrate_schema(self):
+        """Add columns introduced after a database was created"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(mutes)")}
+        if "source" not in columns:
+            self._conn.execute("ALTER TABLE mutes ADD COLUMN source TEXT NOT NULL DEFAULT 'mute'")
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params)
+
+    def _fetchone(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
+
+    def _fetchall(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _executemany(self, query, rows):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(query, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # Guild configuration
+    def load_guild_config(self, guild_id):
+        row = self._fetchone("SELECT data FROM guild_config WHERE guild_id = ?", (str(guild_id),))
+        return json.loads(row["data"]) if row else None
+
+    def load_guild_configs(self):
+        rows = self._fetchall("SELECT guild_id, data FROM guild_config")
+        return {row["guild_id"]: json.loads(row["data"]) for row in rows}
+
+    def save_guild_configs(self, configs):
+        self._executemany(
+            "INSERT OR REPLACE INTO guild_config (guild_id, data) VALUES (?, ?)",
+            [(str(guild_id), json.dumps(config_data)) for guild_id, config_data in configs.items()]
+        )
+
+    # Whitelist
+    def get_whitelist(self, guild_id):
+        rows = self._fetchall("SELECT user_id FROM whitelist WHERE guild_id = ? ORDER BY rowid", (str(guild_id),))
+        return [row["user_id"] for row in rows]
+
+    def add_whitelist(self, guild_id, user_id):
+        cursor = self._execute(
+            "INSERT OR IGNORE INTO whitelist (guild_id, user_id) VALUES (?, ?)",
+            (str(guild_id), str(user_id))
+        )
+        return cursor.rowcount > 0
+
+    def remove_whitelist(self, guild_id, user_id):
+        cursor = self._execute(
+            "DELETE FROM whitelist WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id))
+        )
+        return cursor.rowcount > 0
+
+    def reset_whitelist(self, guild_id):
+        cursor = self._execute("DELETE FROM whitelist WHERE guild_id = ?", (str(guild_id),))
+        return cursor.rowcount > 0
+
+    # Join to Create
+    def get_join_to_create(self, guild_id):
+        row = self._fetchone("SELECT data FROM join_to_create WHERE guild_id = ?", (str(guild_id),))
+        return json.loads(row["data"]) if row else None
+
+    def set_join_to_create(self, guild_id, config_data):
+        self._execute(
+            "INSERT OR REPLACE INTO join_to_create (guild_id, data) VALUES (?, ?)",
+            (str(guild_id), json.dumps(config_data))
+        )
+
+    # Self roles
+    def get_self_roles(self, guild_id):
+        row = self._fetchone("SELECT data FROM self_roles WHERE guild_id = ?", (str(guild_id),))
+        return json.loads(row["data"]) if row else {}
+
+    def set_self_roles(self, guild_id, self_roles):
+        self._execute(
+            "INSERT OR REPLACE INTO self_roles (guild_id, data) VALUES (?, ?)",
+            (str(guild_id), json.dumps(self_roles))
+        )
+
+    # Warnings
+    def add_warning(self, guild_id, user_id, moderator_id, reason, timestamp):
+        with self._lock:
+            row = self._fetchone(
+                "SELECT COUNT(*) AS total FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), str(user_id))
+            )
+            warning_id = row["total"] + 1
+            self._execute(
+                "INSERT INTO warnings (guild_id, user_id, warning_id, moderator_id, reason, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(guild_id), str(user_id), warning_id, str(moderator_id), reason, timestamp)
+            )
+            return warning_id
+
+    def get_warnings(self, guild_id, user_id):
+        rows = self._fetchall(
+            "SELECT warning_id, moderator_id, reason, timestamp FROM warnings "
+            "WHERE guild_id = ? AND user_id = ? ORDER BY row_id",
+            (str(guild_id), str(user_id))
+        )
+        return [
+            {
+                "id": row["warning_id"],
+                "moderator_id": row["moderator_id"],
+                "reason": row["reason"],
+                "timestamp": row["timestamp"]
+            }
+            for row in rows
+        ]
+
+    def remove_warning(self, guild_id, user_id, warning_id):
+        with self._lock:
+            row = self._fetchone(
+                "SELECT row_id FROM warnings WHERE guild_id = ? AND user_id = ? AND warning_id = ? "
+                "ORDER BY row_id LIMIT 1",
+                (str(guild_id), str(user_id), warning_id)
+            )
+            if not row:
+                return False
+
+            self._execute("DELETE FROM warnings WHERE row_id = ?", (row["row_id"],))
+            return True
+
+    def clear_warnings(self, guild_id, user_id):
+        cursor = self._execute(
+            "DELETE FROM warnings WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id))
+        )
+        return cursor.rowcount > 0
+
+    # Mutes
+    def set_mute(self, guild_id, user_id, mute_data):
+        self._execute(
+            "INSERT OR REPLACE INTO mutes (guild_id, user_id, moderator_id, reason, timestamp, expire_time, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(guild_id), str(user_id), mute_data.get("moderator_id"), mute_data.get("reason"),
+                mute_data.get("timestamp"), mute_data.get("expire_time"), mute_data.get("source", "mute")
+            )
+        )
+
+    def _mute_from_row(self, row):
+        return {
+            "moderator_id": row["moderator_id"],
+            "reason": row["reason"],
+            "timestamp": row["timestamp"],
+            "expire_time": row["expire_time"],
+            "source": row["source"]
+        }
+
+    def get_mute(self, guild_id, user_id):
+        row = self._fetchone(
+            "SELECT * FROM mutes WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id))
+        )
+        return self._mute_from_row(row) if row else None
+
+    def remove_mute(self, guild_id, user_id):
+        cursor = self._execute(
+            "DELETE FROM mutes WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id))
+        )
+        return cursor.rowcount > 0
+
+    def get_all_mutes(self):
+        rows = self._fetchall("SELECT * FROM mutes")
+        return [(row["guild_id"], row["user_id"], self._mute_from_row(row)) for row in rows]
+
+    # Shadow clones
+    def get_shadowclones(self):
+        rows = self._fetchall("SELECT clone_key, data FROM shadowclones")
+        return {row["clone_key"]: json.loads(row["data"]) for row in rows}
+
+    def save_shadowclone(self, clone_key, clone_data):
+        self._execute(
+            "INSERT OR REPLACE INTO shadowclones (clone_key, user_id, channel_id, data) VALUES (?, ?, ?, ?)",
+            (clone_key, clone_data["user_id"], clone_data["channel_id"], json.dumps(clone_data))
+        )
+
+    def delete_shadowclone(self, clone_key):
+        cursor = self._execute("DELETE FROM shadowclones WHERE clone_key = ?", (clone_key,))
+        return cursor.rowcount > 0
+
+    # Reminders
+    def add_reminder(self, reminder):
+        cursor = self._execute(
+            "INSERT INTO reminders (user_id, channel_id, guild_id, content, created_at, due_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (reminder["user_id"], reminder.get("channel_id"), reminder.get("guild_id"),
+             reminder["content"], reminder["created_at"], reminder["due_at"])
+        )
+        return cursor.lastrowid
+
+    def get_reminders(self, user_id=None):
+        if user_id is None:
+            rows = self._fetchall("SELECT * FROM reminders ORDER BY due_at")
+        else:
+            rows = self._fetchall("SELECT * FROM reminders WHERE user_id = ? ORDER BY due_at", (str(user_id),))
+        return [dict(row) for row in rows]
+
+    def remove_reminder(self, reminder_id):
+        cursor = self._execute("DELETE FROM reminders WHERE id = ?", (int(reminder_id),))
+        return cursor.rowcount > 0
+
+    # Bulk jobs
+    def get_bulk_jobs(self):
+        rows = self._fetchall("SELECT job_id, data FROM bulk_jobs")
+        return {row["job_id"]: json.loads(row["data"]) for row in rows}
+
+    def save_bulk_job(self, job_id, job_data):
+        self._execute(
+            "INSERT OR REPLACE INTO bulk_jobs (job_id, guild_id, data) VALUES (?, ?, ?)",
+            (job_id, job_data["guild_id"], json.dumps(job_data))
+        )
+
+    def delete_bulk_job(self, job_id):
+        cursor = self._execute("DELETE FROM bulk_jobs WHERE job_id = ?", (job_id,))
+        return cursor.rowcount > 0
+
+    def import_data(self, dump):
+        """Bulk load a JSONBackend.export() dump in a single transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO guild_config (guild_id, data) VALUES (?, ?)",
+                    [(guild_id, json.dumps(data)) for guild_id, data in dump["guild_configs"].items()]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO whitelist (guild_id, user_id) VALUES (?, ?)",
+                    [(guild_id, str(user_id)) for guild_id, users in dump["whitelist"].items() for user_id in users]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO join_to_create (guild_id, data) VALUES (?, ?)",
+                    [(guild_id, json.dumps(data)) for guild_id, data in dump["join_to_create"].items()]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO self_roles (guild_id, data) VALUES (?, ?)",
+                    [(guild_id, json.dumps(data)) for guild_id, data in dump["self_roles"].items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO warnings (guild_id, user_id, warning_id, moderator_id, reason, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (guild_id, user_id, w["id"], w.get("moderator_id"), w.get("reason"), w.get("timestamp"))
+                        for guild_id, users in dump["warnings"].items()
+                        for user_id, warnings in users.items()
+                        for w in warnings
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO mutes (guild_id, user_id, moderator_id, reason, timestamp, expire_time, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (guild_id, user_id, m.get("moderator_id"), m.get("reason"), m.get("timestamp"), m.get("expire_time"),
+                         m.get("source", "mute"))
+                        for guild_id, users in dump["mutes"].items()
+                        for user_id, m in users.items()
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO shadowclones (clone_key, user_id, channel_id, data) VALUES (?, ?, ?, ?)",
+                    [
+                        (clone_key, c["user_id"], c["channel_id"], json.dumps(c))
+                        for clone_key, c in dump["shadowclones"].items()
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO reminders (id, user_id, channel_id, guild_id, content, created_at, due_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (r["id"], r["user_id"], r.get("channel_id"), r.get("guild_id"),
+                         r["content"], r["created_at"], r["due_at"])
+                        for r in dump.get("reminders", {}).values()
+                    ]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO bulk_jobs (job_id, guild_id, data) VALUES (?, ?, ?)",
+                    [
+                        (job_id, job["guild_id"], json.dumps(job))
+                        for job_id, job in dump.get("bulk_jobs", {}).items()
+                    ]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def migrate_json_to_sqlite(data_dir=DATA_DIR, sqlite_path=None):
+    """One-shot import of the data/*.json documents into a SQLite database"""
+    sqlite_path = sqlite_path or CONFIG["sqlite_path"]
+    json_backend = JSONBackend(data_dir)
+    dump = json_backend.export()
+    json_backend.close()
+
+    backend = SQLiteBackend(sqlite_path)
+    backend.import_data(dump)
+
+    return {table: len(rows) for table, rows in dump.items()}, backend
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_storage():
+    """Return the process-wide storage backend selected in CONFIG"""
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(CONFIG["storage_backend"])
+    return _backend
+
+def create_backend(name):
+    if name == "json":
+        return JSONBackend()
+
+    if name == "sqlite":
+        # First start on SQLite: import whatever the JSON backend left behind
+        if not os.path.exists(CONFIG["sqlite_path"]):
+            _, backend = migrate_json_to_sqlite()
+            return backend
+        return SQLiteBackend(CONFIG["sqlite_path"])
+
+    raise ValueError(f"Unknown storage backend: {name}")
+
+# Async API
+# A single worker keeps storage operations in submission order while keeping
+# blocking file and database I/O off the event loop
+STORAGE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="escudo-storage")
+
+async def run_storage(func, *args, **kwargs):
+    """Run a blocking storage call on the storage executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(STORAGE_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+def offload(func):
+    """Wrap a blocking storage helper into a coroutine run on the storage executor"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_storage(func, *args, **kwargs)
+    return wrapper
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else CONFIG["sqlite_path"]
+    counts, backend = migrate_json_to_sqlite(sqlite_path=target)
+    backend.close()
+
+    print(f"Migrated JSON data into {target}:")
+    for table, count in counts.items():
+        print(f" - {table}: {count} guilds/entries")
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict, deque
+
+# Default antinuke limits: (actions, seconds) an actor may perform before it trips
+DEFAULT_THRESHOLDS = {
+    "ban": (3, 10),
+    "channel_delete": (3, 10),
+    "role_delete": (3, 10),
+    "permission_grant": (1, 10),
+    "role_escalation": (1, 10),
+    "webhook_create": (3, 10),
+    "bot_add": (1, 10)
+}
+
+# Bounds for guild-configured limits; MAX_WINDOW also sets how long idle actors are kept
+MAX_COUNT = 50
+MAX_WINDOW = 300
+# Hard cap on tracked (guild, actor, action) keys; the least recently active go first
+MAX_TRACKED_KEYS = 100000
+
+class SlidingWindowCounter:
+    """Per-key sliding-window event counter with bounded memory
+
+    Each key keeps a ring buffer of its last `limit` timestamps, so recording
+    an event is O(1): the window has tripped when the buffer is full and its
+    oldest timestamp is still inside the window. Keys are kept in
+    least-recently-active order, which lets idle keys be expired from the
+    front without a sweep.
+    """
+
+    def __init__(self, idle_ttl=MAX_WINDOW, max_keys=MAX_TRACKED_KEYS):
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+
+    def __len__(self):
+        return len(self._windows)
+
+    def hit(self, key, limit, window, now=None):
+        """Record one event for key; True if `limit` events fell within `window` seconds"""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        timestamps = self._windows.get(key)
+        if timestamps is None or timestamps.maxlen != limit:
+            timestamps = deque(timestamps or (), maxlen=limit)
+            self._windows[key] = timestamps
+        else:
+            self._windows.move_to_end(key)
+
+        timestamps.append(now)
+        return len(timestamps) == limit and now - timestamps[0] <= window
+
+    def reset(self, key):
+        self._windows.pop(key, None)
+
+    def _expire(self, now):
+        windows = self._windows
+        while windows:
+            key, timestamps = next(iter(windows.items()))
+            if len(windows) <= self.max_keys and now - timestamps[-1] <= self.idle_ttl:
+                break
+            del windows[key]
+
+class RecentTargets:
+    """Per-key record of the targets acted on recently, with bounded memory
+
+    Lets a response undo every action inside the window that tripped, not
+    only the ones after the trip. Each key keeps at most MAX_COUNT targets,
+    and keys are kept least recently active first so idle ones expire from
+    the front, as in SlidingWindowCounter.
+    """
+
+    def __init__(self, idle_ttl=MAX_WINDOW, max_keys=MAX_TRACKED_KEYS):
+        self.idle_ttl = idle_ttl
+        self.max_keys = max_keys
+        self._targets = OrderedDict()
+
+    def add(self, key, target_id, now=None):
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        targets = self._targets.get(key)
+        if targets is None:
+            targets = self._targets[key] = deque(maxlen=MAX_COUNT)
+        else:
+            self._targets.move_to_end(key)
+        targets.append((now, target_id))
+
+    def take(self, key, window, now=None):
+        """Remove and return the target ids recorded for key within the last `window` seconds"""
+        now = time.monotonic() if now is None else now
+        targets = self._targets.pop(key, ())
+        return [target_id for at, target_id in targets if now - at <= window]
+
+    def _expire(self, now):
+        targets = self._targets
+        while targets:
+            key, entries = next(iter(targets.items()))
+            if len(targets) <= self.max_keys and now - entries[-1][0] <= self.idle_ttl:
+                break
+            del targets[key]
+
+def antinuke_threshold(config, action):
+    """Return the (count, seconds) limit for an action from a guild config"""
+    override = config.get("antinuke", {}).get("thresholds", {}).get(action)
+    if override:
+        return override["count"], override["seconds"]
+    return DEFAULT_THRESHOLDS[action]
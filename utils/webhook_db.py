@@ -1,44 +1,104 @@
 
-import json
-import os
+import threading
 from datetime import datetime
+from utils.storage import get_storage, offload
 
-# Directory for storing database files
-DB_DIR = "data"
-os.makedirs(DB_DIR, exist_ok=True)
+class ShadowCloneRegistry:
+    """In-memory shadow clone index keyed by clone, channel and user
 
-# Database file for shadow clones
-SHADOWCLONES_FILE = os.path.join(DB_DIR, "shadowclones.json")
+    Loaded once from storage and updated incrementally on every write. The
+    per-channel and per-user indexes hold tuples of active clones that are
+    replaced wholesale, so readers on the event loop never see a half-updated
+    index while the storage executor writes. Loading happens once, under a
+    lock, on the storage executor; until it finishes the event loop sees no
+    clones rather than reading storage itself.
+    """
 
-def ensure_shadowclones_db():
-    """Ensure the shadowclones database file exists"""
-    if not os.path.exists(SHADOWCLONES_FILE):
-        with open(SHADOWCLONES_FILE, 'w') as f:
-            json.dump({"clones": {}}, f, indent=4)
+    def __init__(self):
+        self._clones = None
+        self._by_channel = {}
+        self._by_user = {}
+        self._load_lock = threading.Lock()
 
-ensure_shadowclones_db()
+    def load(self):
+        if self._clones is not None:
+            return
+        with self._load_lock:
+            if self._clones is not None:
+                return
+            clones = dict(get_storage().get_shadowclones())
+            for clone_key, clone_data in clones.items():
+                self._index(clone_key, clone_data)
+            # Published last, so a reader never sees the registry as loaded with partial indexes
+            self._clones = clones
 
-def load_shadowclones_db():
-    """Load shadowclones database"""
-    try:
-        with open(SHADOWCLONES_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        default_data = {"clones": {}}
-        save_shadowclones_db(default_data)
-        return default_data
+    def _index_keys(self, clone_data):
+        return ((self._by_channel, int(clone_data["channel_id"])), (self._by_user, int(clone_data["user_id"])))
 
-def save_shadowclones_db(data):
-    """Save shadowclones database"""
-    with open(SHADOWCLONES_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    def _index(self, clone_key, clone_data):
+        if not clone_data["active"]:
+            return
+        # Replace by clone key, so indexing a clone twice never lists it twice
+        for index, key in self._index_keys(clone_data):
+            index[key] = self._without(index.get(key, ()), clone_key) + (clone_data,)
+
+    def _unindex(self, clone_key, clone_data):
+        for index, key in self._index_keys(clone_data):
+            clones = self._without(index.get(key, ()), clone_key)
+            if clones:
+                index[key] = clones
+            else:
+                index.pop(key, None)
+
+    @staticmethod
+    def _without(clones, clone_key):
+        return tuple(c for c in clones if f"{c['user_id']}_{c['channel_id']}" != clone_key)
+
+    def get(self, clone_key):
+        self.load()
+        return self._clones.get(clone_key)
+
+    def by_channel(self, channel_id):
+        """Active clones in a channel; empty until the registry has loaded (called on the event loop)"""
+        if self._clones is None:
+            return ()
+        return self._by_channel.get(int(channel_id), ())
+
+    def by_user(self, user_id):
+        self.load()
+        return self._by_user.get(int(user_id), ())
+
+    def put(self, clone_key, clone_data):
+        self.load()
+        get_storage().save_shadowclone(clone_key, clone_data)
+        previous = self._clones.get(clone_key)
+        self._clones[clone_key] = clone_data
+
+        if previous is not None:
+            self._unindex(clone_key, previous)
+        self._index(clone_key, clone_data)
+
+    def remove(self, clone_key):
+        self.load()
+        if not get_storage().delete_shadowclone(clone_key):
+            return False
+
+        clone_data = self._clones.pop(clone_key, None)
+        if clone_data is not None:
+            self._unindex(clone_key, clone_data)
+        return True
+
+SHADOWCLONES = ShadowCloneRegistry()
+
+def load_shadowclone_registry():
+    """Load the shadow clone registry from storage"""
+    SHADOWCLONES.load()
 
 def create_shadowclone(user_id, channel_id, webhook_id, webhook_token, name, avatar_url, prefix):
     """Create a new shadow clone entry"""
-    data = load_shadowclones_db()
     clone_key = f"{user_id}_{channel_id}"
     
-    data["clones"][clone_key] = {
+    SHADOWCLONES.put(clone_key, {
         "user_id": str(user_id),
         "channel_id": str(channel_id),
         "webhook_id": str(webhook_id),
@@ -48,71 +108,60 @@ def create_shadowclone(user_id, channel_id, webhook_id, webhook_token, name, ava
         "prefix": prefix,
         "created_at": datetime.now().timestamp(),
         "active": True
-    }
-    
-    save_shadowclones_db(data)
+    })
     return True
 
 def get_shadowclone(user_id, channel_id):
     """Get a shadow clone by user and channel"""
-    data = load_shadowclones_db()
-    clone_key = f"{user_id}_{channel_id}"
-    return data["clones"].get(clone_key)
+    return SHADOWCLONES.get(f"{user_id}_{channel_id}")
 
 def get_shadowclone_by_channel(channel_id):
-    """Get all shadow clones in a specific channel"""
-    data = load_shadowclones_db()
-    clones = []
-    for clone_data in data["clones"].values():
-        if clone_data["channel_id"] == str(channel_id) and clone_data["active"]:
-            clones.append(clone_data)
-    return clones
+    """Get all active shadow clones in a specific channel"""
+    SHADOWCLONES.load()
+    return list(SHADOWCLONES.by_channel(channel_id))
 
 def update_shadowclone(user_id, channel_id, **updates):
     """Update a shadow clone"""
-    data = load_shadowclones_db()
     clone_key = f"{user_id}_{channel_id}"
+    clone_data = SHADOWCLONES.get(clone_key)
     
-    if clone_key not in data["clones"]:
+    if clone_data is None:
         return False
     
+    clone_data = dict(clone_data)
     for key, value in updates.items():
         if key in ["name", "avatar_url", "prefix"]:
-            data["clones"][clone_key][key] = value
+            clone_data[key] = value
     
-    data["clones"][clone_key]["updated_at"] = datetime.now().timestamp()
-    save_shadowclones_db(data)
+    clone_data["updated_at"] = datetime.now().timestamp()
+    SHADOWCLONES.put(clone_key, clone_data)
     return True
 
 def delete_shadowclone(user_id, channel_id):
     """Delete a shadow clone"""
-    data = load_shadowclones_db()
-    clone_key = f"{user_id}_{channel_id}"
-    
-    if clone_key not in data["clones"]:
-        return False
-    
-    del data["clones"][clone_key]
-    save_shadowclones_db(data)
-    return True
+    return SHADOWCLONES.remove(f"{user_id}_{channel_id}")
 
 def deactivate_shadowclone(user_id, channel_id):
     """Deactivate a shadow clone (for when webhook is deleted)"""
-    data = load_shadowclones_db()
     clone_key = f"{user_id}_{channel_id}"
+    clone_data = SHADOWCLONES.get(clone_key)
     
-    if clone_key not in data["clones"]:
+    if clone_data is None:
         return False
     
-    data["clones"][clone_key]["active"] = False
-    save_shadowclones_db(data)
+    SHADOWCLONES.put(clone_key, dict(clone_data, active=False))
     return True
 
 def get_user_shadowclones(user_id):
-    """Get all shadow clones for a user"""
-    data = load_shadowclones_db()
-    user_clones = []
-    for clone_data in data["clones"].values():
-        if clone_data["user_id"] == str(user_id) and clone_data["active"]:
-            user_clones.append(clone_data)
-    return user_clones
+    """Get all active shadow clones for a user"""
+    return list(SHADOWCLONES.by_user(user_id))
+
+# Async API: blocking storage calls run on the storage executor
+create_shadowclone_async = offload(create_shadowclone)
+get_shadowclone_async = offload(get_shadowclone)
+get_shadowclone_by_channel_async = offload(get_shadowclone_by_channel)
+update_shadowclone_async = offload(update_shadowclone)
+delete_shadowclone_async = offload(delete_shadowclone)
+deactivate_shadowclone_async = offload(deactivate_shadowclone)
+get_user_shadowclones_async = offload(get_user_shadowclones)
+load_shadowclone_registry_async = offload(load_shadowclone_registry)